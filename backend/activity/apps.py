@@ -5,5 +5,6 @@ class ActivityConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'activity'
 
-    
-     # Import signals when app is ready
+    def ready(self):
+        # Import signals when app is ready
+        from . import signals  # noqa: F401
@@ -0,0 +1,173 @@
+# activity/archive.py
+"""
+Cold storage for old activity entries.
+
+archive_before() moves activities older than a cutoff out of the hot
+tables, one bounded chunk at a time:
+
+    1. read the next CHUNK_SIZE ids past the last one (keyset, iterator())
+    2. write them as gzipped NDJSON, one file per day:
+       YYYY/MM/DD/activity-<first id>-<last id>.ndjson.gz
+    3. record (task, file) pairs in ActivityArchiveIndex, and the chunk in
+       ActivityArchiveRun (the feeds' archive generation)
+    4. delete the chunk and its audience rows by id
+
+Steps 3 and 4 share a transaction and run after the file is written, so a
+crash can at worst leave a file whose entries are still in the database;
+readers skip ids they have already seen.
+
+archived_for_task() is how by_task?include_archived=true reads them back.
+"""
+import gzip
+import json
+from collections import defaultdict
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+
+from tasks.models import Task
+from users.models import User
+from .models import Activity, ActivityArchiveIndex, ActivityArchiveRun, ActivityAudience
+
+ARCHIVED_FIELDS = ('id', 'task_id', 'user_id', 'action', 'description', 'timestamp', 'changes', 'details')
+
+
+def retention_settings():
+    defaults = {'HOT_DAYS': 90, 'ARCHIVE_DIR': 'archive/activity', 'CHUNK_SIZE': 1000}
+    return {**defaults, **getattr(settings, 'ACTIVITY_RETENTION', {})}
+
+
+def get_storage():
+    return FileSystemStorage(location=retention_settings()['ARCHIVE_DIR'])
+
+
+def _write_file(storage, name, records):
+    buffer = BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb') as archive:
+        for record in records:
+            archive.write(json.dumps(record, cls=DjangoJSONEncoder, separators=(',', ':')).encode('utf-8'))
+            archive.write(b'\n')
+    if storage.exists(name):
+        # Re-archiving the same range after an interrupted run
+        storage.delete(name)
+    storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def _read_file(storage, name):
+    with storage.open(name, 'rb') as raw, gzip.GzipFile(fileobj=raw) as archive:
+        for line in archive:
+            yield json.loads(line)
+
+
+def archive_before(cutoff, chunk_size=None, dry_run=False, stdout=None):
+    """Archive and delete every activity older than cutoff. Returns the count."""
+    chunk_size = chunk_size or retention_settings()['CHUNK_SIZE']
+    storage = get_storage()
+    last_id, total = 0, 0
+
+    while True:
+        rows = Activity.objects.filter(timestamp__lt=cutoff, id__gt=last_id).order_by('id').values(*ARCHIVED_FIELDS)
+        chunk = list(rows[:chunk_size].iterator(chunk_size=chunk_size))
+        if not chunk:
+            break
+        ids = [row['id'] for row in chunk]
+        last_id = ids[-1]
+        total += len(chunk)
+        if dry_run:
+            continue
+
+        audience = defaultdict(list)
+        for activity_id, user_id in ActivityAudience.objects.filter(activity_id__in=ids).values_list('activity_id', 'user_id'):
+            audience[activity_id].append(user_id)
+
+        by_day = defaultdict(list)
+        for row in chunk:
+            row['audience'] = audience[row['id']]
+            day = row['timestamp'].date()
+            # Full precision (DjangoJSONEncoder would cut microseconds)
+            row['timestamp'] = row['timestamp'].isoformat()
+            by_day[day].append(row)
+
+        index = []
+        for day, records in by_day.items():
+            name = f"{day:%Y/%m/%d}/activity-{records[0]['id']}-{records[-1]['id']}.ndjson.gz"
+            _write_file(storage, name, records)
+            per_task = defaultdict(int)
+            for record in records:
+                if record['task_id']:
+                    per_task[record['task_id']] += 1
+            index.extend(
+                ActivityArchiveIndex(task_id=task_id, path=name, day=day, count=count)
+                for task_id, count in per_task.items()
+            )
+
+        with transaction.atomic():
+            ActivityArchiveIndex.objects.bulk_create(index)
+            ActivityArchiveRun.objects.create(count=len(ids))
+            # only('id'): the cascade to audience rows needs no other column
+            Activity.objects.filter(id__in=ids).only('id').delete()
+        if stdout:
+            stdout.write(f"Archived activities up to id {last_id}")
+
+    return total
+
+
+def generation():
+    """Changes whenever entries are archived (a primary key lookup)."""
+    return ActivityArchiveRun.objects.aggregate(generation=Max('id'))['generation']
+
+
+async def ageneration():
+    return (await ActivityArchiveRun.objects.aaggregate(generation=Max('id')))['generation']
+
+
+def archived_for_task(task_id, user):
+    """
+    Archived activities of a task that `user` may see (same rules as the
+    feed), newest first, as rows shaped like the feed's values() rows
+    (ACTIVITY_ROWS renders both) plus "archived": True.
+    """
+    storage = get_storage()
+    records, seen = [], set()
+    paths = ActivityArchiveIndex.objects.filter(task_id=task_id).order_by('-day').values_list('path', flat=True)
+    for path in dict.fromkeys(paths):
+        for record in _read_file(storage, path):
+            if record['task_id'] != task_id or record['id'] in seen:
+                continue
+            if user.role != 'admin' and user.id not in record['audience']:
+                continue
+            seen.add(record['id'])
+            records.append(record)
+    for record in records:
+        record['timestamp'] = parse_datetime(record['timestamp'])
+    records.sort(key=lambda record: record['id'], reverse=True)
+
+    users = User.objects.in_bulk({record['user_id'] for record in records} - {None})
+    task = Task.objects.only('id', 'title').filter(id=task_id).first()
+    rows = []
+    for record in records:
+        actor = users.get(record['user_id'])
+        rows.append({
+            'id': record['id'],
+            'user_id': actor.id if actor else None,
+            'user__email': actor.email if actor else None,
+            'user__username': actor.username if actor else None,
+            'user__role': actor.role if actor else None,
+            'action': record['action'],
+            'description': record['description'],
+            'timestamp': record['timestamp'],
+            'feed_id': record['id'],
+            'changes': record['changes'],
+            # A deleted task falls back to the details snapshot, as in the feed
+            'task_id': task.id if task else None,
+            'task__title': task.title if task else None,
+            'details': record['details'],
+            'archived': True,
+        })
+    return rows
@@ -0,0 +1,11 @@
+# Async variant of activity/urls.py (AsyncActivityViewSet), for the ASGI deployment
+from django.urls import path, include
+from rest_framework.routers import SimpleRouter
+from .views import AsyncActivityViewSet
+
+router = SimpleRouter()
+router.register(r'activity', AsyncActivityViewSet, basename='async-activity')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,186 @@
+# activity/buffer.py
+
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from tasks.models import Task
+from users.models import User
+from .events import publish_activities
+from .models import Activity, ActivityAudience
+
+logger = logging.getLogger(__name__)
+
+
+def buffer_settings():
+    defaults = {'ENABLED': False, 'MAX_BATCH': 100, 'FLUSH_INTERVAL': 1.0, 'MAX_ATTEMPTS': 10}
+    return {**defaults, **getattr(settings, 'ACTIVITY_LOG_BUFFER', {})}
+
+
+class ActivityWriter:
+    """
+    In-process background writer for activity logs.
+
+    Requests hand over unsaved Activity instances with add(); a daemon
+    thread writes them with one bulk_create per batch once MAX_BATCH
+    entries are queued or FLUSH_INTERVAL seconds have passed. Whatever is
+    still queued is flushed at interpreter exit.
+
+    If a batch fails, its entries are written one at a time, and those
+    that still fail are queued again for the next flush. An entry is only
+    dropped (and logged) after MAX_ATTEMPTS failed writes.
+    """
+
+    def __init__(self, max_batch=100, flush_interval=1.0, max_attempts=10):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self._attempts = {}  # id(activity) -> failed writes, for queued retries
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='activity-writer', daemon=True)
+        self._thread.start()
+
+    def add(self, activity):
+        with self._lock:
+            self._pending.append(activity)
+            full = len(self._pending) >= self.max_batch
+        if full:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write everything queued so far. Returns the number of activities written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                write_batch(batch)
+            except Exception:
+                logger.warning("Writing %d buffered activity log entries failed; retrying one at a time",
+                               len(batch), exc_info=True)
+            else:
+                self._attempts.clear()
+                return len(batch)
+            failed = []
+            for activity in batch:
+                try:
+                    write_batch([activity])
+                except Exception:
+                    failed.append(activity)
+                else:
+                    self._attempts.pop(id(activity), None)
+            self._retry(failed)
+            return len(batch) - len(failed)
+
+    def _retry(self, activities):
+        """Queue failed entries ahead of newer ones, unless they've used up their attempts."""
+        retry = []
+        for activity in activities:
+            attempts = self._attempts.pop(id(activity), 0) + 1
+            if attempts < self.max_attempts:
+                self._attempts[id(activity)] = attempts
+                retry.append(activity)
+            else:
+                logger.error("Dropped buffered activity log entry after %d attempts: %s", attempts, activity.description)
+        if retry:
+            with self._lock:
+                self._pending[:0] = retry
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            close_old_connections()
+        connection.close()
+
+
+def write_batch(activities):
+    """
+    Insert activities and their audience rows: two INSERTs for the whole
+    batch.
+
+    Entries keep the time they were logged. Their ids are assigned here, and
+    the feed is ordered on id, so a late write still lands ahead of any feed
+    cursor a client already holds. A task reassigned while its entries were queued missed them in
+    share_task_history, so the task's current assignee is added to their
+    audience.
+    """
+    # A task or user may have been deleted between logging and flushing;
+    # the details snapshot still records it, so drop the dangling FKs.
+    task_ids = {a.task_id for a in activities} - {None}
+    user_ids = {a.user_id for a in activities} | {a.details.get('assigned_user_id') for a in activities}
+    user_ids.discard(None)
+    assignees = dict(Task.objects.filter(id__in=task_ids).values_list('id', 'assigned_user_id')) if task_ids else {}
+    live_users = set(User.objects.filter(id__in=user_ids).values_list('id', flat=True)) if user_ids else set()
+    live_users.update(assignees.values())
+    for activity in activities:
+        if activity.task_id not in assignees:
+            activity.task = None
+        if activity.user_id not in live_users:
+            activity.user = None
+
+    def audience(activity):
+        rows = ActivityAudience.rows_for(activity)
+        assignee = assignees.get(activity.task_id)
+        if assignee and assignee not in {row.user_id for row in rows}:
+            rows.append(ActivityAudience(activity_id=activity.id, user_id=assignee))
+        return [row for row in rows if row.user_id in live_users]
+
+    try:
+        with transaction.atomic():
+            Activity.objects.bulk_create(activities)
+            ActivityAudience.objects.bulk_create(
+                [row for activity in activities for row in audience(activity)],
+                ignore_conflicts=True,
+            )
+            publish_activities(activities)
+    except Exception:
+        # Rolled back; a retry inserts them afresh
+        for activity in activities:
+            activity.pk = None
+        raise
+
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """The process-wide writer, (re)created after a fork so each worker has its own thread."""
+    global _writer, _writer_pid
+    with _writer_lock:
+        if _writer is None or _writer_pid != os.getpid():
+            options = buffer_settings()
+            _writer = ActivityWriter(options['MAX_BATCH'], options['FLUSH_INTERVAL'], options['MAX_ATTEMPTS'])
+            _writer_pid = os.getpid()
+        return _writer
+
+
+def flush_buffered_activities():
+    """Flush the current process's writer, if one was started."""
+    if _writer is not None and _writer_pid == os.getpid():
+        return _writer.flush()
+    return 0
+
+
+@atexit.register
+def _flush_on_exit():
+    if _writer is not None and _writer_pid == os.getpid():
+        _writer.stop()
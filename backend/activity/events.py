@@ -0,0 +1,17 @@
+from backend import events
+
+from .models import ActivityAudience
+from .serializers import ActivitySerializer
+
+
+def publish_activities(activities):
+    """
+    Push saved activities to the live stream (backend/stream.py), each to
+    the same users whose feed it appears in.
+    """
+    for activity in activities:
+        events.publish(
+            'activity',
+            ActivitySerializer(activity).data,
+            {row.user_id for row in ActivityAudience.rows_for(activity)},
+        )
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from activity.archive import archive_before, retention_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Move activity entries older than ACTIVITY_RETENTION['HOT_DAYS'] into "
+        "gzipped NDJSON archive files (see activity/archive.py). Works in "
+        "bounded chunks and is safe to interrupt and re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Override ACTIVITY_RETENTION['HOT_DAYS'].")
+        parser.add_argument('--chunk-size', type=int, help="Override ACTIVITY_RETENTION['CHUNK_SIZE'].")
+        parser.add_argument('--dry-run', action='store_true', help="Count what would be archived.")
+        parser.add_argument('--vacuum', action='store_true',
+                            help="Reclaim the freed space afterwards (VACUUM; locks the tables).")
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else retention_settings()['HOT_DAYS']
+        if days < 1:
+            raise CommandError("--days must be at least 1.")
+        cutoff = timezone.now() - timedelta(days=days)
+
+        total = archive_before(cutoff, chunk_size=options['chunk_size'],
+                               dry_run=options['dry_run'], stdout=self.stdout)
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"{total} activities older than {cutoff:%Y-%m-%d} would be archived."))
+            return
+
+        if options['vacuum'] and total:
+            self.compact()
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} activities older than {cutoff:%Y-%m-%d}."))
+
+    def compact(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('VACUUM')
+            elif connection.vendor == 'postgresql':
+                cursor.execute('VACUUM ANALYZE activity_activity, activity_activityaudience')
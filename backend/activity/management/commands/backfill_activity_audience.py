@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from activity.models import Activity, ActivityAudience
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Populate ActivityAudience for activities logged before the audience "
+        "table existed. Safe to re-run; existing rows are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        processed = 0
+
+        while True:
+            # Keyset over the primary key so each batch is an index range read
+            batch = list(
+                Activity.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'user_id', 'task__assigned_user_id', 'details')[:batch_size]
+            )
+            if not batch:
+                break
+
+            # Same rules the old OR query applied: actor, current assignee
+            # of a live task, or assignee in the snapshot.
+            audiences = [
+                (activity_id, {user_id, assignee_id, (details or {}).get('assigned_user_id')} - {None})
+                for activity_id, user_id, assignee_id, details in batch
+            ]
+            # A deleted assignee's id stays in the snapshot
+            candidates = set().union(*(user_ids for _, user_ids in audiences))
+            live_users = set(User.objects.filter(pk__in=candidates).values_list('pk', flat=True))
+            rows = [
+                ActivityAudience(activity_id=activity_id, user_id=uid)
+                for activity_id, user_ids in audiences
+                for uid in user_ids & live_users
+            ]
+
+            ActivityAudience.objects.bulk_create(rows, ignore_conflicts=True)
+            processed += len(batch)
+            last_id = batch[-1][0]
+            self.stdout.write(f"Processed activities up to id {last_id}")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfill complete: {processed} activities processed; missing audience rows added."))
@@ -0,0 +1,13 @@
+from activity.models import Activity
+from backend.export import ExportCommand
+
+
+class Command(ExportCommand):
+    help = (
+        "Export the activity log as CSV or NDJSON, streamed in chunks so "
+        "memory use stays flat. --user limits the export to that user's feed."
+    )
+
+    def get_queryset(self, user):
+        activities = Activity.objects.all() if user is None else Activity.objects.visible_to(user)
+        return activities.for_export()
@@ -1,24 +1,51 @@
-from threading import local
+from contextvars import ContextVar
 
-# Global thread local storage
-_thread_locals = local()
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+# The request being handled. A context variable rather than a thread local:
+# under ASGI many requests share a thread, and sync_to_async copies the
+# context into the worker thread, so sync code (signals) still sees it.
+_current_request = ContextVar('current_request', default=None)
 
 
 def get_current_user():
-    """Helper function to get current user from thread local"""
-    return getattr(_thread_locals, 'user', None)
+    """
+    Helper function to get the authenticated user of the current request.
+
+    The request is stored rather than request.user: DRF authenticates
+    (JWT) inside the view and replaces request.user at that point, so
+    reading it lazily returns the real user instead of AnonymousUser.
+    """
+    request = _current_request.get()
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user
+    return None
 
 
 class ActivityMiddleware:
-    """Middleware to store current user in thread local storage"""
+    """Middleware to store the current request in the request context (sync and async)"""
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        _thread_locals.user = getattr(request, 'user', None)
-        response = self.get_response(request)
-        # Clean up after request
-        if hasattr(_thread_locals, 'user'):
-            del _thread_locals.user
-        return response
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            # Clean up after request
+            _current_request.reset(token)
+
+    async def __acall__(self, request):
+        token = _current_request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current_request.reset(token)
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity', '0003_initial'),
+        ('tasks', '0003_task_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['timestamp', 'id'], name='activity_ts_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['task', 'timestamp'], name='activity_task_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity', '0006_activity_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityArchiveIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('path', models.CharField(max_length=255)),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['task_id', 'day'], name='archive_task_day_idx')],
+            },
+        ),
+    ]
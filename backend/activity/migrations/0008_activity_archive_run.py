@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity', '0007_activity_archive_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityArchiveRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('count', models.PositiveIntegerField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity', '0008_activity_archive_run'),
+        ('tasks', '0006_task_created_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='activity',
+            name='activity_task_ts_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='activityaudience',
+            name='audience_user_ts_idx',
+        ),
+        migrations.RemoveField(
+            model_name='activityaudience',
+            name='timestamp',
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['task', 'id'], name='activity_task_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activityaudience',
+            index=models.Index(fields=['user', 'activity'], name='audience_user_activity_idx'),
+        ),
+    ]
@@ -1,10 +1,46 @@
 # activities/models.py
 
 from django.db import models
+from django.db.models import F
 from django.conf import settings
+from django.utils import timezone
 from tasks.models import Task
 
 
+class ActivityQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Admins see every log. Staff see the logs fanned out to them in
+        ActivityAudience: tasks assigned to them (live or deleted) and
+        actions they performed themselves.
+
+        Rows are annotated with `feed_id`, which is the audience row's
+        activity id for staff, so their feed is one range scan over the
+        (user, activity) index rather than an OR of joins.
+        """
+        if user.role == 'admin':
+            return self.annotate(feed_id=F('id'))
+        return self.filter(audience__user=user.id).annotate(feed_id=F('audience__activity'))
+
+    def for_feed(self):
+        """
+        Join the actor and task that ActivitySerializer reads, loading only
+        the columns it renders, so serializing N rows takes no extra queries.
+        """
+        return self.select_related('user', 'task').only(
+            'id', 'action', 'description', 'timestamp', 'changes', 'details',
+            'user__id', 'user__email', 'user__username', 'user__role',
+            'task__id', 'task__title',
+        )
+
+    def for_export(self):
+        """Plain rows for backend/export.py, in id order (walks the primary key)."""
+        return self.order_by('id').values(
+            'id', 'timestamp', 'action', 'description', 'user_id', 'user__username',
+            'task_id', 'changes', 'details',
+        )
+
+
 class Activity(models.Model):
     ACTION_CHOICES = [
         ('CREATED', 'Created'),
@@ -31,7 +67,8 @@ class Activity(models.Model):
     )
     action = models.CharField(max_length=50, choices=ACTION_CHOICES)
     description = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the action happens, not when a buffered write reaches the DB
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     changes = models.JSONField(null=True, blank=True)
     
     # ADD THIS FIELD to store a snapshot of task details
@@ -41,11 +78,83 @@ class Activity(models.Model):
         help_text="Stores a snapshot of task details like title at the time of the action."
     )
 
+    objects = ActivityQuerySet.as_manager()
+
     class Meta:
         ordering = ['-timestamp']
         verbose_name_plural = 'Activities'
+        indexes = [
+            # Back archive_activity's cutoff scan and the admin's date drill-down
+            models.Index(fields=['timestamp', 'id'], name='activity_ts_id_idx'),
+            # Back the by_task feed, which is ordered on id
+            models.Index(fields=['task', 'id'], name='activity_task_id_idx'),
+        ]
 
     def __str__(self):
         # You can enhance this later to use the details snapshot if the task is deleted
         task_title = self.details.get('task_title', '[Task Deleted]')
-        return f"{self.user} - {self.action} on '{task_title}' - {self.timestamp}"
\ No newline at end of file
+        return f"{self.user} - {self.action} on '{task_title}' - {self.timestamp}"
+
+
+class ActivityAudience(models.Model):
+    """
+    Fan-out of who can see an activity: one row per (activity, user),
+    written alongside the activity by log_activity.
+    """
+    activity = models.ForeignKey(Activity, on_delete=models.CASCADE, related_name='audience')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='activity_feed')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['activity', 'user'], name='activity_audience_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'activity'], name='audience_user_activity_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} <- activity {self.activity_id}"
+
+    @classmethod
+    def rows_for(cls, activity):
+        """Build (unsaved) audience rows: the actor plus the task's assignee."""
+        user_ids = {activity.user_id, activity.details.get('assigned_user_id')}
+        user_ids.discard(None)
+        return [
+            cls(activity_id=activity.id, user_id=user_id)
+            for user_id in sorted(user_ids)
+        ]
+
+
+class ActivityArchiveIndex(models.Model):
+    """
+    Where archived activities of a task live: one row per (archive file,
+    task), written by the archive_activity command (activity/archive.py) so
+    by_task can read a task's archived history without scanning files.
+    """
+    task_id = models.BigIntegerField()
+    # Name of the .ndjson.gz file in the archive storage
+    path = models.CharField(max_length=255)
+    day = models.DateField()
+    count = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task_id', 'day'], name='archive_task_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"Task {self.task_id}: {self.count} in {self.path}"
+
+
+class ActivityArchiveRun(models.Model):
+    """
+    One row per chunk archive_before() moves out. The newest id is the
+    archive generation in the feed ETags: archiving removes entries
+    without adding any, so the newest activity id alone can't show it.
+    """
+    timestamp = models.DateTimeField(default=timezone.now)
+    count = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.count} archived at {self.timestamp}"
@@ -0,0 +1,52 @@
+from asgiref.sync import sync_to_async
+
+from backend.pagination import KeysetCursorPagination
+
+
+class ActivityCursorPagination(KeysetCursorPagination):
+    """
+    Newest first by id, which is insertion order: an entry written late by
+    the activity buffer lands above a client's cursor, never behind it,
+    while keeping the time it was logged. Expects the `feed_id`
+    annotation from visible_to().
+    """
+    ordering = ('-feed_id',)
+    page_size = 20
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None, archived=None):
+        """
+        `archived`, if given, returns rows older than every row of
+        `queryset` (archived entries, newest first). The feed continues
+        into them: the same cursor pages through both, as one ordering.
+        """
+        rows = list(self._page_query(queryset, request))
+        if archived and self._needs_older(rows):
+            rows = self._continue(rows, archived())
+        return self._set_page(rows)
+
+    async def apaginate_queryset(self, queryset, request, view=None, archived=None):
+        rows = [row async for row in self._page_query(queryset, request)]
+        if archived and self._needs_older(rows):
+            # Archive files and their index are read in a worker thread
+            rows = self._continue(rows, await sync_to_async(archived)())
+        return self._set_page(rows)
+
+    def _needs_older(self, rows):
+        # A full forward page of hot rows never reaches the archive
+        return self._reverse or len(rows) <= self.page_size
+
+    def _continue(self, rows, older):
+        """The page's rows, nearest the cursor first, merged with `older` where they belong."""
+        position = self._position[0] if self._position is not None else None
+        if self._reverse:
+            # Nearest first is oldest first: archived entries newer than the cursor, then the hot rows
+            newer = [row for row in reversed(older) if row['feed_id'] > position]
+            return (newer + rows)[:self.page_size + 1]
+        if position is not None:
+            older = [row for row in older if row['feed_id'] < position]
+        return (rows + older)[:self.page_size + 1]
+
+
+class RecentActivityPagination(ActivityCursorPagination):
+    page_size = 50
@@ -1,10 +1,13 @@
 # activities/serializers.py
 
 from rest_framework import serializers
+from backend.fastpath import RowMapper, column, computed, iso_datetime
+from backend.fieldsets import SparseFieldsetMixin
+from backend.timing import TimedSerializerMixin
 from .models import Activity
 from users.serializers import UserSerializer # Assuming you have a simple UserSerializer
 
-class ActivitySerializer(serializers.ModelSerializer):
+class ActivitySerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     # Use the UserSerializer to represent the user who performed the action
     user = UserSerializer(read_only=True)
 
@@ -22,6 +25,11 @@ class ActivitySerializer(serializers.ModelSerializer):
             'changes',
             'task_info', # Use this field on the frontend
         ]
+        # Columns each field reads, for ?fields= / ?omit= (backend/fieldsets.py)
+        field_columns = {
+            'user': ('user__id', 'user__email', 'user__username', 'user__role'),
+            'task_info': ('task__id', 'task__title', 'details'),
+        }
 
     def get_task_info(self, obj):
         """
@@ -43,4 +51,27 @@ class ActivitySerializer(serializers.ModelSerializer):
                 'title': obj.details.get('task_title')
             }
         # If for some reason there are no details, return null
-        return None
\ No newline at end of file
+        return None
+
+
+def _user_row(user_id, email, username, role):
+    if user_id is None:
+        return None
+    return {'id': user_id, 'email': email, 'username': username, 'role': role}
+
+
+def _task_info_row(task_id, title, details):
+    # Same fallbacks as ActivitySerializer.get_task_info
+    if task_id is not None:
+        return {'id': task_id, 'title': title}
+    if 'task_title' in details:
+        return {'id': details.get('task_id'), 'title': details.get('task_title')}
+    return None
+
+
+# ActivitySerializer's output built from values() rows, for feeds (backend/fastpath.py)
+ACTIVITY_ROWS = RowMapper(ActivitySerializer, {
+    'user': computed(_user_row, 'user_id', 'user__email', 'user__username', 'user__role'),
+    'timestamp': column('timestamp', iso_datetime),
+    'task_info': computed(_task_info_row, 'task_id', 'task__title', 'details'),
+})
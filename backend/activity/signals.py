@@ -1,179 +1,100 @@
-from django.db.models.signals import post_save, pre_save, post_delete, pre_delete, m2m_changed
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+
 from tasks.models import Task
-from .models import Activity
-from django.contrib.auth import get_user_model
+from users.models import deleting_users
 from .middleware import get_current_user
+from .utils import build_activity, display_value, log_activities, log_activity, share_task_history
 
-User = get_user_model()
+# Per request context, like the current request (activity/middleware.py)
+_muted = ContextVar('activity_muted', default=False)
 
-# Store original task data before update/delete
-_task_pre_save_data = {}
-_task_pre_delete_data = {}
 
-
-@receiver(pre_save, sender=Task)
-def track_task_changes(sender, instance, **kwargs):
-    """Store original task data before save for comparison"""
-    if instance.pk:  # Only for updates, not new tasks
-        try:
-            original = Task.objects.get(pk=instance.pk)
-            _task_pre_save_data[instance.pk] = {
-                'status': original.status,
-                'priority': original.priority,
-                'title': original.title,
-                'description': original.description,
-                'deadline': original.deadline,
-            }
-        except Task.DoesNotExist:
-            pass
+@contextmanager
+def muted():
+    """Skip per-row logging while a bulk operation logs its own activities."""
+    token = _muted.set(True)
+    try:
+        yield
+    finally:
+        _muted.reset(token)
 
 
-@receiver(pre_delete, sender=Task)
-def track_task_deletion(sender, instance, **kwargs):
-    """Store task data before deletion"""
-    _task_pre_delete_data[instance.pk] = {
-        'title': instance.title,
-        'description': instance.description,
-        'status': instance.status,
-        'priority': instance.priority,
-    }
+def is_muted():
+    return _muted.get()
 
 
 @receiver(post_save, sender=Task)
-def log_task_activity(sender, instance, created, **kwargs):
-    """Log activity when task is created or updated"""
+def log_task_saved(sender, instance, created, **kwargs):
+    """
+    Single change-capture path for tasks: every save is diffed against the
+    values loaded with the instance (Task.get_field_changes), so no extra
+    SELECT is needed, and at most one activity is logged.
+    """
+    if is_muted():
+        return
     user = get_current_user()
+    if created:
+        user = user or instance.created_by
+        log_activity(
+            user=user,
+            action="CREATED",
+            task=instance,
+            description=f"Task '{instance.title}' created by {user.username if user else 'Unknown'}"
+        )
+        return
 
-    if not user and instance.created_by:
-        user = instance.created_by
+    changes = instance.get_field_changes()
+    if not changes:
+        return
+    username = user.username if user else 'Unknown'
 
-    if created:
-        # Task created
-        Activity.objects.create(
+    if 'assigned_user_id' in changes:
+        # The new assignee's feed should include the task's history
+        share_task_history([instance], instance.assigned_user_id)
+
+    if set(changes) == {'status'}:
+        old_status, new_status = changes['status']
+        log_activity(
+            user=user,
+            action="STATUS_CHANGED",
             task=instance,
+            description=f"Status changed from {old_status} to {new_status} by {username}",
+            changes={"from": old_status, "to": new_status}
+        )
+    else:
+        log_activity(
             user=user,
-            action='created',
-            description=f'Task "{instance.title}" was created by {user.username if user else "Unknown"}',
+            action="UPDATED",
+            task=instance,
+            description=f"Task '{instance.title}' updated by {username}",
             changes={
-                'status': instance.status,
-                'priority': instance.priority,
+                field: {'old': display_value(old), 'new': display_value(new)}
+                for field, (old, new) in changes.items()
             }
         )
-    else:
-        # Task updated - check what changed
-        original_data = _task_pre_save_data.get(instance.pk, {})
-        if original_data:
-            changes = {}
-            description_parts = []
-
-            # Check status change
-            if original_data.get('status') != instance.status:
-                changes['status'] = {
-                    'old': original_data.get('status'),
-                    'new': instance.status
-                }
-                description_parts.append(
-                    f"Status changed from '{original_data.get('status')}' to '{instance.status}'")
-
-            # Check priority change
-            if original_data.get('priority') != instance.priority:
-                changes['priority'] = {
-                    'old': original_data.get('priority'),
-                    'new': instance.priority
-                }
-                description_parts.append(
-                    f"Priority changed from '{original_data.get('priority')}' to '{instance.priority}'")
-
-            # Check title change
-            if original_data.get('title') != instance.title:
-                changes['title'] = {
-                    'old': original_data.get('title'),
-                    'new': instance.title
-                }
-                description_parts.append(f"Title changed")
-
-            # Check description change
-            if original_data.get('description') != instance.description:
-                changes['description'] = {
-                    'old': original_data.get('description'),
-                    'new': instance.description
-                }
-                description_parts.append(f"Description updated")
-
-            # Check deadline change
-            if original_data.get('deadline') != instance.deadline:
-                changes['deadline'] = {
-                    'old': str(original_data.get('deadline')),
-                    'new': str(instance.deadline)
-                }
-                description_parts.append(f"Deadline changed")
-
-            if changes:
-                action = 'status_changed' if 'status' in changes else 'updated'
-                Activity.objects.create(
-                    task=instance,
-                    user=user,
-                    action=action,
-                    description=f'Task "{instance.title}" updated by {user.username if user else "Unknown"}: {", ".join(description_parts)}',
-                    changes=changes
-                )
-
-            # Clean up stored data
-            if instance.pk in _task_pre_save_data:
-                del _task_pre_save_data[instance.pk]
 
 
 @receiver(post_delete, sender=Task)
-def log_task_deletion(sender, instance, **kwargs):
-    """Log activity when task is deleted"""
+def log_task_deleted(sender, instance, **kwargs):
+    """Log deletions; the activity keeps a snapshot since the task row is gone."""
+    if is_muted():
+        return
+    gone = deleting_users()
     user = get_current_user()
-
-    # Get stored task data from pre_delete
-    task_data = _task_pre_delete_data.get(instance.pk, {})
-    task_title = task_data.get('title', f'Task #{instance.pk}')
-
-    Activity.objects.create(
-        task=None,  # Task is deleted, so set to None
+    if user is not None and user.pk in gone:
+        user = None
+    activity = build_activity(
         user=user,
-        action='deleted',
-        description=f'Task "{task_title}" was deleted by {user.username if user else "Unknown"}',
-        changes={
-            'task_id': instance.pk,
-            'title': task_title,
-            'status': task_data.get('status'),
-            'priority': task_data.get('priority'),
-        }
+        action="DELETED",
+        task=instance,
+        task_deleted=True,
+        description=f"{user.username if user else 'Unknown'} deleted task '{instance.title}'"
     )
-
-    # Clean up stored data
-    if instance.pk in _task_pre_delete_data:
-        del _task_pre_delete_data[instance.pk]
-
-
-@receiver(m2m_changed, sender=Task.assigned_user.field)
-def log_task_assignment(sender, instance, action, pk_set, **kwargs):
-    """Log activity when users are assigned/unassigned to task"""
-    if action in ['post_add', 'post_remove']:
-        user = get_current_user()
-
-        if pk_set:
-            users = User.objects.filter(pk__in=pk_set)
-            user_names = ', '.join([u.username for u in users])
-
-            if action == 'post_add':
-                Activity.objects.create(
-                    task=instance,
-                    user=user,
-                    action='assigned',
-                    description=f'{user_names} assigned to task "{instance.title}" by {user.username if user else "Unknown"}',
-                    changes={'assigned_users': list(pk_set)}
-                )
-            elif action == 'post_remove':
-                Activity.objects.create(
-                    task=instance,
-                    user=user,
-                    action='unassigned',
-                    description=f'{user_names} unassigned from task "{instance.title}" by {user.username if user else "Unknown"}',
-                    changes={'unassigned_users': list(pk_set)}
-                )
+    if activity.details.get('assigned_user_id') in gone:
+        # No feed to fan out to
+        del activity.details['assigned_user_id']
+    log_activities([activity])
@@ -1,3 +1,632 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.http import HttpRequest
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from backend.changelists import estimate_rows
+from backend.events import get_broker
+from backend.testing import QueryBudgetTestCase
+from tasks.models import Task, TaskTombstone
+from users.models import User, deleting_users
+from users.serializers import TokenObtainPairWithClaimsSerializer
+from .archive import archive_before
+from .buffer import ActivityWriter, write_batch as real_write_batch
+from .middleware import ActivityMiddleware, get_current_user
+from .models import Activity, ActivityArchiveIndex, ActivityAudience
+from .serializers import ActivitySerializer
+from .utils import log_activity
+
+
+class ActivityFeedPaginationTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(email='admin@example.com', username='admin', password='pw', role='admin')
+        # bulk_create skips the post_save signal, so no CREATED entry is logged
+        self.task = Task.objects.bulk_create([Task(title='T', description='', assigned_user=self.admin, deadline=date.today())])[0]
+        Activity.objects.bulk_create([
+            Activity(user=self.admin, task=self.task if i % 2 else None, action='UPDATED', description=str(i))
+            for i in range(30)
+        ])
+        # The feed is ordered on id, whatever order the entries were timestamped in
+        for activity in Activity.objects.all():
+            Activity.objects.filter(pk=activity.pk).update(timestamp=timezone.now() - timedelta(minutes=activity.id % 7))
+        self.client.force_authenticate(self.admin)
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_list_walks_newest_first_without_duplicates(self):
+        ids = self.walk(reverse('activity-list') + '?page_size=7')
+        self.assertEqual(ids, list(Activity.objects.order_by('-id').values_list('id', flat=True)))
+
+    def test_by_task_is_paginated(self):
+        ids = self.walk(reverse('activity-by-task') + f'?task_id={self.task.id}&page_size=4')
+        self.assertEqual(len(ids), 15)
+        self.assertEqual(len(set(ids)), 15)
+
+    def test_by_task_requires_task_id(self):
+        response = self.client.get(reverse('activity-by-task'))
+        self.assertEqual(response.status_code, 400)
+
+    def test_recent_defaults_to_fifty_per_page(self):
+        response = self.client.get(reverse('activity-recent'))
+        self.assertEqual(len(response.data['results']), 30)
+        self.assertIsNone(response.data['next'])
+
+
+class ActivityQueryBudgetTests(QueryBudgetTestCase):
+    # Feeds: the ETag's newest id and archive generation (index lookups), then the page
+    def test_list(self):
+        self.assertQueryBudget(3, reverse('activity-list'), seed=self.seed_tasks)
+        self.assertQueryBudget(3, reverse('activity-list'), user=self.staff, seed=self.seed_tasks)
+
+    def test_recent(self):
+        self.assertQueryBudget(3, reverse('activity-recent'), user=self.staff, seed=self.seed_tasks)
+
+    def test_by_task(self):
+        task = self.seed_tasks(1)[0]
+        self.assertQueryBudget(3, reverse('activity-by-task') + f'?task_id={task.pk}', seed=self.seed_tasks)
+
+    def test_retrieve(self):
+        task = self.seed_tasks(1)[0]
+        self.assertQueryBudget(1, reverse('activity-detail', args=[task.activities.get().pk]))
+
+
+class StaffAudienceFeedTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(email='admin@example.com', username='admin', password='pw', role='admin')
+        self.staff = User.objects.create_user(email='staff@example.com', username='staff', password='pw')
+        self.other = User.objects.create_user(email='other@example.com', username='other', password='pw')
+        self.task, self.foreign = Task.objects.bulk_create([
+            Task(title='Mine', description='', assigned_user=self.staff, deadline=date.today()),
+            Task(title='Theirs', description='', assigned_user=self.other, deadline=date.today()),
+        ])
+
+    def feed_ids(self, user):
+        self.client.force_authenticate(user)
+        return [row['id'] for row in self.client.get(reverse('activity-list')).data['results']]
+
+    def test_feed_contains_assigned_and_own_actions_only(self):
+        assigned = log_activity(self.admin, 'CREATED', task=self.task, description='a')
+        own = log_activity(self.staff, 'STATUS_CHANGED', task=self.foreign, description='b')
+        log_activity(self.admin, 'CREATED', task=self.foreign, description='c')
+        self.assertEqual(self.feed_ids(self.staff), [own.id, assigned.id])
+
+    def test_deleted_task_stays_in_assignee_feed(self):
+        self.task.delete()
+        logged = Activity.objects.get(action='DELETED')
+        self.assertEqual(self.feed_ids(self.staff), [logged.id])
+
+    def test_reassignment_shares_task_history(self):
+        earlier = log_activity(self.admin, 'CREATED', task=self.foreign, description='x')
+        self.client.force_authenticate(self.admin)
+        self.client.patch(reverse('edit_task', args=[self.foreign.pk]), {'assigned_user': self.staff.pk}, format='json')
+        self.assertIn(earlier.id, self.feed_ids(self.staff))
+
+    def test_backfill_matches_previous_visibility_rules(self):
+        Activity.objects.bulk_create([
+            Activity(user=self.admin, task=self.task, action='CREATED', description='live'),
+            Activity(user=self.staff, action='UPDATED', description='own'),
+            Activity(user=self.admin, action='DELETED', description='snapshot', details={'assigned_user_id': self.staff.id}),
+            Activity(user=self.admin, task=self.foreign, action='CREATED', description='not visible'),
+            # The snapshot keeps a deleted assignee's id
+            Activity(user=None, action='DELETED', description='gone', details={'assigned_user_id': 10 ** 9}),
+        ])
+        call_command('backfill_activity_audience', batch_size=2, stdout=open('/dev/null', 'w'))
+        call_command('backfill_activity_audience', stdout=open('/dev/null', 'w'))
+        visible = set(Activity.objects.filter(audience__user=self.staff).values_list('description', flat=True))
+        self.assertEqual(visible, {'live', 'own', 'snapshot'})
+        self.assertEqual(ActivityAudience.objects.filter(user=self.staff).count(), 3)
+        self.assertFalse(ActivityAudience.objects.filter(activity__description='gone').exists())
+
+
+class BufferedActivityWriterTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(email='admin@example.com', username='admin', password='pw', role='admin')
+        self.staff = User.objects.create_user(email='staff@example.com', username='staff', password='pw')
+        self.task = Task.objects.bulk_create([Task(title='T', description='', assigned_user=self.staff, deadline=date.today())])[0]
+        # Long interval so only the test thread flushes
+        self.writer = ActivityWriter(max_batch=1000, flush_interval=3600)
+        self.addCleanup(self.writer.stop)
+
+    @override_settings(ACTIVITY_LOG_BUFFER={'ENABLED': True})
+    def test_log_activity_is_queued_until_flush(self):
+        with mock.patch('activity.utils.get_writer', return_value=self.writer):
+            with self.captureOnCommitCallbacks(execute=True):
+                for i in range(10):
+                    log_activity(self.admin, 'updated', task=self.task, description=str(i))
+        self.assertEqual(Activity.objects.count(), 0)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.writer.flush(), 10)
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(Activity.objects.filter(task=self.task).count(), 10)
+        self.assertEqual(ActivityAudience.objects.filter(user=self.staff).count(), 10)
+
+    def test_flush_drops_references_to_deleted_tasks(self):
+        queued = Activity(user=self.admin, task=self.task, action='DELETED', description='gone',
+                          details={'task_id': self.task.id, 'assigned_user_id': self.staff.id})
+        self.writer.add(queued)
+        self.task.delete()
+        self.writer.flush()
+        saved = Activity.objects.get(description='gone')
+        self.assertIsNone(saved.task_id)
+        self.assertTrue(ActivityAudience.objects.filter(activity=saved, user=self.staff).exists())
+
+    def test_failed_writes_are_retried(self):
+        writer = ActivityWriter(max_batch=1000, flush_interval=3600, max_attempts=2)
+        self.addCleanup(writer.stop)
+        for description in ('ok', 'poison'):
+            writer.add(Activity(user=self.admin, task=self.task, action='UPDATED', description=description))
+
+        def write_batch(activities):
+            if any(activity.description == 'poison' for activity in activities):
+                raise DatabaseError('write failed')
+            return real_write_batch(activities)
+
+        with mock.patch('activity.buffer.write_batch', side_effect=write_batch), self.assertLogs('activity.buffer'):
+            # The batch fails, so each entry is written alone and the failure is queued again
+            self.assertEqual(writer.flush(), 1)
+            self.assertEqual(len(writer._pending), 1)
+            self.assertEqual(writer.flush(), 0)
+        self.assertEqual(writer._pending, [])
+        self.assertEqual(list(Activity.objects.values_list('description', flat=True)), ['ok'])
+
+    def test_late_entries_keep_their_time_and_lead_the_feed(self):
+        logged = timezone.now() - timedelta(minutes=5)
+        newer = Activity.objects.create(user=self.admin, action='UPDATED', description='direct')
+        self.writer.add(Activity(user=self.admin, task=self.task, action='UPDATED', description='queued',
+                                 timestamp=logged, details={'assigned_user_id': self.staff.id}))
+        other = User.objects.create_user(email='other@example.com', username='other', password='pw')
+        Task.objects.filter(pk=self.task.pk).update(assigned_user=other)
+        self.writer.flush()
+        saved = Activity.objects.get(description='queued')
+        self.assertEqual(saved.timestamp, logged)
+        # Written after `newer`, so it is above any cursor that was issued in between
+        feed = Activity.objects.visible_to(self.admin).order_by('-feed_id')
+        self.assertEqual(list(feed.values_list('id', flat=True)[:2]), [saved.id, newer.id])
+        self.assertEqual(
+            set(ActivityAudience.objects.filter(activity=saved).values_list('user_id', flat=True)),
+            {self.admin.id, self.staff.id, other.id},
+        )
+
+
+class TaskChangeCaptureTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(email='admin@example.com', username='admin', password='pw', role='admin')
+        self.staff = User.objects.create_user(email='staff@example.com', username='staff', password='pw')
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(reverse('create_task'), {
+            'title': 'Plan', 'description': 'D', 'assigned_user': self.staff.pk, 'deadline': '2030-01-01',
+        }, format='json')
+        self.task = Task.objects.get(pk=response.data['id'])
+
+    def test_create_is_logged_once_by_request_user(self):
+        created = Activity.objects.get()
+        self.assertEqual((created.action, created.user), ('CREATED', self.admin))
+        self.assertEqual(created.description, "Task 'Plan' created by admin")
+
+    def test_status_change_logs_from_and_to(self):
+        self.client.force_authenticate(self.staff)
+        self.client.patch(reverse('update_task_status', args=[self.task.pk]), {'status': 'completed'}, format='json')
+        logged = Activity.objects.latest('id')
+        self.assertEqual(logged.action, 'STATUS_CHANGED')
+        self.assertEqual(logged.user, self.staff)
+        self.assertEqual(logged.changes, {'from': 'pending', 'to': 'completed'})
+
+    def test_edit_logs_field_diff_without_refetching(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.patch(reverse('edit_task', args=[self.task.pk]),
+                              {'title': 'Plan B', 'deadline': '2030-02-01'}, format='json')
+        logged = Activity.objects.latest('id')
+        self.assertEqual(logged.action, 'UPDATED')
+        self.assertEqual(logged.changes, {
+            'title': {'old': 'Plan', 'new': 'Plan B'},
+            'deadline': {'old': '2030-01-01', 'new': '2030-02-01'},
+        })
+        task_selects = [q for q in ctx.captured_queries if q['sql'].startswith('SELECT') and 'FROM "tasks_task"' in q['sql']]
+        self.assertEqual(len(task_selects), 1)
+
+    def test_unchanged_save_logs_nothing(self):
+        self.client.patch(reverse('edit_task', args=[self.task.pk]), {'title': 'Plan'}, format='json')
+        self.assertEqual(Activity.objects.count(), 1)
+
+    def test_delete_keeps_snapshot(self):
+        self.client.delete(reverse('delete_task', args=[self.task.pk]))
+        logged = Activity.objects.latest('id')
+        self.assertEqual(logged.action, 'DELETED')
+        self.assertIsNone(logged.task_id)
+        self.assertEqual(logged.description, "admin deleted task 'Plan'")
+        self.assertEqual(logged.details['assigned_user_id'], self.staff.id)
+
+    def test_deleting_a_user_deletes_their_tasks(self):
+        # The cascade's post_delete handlers must not point new rows at the users being deleted
+        other = User.objects.create_user(email='other@example.com', username='other', password='pw')
+        kept = Task.objects.create(title='Kept', description='D', assigned_user=other,
+                                   created_by=self.staff, deadline=date.today())
+        self.staff.delete()
+        self.assertFalse(Task.objects.filter(pk__in=[self.task.pk, kept.pk]).exists())
+        deleted = Activity.objects.filter(action='DELETED')
+        self.assertEqual(deleted.count(), 2)
+        # The deleted assignee's tombstone has no owner, so only admins see it
+        self.assertEqual(
+            dict(TaskTombstone.objects.values_list('task_id', 'user_id')),
+            {self.task.pk: None, kept.pk: other.pk},
+        )
+        self.assertEqual(ActivityAudience.objects.filter(activity__in=deleted).get().user, other)
+
+        self.admin.delete()
+        self.assertFalse(User.objects.filter(pk=self.admin.pk).exists())
+
+    def test_failed_user_delete_unmarks_the_user(self):
+        deletes = [self.staff.delete, User.objects.filter(pk=self.staff.pk).delete]
+        with mock.patch('tasks.signals.TaskTombstone.objects.create', side_effect=DatabaseError('failed')):
+            for delete in deletes:
+                with self.assertRaises(DatabaseError), transaction.atomic():
+                    delete()
+                self.assertEqual(deleting_users(), frozenset())
+        # Still a live user, so deleting their task keeps them in its audience
+        self.client.delete(reverse('delete_task', args=[self.task.pk]))
+        self.assertEqual(Activity.objects.latest('id').details['assigned_user_id'], self.staff.id)
+        self.assertEqual(TaskTombstone.objects.get().user, self.staff)
+
+
+class ActivityConditionalGetTests(QueryBudgetTestCase):
+    def test_feed_is_304_until_new_activity(self):
+        self.seed_tasks(2)
+        self.client.force_authenticate(self.staff)
+        etag = self.client.get(reverse('activity-list'))['ETag']
+        self.assertEqual(self.client.get(reverse('activity-list'), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.seed_tasks(1)
+        response = self.client.get(reverse('activity-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_renaming_a_user_changes_the_etag(self):
+        self.seed_tasks(1)
+        self.client.force_authenticate(self.staff)
+        etag = self.client.get(reverse('activity-list'))['ETag']
+        self.admin.username = 'renamed'
+        self.admin.save(update_fields=['username'])
+        response = self.client.get(reverse('activity-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['user']['username'], 'renamed')
+
+    def test_archiving_changes_the_etag_without_counting(self):
+        self.seed_tasks(2)
+        self.client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            etag = self.client.get(reverse('activity-list'))['ETag']
+        self.assertFalse([q['sql'] for q in ctx.captured_queries if 'COUNT(' in q['sql'].upper()])
+
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir)
+        with override_settings(ACTIVITY_RETENTION={'ARCHIVE_DIR': archive_dir}):
+            archive_before(Activity.objects.order_by('-timestamp').first().timestamp)
+        response = self.client.get(reverse('activity-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+
+@override_settings(EVENT_STREAM={**settings.EVENT_STREAM, 'BUFFER_SIZE': 3, 'KEEPALIVE': 0.05})
+class LiveEventStreamTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        get_broker.cache_clear()
+        self.broker = get_broker()
+
+    def tearDown(self):
+        get_broker.cache_clear()
+
+    def test_replay_resumes_after_last_event_id(self):
+        first = self.broker.publish('task', {'n': 1}, frozenset())
+        self.broker.publish('task', {'n': 2}, frozenset())
+        self.broker.publish('task', {'n': 3}, frozenset())
+        self.assertEqual([e.data['n'] for e in self.broker.replay(first.id)], [2, 3])
+        self.assertIsNone(self.broker.replay('0-1'))
+        # A fourth event evicts the first; resuming from before it is a gap
+        self.broker.publish('task', {'n': 4}, frozenset())
+        self.assertEqual(len(self.broker.replay(first.id)), 3)
+        self.assertIsNone(self.broker.replay(f'{self.broker.epoch}-0'))
+
+    def test_task_edit_publishes_scoped_events_on_commit(self):
+        task = self.seed_tasks(1)[0]
+        self.client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse('edit_task', args=[task.pk]), {'title': 'Renamed'}, format='json')
+        events = {e.type: e for e in self.broker.replay(f'{self.broker.epoch}-0')}
+        self.assertEqual(set(events), {'task', 'activity'})
+        self.assertEqual(events['task'].data['task']['title'], 'Renamed')
+        self.assertEqual(set(events['task'].data['task']), {'id', 'updated_at', 'title'})
+        self.assertTrue(all(e.visible_to(self.staff) for e in events.values()))
+        self.assertFalse(events['task'].visible_to(self.make_user()))
+
+    def test_task_save_publishes_without_loading_users(self):
+        task = Task.objects.get(pk=self.seed_tasks(1)[0].pk)
+        task.status = 'completed'
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as ctx:
+            task.save()
+        self.assertFalse(any('users_user' in q['sql'] for q in ctx.captured_queries))
+        [event] = [e for e in self.broker.replay(f'{self.broker.epoch}-0') if e.type == 'task']
+        self.assertEqual(event.data, {
+            'action': 'updated', 'task': {'id': task.id, 'updated_at': task.updated_at, 'status': 'completed'},
+        })
+
+    async def read(self, user, last_event_id):
+        token = await sync_to_async(TokenObtainPairWithClaimsSerializer.get_token)(user)
+        response = await self.async_client.get(
+            reverse('events'), {'token': str(token.access_token)},
+            headers={'Last-Event-ID': last_event_id},
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = []
+        async for chunk in response.streaming_content:
+            chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+            if chunk.startswith(': keepalive'):
+                break
+            chunks.append(chunk)
+        await response.streaming_content.aclose()
+        return ''.join(chunks)
+
+    async def test_stream_replays_only_visible_events(self):
+        other = await sync_to_async(self.make_user)()
+        start = self.broker.publish('task', {'n': 0}, frozenset())
+        self.broker.publish('task', {'n': 1}, frozenset({self.staff.id}))
+        self.broker.publish('task', {'n': 2}, frozenset({other.id}))
+
+        body = await self.read(self.staff, start.id)
+        self.assertIn('retry: ', body)
+        self.assertIn('data: {"n":1}', body)
+        self.assertNotIn('"n":2', body)
+        self.assertIn('"n":2', await self.read(self.admin, start.id))
+        self.assertIn('event: reset', await self.read(self.staff, 'stale-1'))
+
+    async def test_stream_requires_token(self):
+        response = await self.async_client.get(reverse('events'))
+        self.assertEqual(response.status_code, 401)
+
+
+class ActivityArchiveTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        retention = override_settings(ACTIVITY_RETENTION={'HOT_DAYS': 30, 'ARCHIVE_DIR': self.archive_dir, 'CHUNK_SIZE': 2})
+        retention.enable()
+        self.addCleanup(retention.disable)
+
+    def age(self, activities, days):
+        old = timezone.now() - timedelta(days=days)
+        ids = [a.id for a in activities]
+        Activity.objects.filter(id__in=ids).update(timestamp=old)
+
+    def test_archives_old_entries_in_chunks(self):
+        tasks = self.seed_tasks(5)
+        self.age(Activity.objects.filter(task__in=tasks[:3]), days=40)
+        out = StringIO()
+        call_command('archive_activity', stdout=out)
+
+        self.assertEqual(Activity.objects.count(), 2)
+        self.assertEqual(ActivityAudience.objects.filter(activity__isnull=True).count(), 0)
+        self.assertEqual(ActivityArchiveIndex.objects.count(), 3)
+        files = [p for p in Path(self.archive_dir).rglob('*.ndjson.gz')]
+        self.assertEqual(len(files), 2)  # chunks of 2 and 1
+        with gzip.open(files[0]) as archive:
+            record = json.loads(archive.readline())
+        self.assertEqual(set(record['audience']), {self.admin.id, self.staff.id})
+
+    def test_dry_run_keeps_everything(self):
+        self.age(Activity.objects.filter(task__in=self.seed_tasks(2)), days=40)
+        call_command('archive_activity', '--dry-run', stdout=StringIO())
+        self.assertEqual(Activity.objects.count(), 2)
+        self.assertFalse(ActivityArchiveIndex.objects.exists())
+
+    def test_by_task_reads_archived_history_on_request(self):
+        task = self.seed_tasks(1)[0]
+        self.age(task.activities.all(), days=40)
+        call_command('archive_activity', stdout=StringIO())
+        task = Task.objects.get(id=task.id)
+        task.title = 'Renamed'
+        task.save()  # a new, hot UPDATED entry
+
+        self.client.force_authenticate(self.staff)
+        url = reverse('activity-by-task')
+        hot = self.client.get(url, {'task_id': task.id}).data['results']
+        self.assertEqual([a['action'] for a in hot], ['UPDATED'])
+
+        both = self.client.get(url, {'task_id': task.id, 'include_archived': 'true'}).data['results']
+        self.assertEqual([a['action'] for a in both], ['UPDATED', 'CREATED'])
+        self.assertTrue(both[1]['archived'])
+        self.assertEqual(both[1]['task_info'], {'id': task.id, 'title': 'Renamed'})
+        self.assertEqual(both[1]['user']['id'], self.admin.id)
+
+        self.client.force_authenticate(self.make_user())
+        outsider = self.client.get(url, {'task_id': task.id, 'include_archived': 'true'}).data['results']
+        self.assertEqual(outsider, [])
+
+    def test_archived_history_is_paginated_with_the_feed(self):
+        task = self.seed_tasks(1)[0]
+        for i in range(3):
+            log_activity(self.admin, 'UPDATED', task=task, description=f'old {i}')
+        self.age(task.activities.all(), days=40)
+        call_command('archive_activity', stdout=StringIO())
+        log_activity(self.admin, 'UPDATED', task=task, description='hot')
+
+        self.client.force_authenticate(self.staff)
+        url = reverse('activity-by-task') + f'?task_id={task.id}&include_archived=true&page_size=2'
+        pages = []
+        while url:
+            data = self.client.get(url).data
+            pages.append(data['results'])
+            url = data['next']
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        entries = [entry for page in pages for entry in page]
+        self.assertEqual([e['description'] for e in entries][:2], ['hot', 'old 2'])
+        self.assertEqual([bool(e.get('archived')) for e in entries], [False] + [True] * 4)
+        # Archived timestamps are rendered like hot ones (full precision)
+        for entry in entries:
+            self.assertRegex(entry['timestamp'], r'\.\d{6}Z$')
+
+        previous = self.client.get(data['previous']).data['results']
+        self.assertEqual(previous, pages[1])
+
+
+class ActivityExportTests(QueryBudgetTestCase):
+    def test_export_follows_feed_visibility(self):
+        mine = self.seed_tasks(2)
+        self.seed_tasks(2, assigned_user=self.make_user())
+        self.client.force_authenticate(self.staff)
+        url = reverse('activity-export')
+
+        response = self.client.get(url, {'output': 'ndjson'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(sorted(row['task_id'] for row in rows), [task.id for task in mine])
+        self.assertEqual(rows[0]['user__username'], self.admin.username)
+        self.assertEqual(rows[0]['details']['task_title'], mine[0].title)
+
+        response = self.client.get(url, {'task_id': mine[1].id})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,timestamp,action,description,user_id,user__username,task_id,changes,details')
+        self.assertEqual(len(lines), 2)
+
+
+class ActivitySparseFieldsetTests(QueryBudgetTestCase):
+    def test_fields_trim_the_feed_and_its_joins(self):
+        self.seed_tasks(2)
+        self.client.force_authenticate(self.staff)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('activity-list'), {'fields': 'id,action,task_info'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'action', 'task_info'})
+        sql = ctx.captured_queries[-1]['sql']
+        self.assertIn('tasks_task', sql)
+        self.assertNotIn('users_user', sql)
+        self.assertNotIn('"description"', sql)
+
+
+class ActivityFastPathTests(QueryBudgetTestCase):
+    def test_feed_bytes_match_the_serializer(self):
+        tasks = self.seed_tasks(3)
+        log_activity(None, 'COMMENT_ADDED', task=tasks[0], description='No actor \u2028')
+        Task.objects.get(id=tasks[1].id).delete()  # task_info from the snapshot
+        self.client.force_authenticate(self.admin)
+
+        response = self.client.get(reverse('activity-list'))
+        activities = Activity.objects.visible_to(self.admin).for_feed().order_by('-feed_id')
+        expected = dict(response.data, results=ActivitySerializer(activities, many=True).data)
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+
+
+class AsyncActivityViewTests(QueryBudgetTestCase):
+    async def test_current_user_is_per_request_under_asgi(self):
+        """Concurrent requests share the event loop thread; each must see its own user."""
+        async def view(request):
+            await asyncio.sleep(0)  # let the other request start
+            return await sync_to_async(get_current_user)()
+
+        middleware = ActivityMiddleware(view)
+        requests = [HttpRequest(), HttpRequest()]
+        requests[0].user, requests[1].user = self.staff, self.admin
+        users = await asyncio.gather(*(middleware(request) for request in requests))
+        self.assertEqual(users, [self.staff, self.admin])
+        self.assertIsNone(get_current_user())
+
+    def test_async_reads_match_the_sync_viewset(self):
+        tasks = self.seed_tasks(4)
+        activity = Activity.objects.order_by('id').first()
+        requests = [
+            ('activity-list', [], {'page_size': 2}),
+            ('activity-list', [], {'fields': 'id,action'}),
+            ('activity-recent', [], {}),
+            ('activity-by-task', [], {'task_id': tasks[0].id}),
+            ('activity-by-task', [], {'task_id': tasks[0].id, 'include_archived': 'true', 'page_size': 1}),
+            ('activity-by-task', [], {'task_id': 'x'}),
+            ('activity-detail', [activity.id], {}),
+        ]
+        for user in (self.admin, self.staff, self.make_user()):
+            self.client.force_authenticate(user)
+            for name, args, params in requests:
+                sync = self.client.get(reverse(name, args=args), params)
+                async_ = self.client.get(reverse(f'async-{name}', args=args), params)
+                self.assertEqual(async_.status_code, sync.status_code, name)
+                self.assertEqual(async_.content.replace(b'/api/async/', b'/api/'), sync.content, name)
+
+
+class ActivityAdminTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin.is_staff = self.admin.is_superuser = True
+        self.admin.save()
+        self.client.force_login(self.admin)
+
+    def changelist(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('admin:activity_activity_changelist'), params)
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in ctx.captured_queries]
+
+    def test_changelist_queries_do_not_scan_the_table(self):
+        counts = []
+        for size in (2, 25):
+            self.seed_tasks(size)
+            response, queries = self.changelist()
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        # No DISTINCT dates for the drill-down, no listing of every user for the filter
+        self.assertFalse([sql for sql in queries if 'DISTINCT' in sql.upper()])
+        self.assertFalse([sql for sql in queries if 'FROM "users_user"' in sql and 'WHERE' not in sql])
+        self.assertContains(response, str(timezone.now().year))
+
+    def test_filters_and_search(self):
+        other = self.make_user()
+        tasks = self.seed_tasks(2)
+        Activity.objects.create(user=other, task=tasks[0], action='UPDATED', description='Edited')
+        Task.objects.create(title='Quarterly budget', description='D', assigned_user=self.staff,
+                            deadline=date.today())
+
+        response, _ = self.changelist(user=other.email)
+        self.assertEqual([row.user_id for row in response.context['cl'].result_list], [other.id])
+        response, _ = self.changelist(task=tasks[1].id)
+        self.assertEqual({row.task_id for row in response.context['cl'].result_list}, {tasks[1].id})
+        response, _ = self.changelist(q='quarterly')
+        self.assertEqual({row.task.title for row in response.context['cl'].result_list}, {'Quarterly budget'})
+        response, _ = self.changelist(q=other.username)
+        self.assertEqual([row.user_id for row in response.context['cl'].result_list], [other.id])
+
+    def test_counts_stop_at_the_limit(self):
+        self.seed_tasks(5)
+        with mock.patch('backend.changelists.EstimatedCountPaginator.count_limit', 3):
+            response, _ = self.changelist(action='CREATED')
+        self.assertEqual(response.context['cl'].result_count, 3)
+        self.assertContains(response, 'The total is an estimate')
+
+    @skipUnless(connection.vendor == 'sqlite', 'reads sqlite_stat1')
+    def test_row_estimate_reads_the_index_stats(self):
+        self.seed_tasks(5)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        # activity_activity has indexes, so ANALYZE writes no idx IS NULL row for it
+        self.assertEqual(estimate_rows(Activity, 'default'), Activity.objects.count())
@@ -1,26 +1,95 @@
 # activity/utils.py
 
-from .models import Activity
+from django.db import transaction
 
-def log_activity(user, action, task=None, description="", changes=None):
+from .buffer import buffer_settings, get_writer
+from .events import publish_activities
+from .models import Activity, ActivityAudience
+
+def build_activity(user, action, task=None, description="", changes=None, task_deleted=False):
     """
-    A centralized function to create activity logs.
+    Build an unsaved activity log entry.
     It captures a snapshot of the task's details, including the assigned user.
+
+    Pass task_deleted=True when the task row is already gone: only the
+    snapshot is kept and the entry is not linked to the task.
     """
     details = {}
     if task:
         # Create a snapshot of the task's current state
         details['task_id'] = task.id
         details['task_title'] = task.title
-        # ✅ ADD THIS: Save the assigned user's ID in the snapshot
-        if task.assigned_user:
-            details['assigned_user_id'] = task.assigned_user.id
+        # assigned_user_id avoids loading the user just for its id
+        if task.assigned_user_id:
+            details['assigned_user_id'] = task.assigned_user_id
 
-    Activity.objects.create(
+    return Activity(
         user=user,
         action=action.upper(),
-        task=task,
+        task=None if task_deleted else task,
         description=description,
         changes=changes or {},
         details=details # Save the enhanced snapshot
-    )
\ No newline at end of file
+    )
+
+
+def display_value(value):
+    """JSON-safe form of a tracked value (dates become ISO strings)."""
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def log_activity(user, action, task=None, description="", changes=None, task_deleted=False):
+    """
+    A centralized function to create activity logs (see build_activity)
+    and fan them out to the feeds of the actor and the assignee.
+
+    With ACTIVITY_LOG_BUFFER['ENABLED'] the entry is handed to the
+    background writer once the surrounding transaction commits, and the
+    returned Activity is not saved yet.
+    """
+    activity = build_activity(user, action, task, description, changes, task_deleted)
+
+    if buffer_settings()['ENABLED']:
+        transaction.on_commit(lambda: get_writer().add(activity))
+        return activity
+
+    activity.save()
+    ActivityAudience.objects.bulk_create(ActivityAudience.rows_for(activity))
+    publish_activities([activity])
+    return activity
+
+
+def log_activities(activities):
+    """
+    Save many built activities at once: one INSERT for the entries and one
+    for their audience rows (or a hand-off to the buffered writer).
+    """
+    if buffer_settings()['ENABLED']:
+        def enqueue():
+            writer = get_writer()
+            for activity in activities:
+                writer.add(activity)
+        transaction.on_commit(enqueue)
+        return activities
+
+    Activity.objects.bulk_create(activities)
+    ActivityAudience.objects.bulk_create(
+        [row for activity in activities for row in ActivityAudience.rows_for(activity)]
+    )
+    publish_activities(activities)
+    return activities
+
+
+def share_task_history(tasks, user_id):
+    """
+    Add the existing activities of tasks to user_id's feed, e.g. when they
+    are reassigned to them, so they see their full history like before.
+    """
+    ActivityAudience.objects.bulk_create(
+        [
+            ActivityAudience(activity_id=activity_id, user_id=user_id)
+            for activity_id in Activity.objects.filter(task__in=tasks).values_list('id', flat=True)
+        ],
+        ignore_conflicts=True,
+        batch_size=500,
+    )
@@ -1,51 +1,155 @@
 # activities/views.py
 
+from django.db.models import Max
+from django.shortcuts import aget_object_or_404
+from django.utils.functional import cached_property
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
+from backend.asyncviews import AsyncViewSetMixin
+from backend.conditional import make_etag, not_modified, set_validators
+from backend.export import export_response
+from backend.fieldsets import only_fields, requested_fields
+from tasks import cache as task_cache
+from . import archive
+from .archive import archived_for_task
 from .models import Activity
-from .serializers import ActivitySerializer
+from .pagination import ActivityCursorPagination, RecentActivityPagination
+from .serializers import ACTIVITY_ROWS, ActivitySerializer
 
 
 class ActivityViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ActivitySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ActivityCursorPagination
+
+    @cached_property
+    def fields(self):
+        """Fields picked by ?view= / ?fields= / ?omit= (backend/fieldsets.py)"""
+        return requested_fields(self.request, ActivitySerializer, collection=self.action != 'retrieve')
 
     def get_queryset(self):
-        user = self.request.user
+        """
+        Admins see every log, staff their own (see ActivityQuerySet.visible_to),
+        reading only the columns of the requested fields
+        """
+        queryset = Activity.objects.visible_to(self.request.user).order_by('-feed_id')
+        return only_fields(queryset, ActivitySerializer, self.fields, also=('id',))
 
-        # Admin sees all activity logs
-        if user.role == 'admin':
-            return Activity.objects.all().order_by('-timestamp')
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.fields)
+        return super().get_serializer(*args, **kwargs)
 
-        # ✅ UPDATED STAFF LOGIC:
-        # Staff sees logs for tasks assigned to them (live or deleted)
-        # OR actions they performed themselves.
-        return Activity.objects.filter(
-            Q(task__assigned_user=user) |         # Case 1: The task still exists and is assigned to them.
-            Q(user=user) |                       # Case 2: They were the one who performed the action.
-            Q(details__assigned_user_id=user.id) # Case 3: The task is deleted, but the log's snapshot shows it was assigned to them.
-        ).distinct().order_by('-timestamp')
+    def feed_response(self, queryset, archived=None):
+        """
+        Paginate and serialize a feed. Entries are only ever added, or
+        removed by archiving, so the ETag is the newest visible activity
+        id plus the archive generation, and the user-rename counter for
+        the usernames it shows (tasks/cache.py). None of them counts or
+        scans the feed: an unchanged poll gets a 304 with no body.
 
-    @action(detail=False, methods=['get'])
+        `archived`, if given, returns archived entries; the feed continues
+        into them after its last hot row (ActivityCursorPagination).
+        """
+        newest = queryset.order_by().aggregate(newest=Max('id'))['newest']
+        etag = make_etag(self.request, newest, archive.generation(), task_cache.global_version())
+        unchanged = not_modified(self.request, etag)
+        if unchanged:
+            return unchanged
+
+        page = self.paginator.paginate_queryset(self.feed_rows(queryset), self.request, view=self, archived=archived)
+        return set_validators(self.get_paginated_response(self.render_page(page)), etag)
+
+    def feed_rows(self, queryset):
+        """values() rows rendered like ActivitySerializer (backend/fastpath.py)"""
+        return queryset.values(*ACTIVITY_ROWS.columns(self.fields, also=self.paginator.ordering))
+
+    def render_page(self, page):
+        data = ACTIVITY_ROWS.render(page, self.fields)
+        for row, entry in zip(page, data):
+            if row.get('archived'):
+                entry['archived'] = True
+        return data
+
+    def list(self, request, *args, **kwargs):
+        return self.feed_response(self.filter_queryset(self.get_queryset()))
+
+    @action(detail=False, methods=['get'], pagination_class=RecentActivityPagination)
     def recent(self, request):
-        """Get recent activity logs (last 50)"""
-        queryset = self.get_queryset()[:50]
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        """Get recent activity logs (50 per page)"""
+        return self.feed_response(self.get_queryset())
 
     @action(detail=False, methods=['get'])
     def by_task(self, request):
         """Get activity logs filtered by task_id"""
         task_id = request.query_params.get('task_id')
-        if not task_id:
-            return Response(
-                {'error': 'task_id parameter is required'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        if not task_id or not task_id.isdigit():
+            return self.task_id_required()
+        return self.feed_response(*self.task_feed(request, int(task_id)))
+
+    @staticmethod
+    def task_id_required():
+        return Response(
+            {'error': 'task_id parameter is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
+    def task_feed(self, request, task_id):
+        """feed_response() arguments for by_task"""
         queryset = self.get_queryset().filter(task_id=task_id)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        if request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes'):
+            # History moved out by archive_activity (activity/archive.py)
+            return queryset, lambda: archived_for_task(task_id, request.user)
+        return queryset, None
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Download the caller's feed as CSV or NDJSON (?output=, ?gzip=; see backend/export.py)"""
+        queryset = Activity.objects.visible_to(request.user)
+        task_id = request.query_params.get('task_id')
+        if task_id:
+            if not task_id.isdigit():
+                return Response({'error': 'task_id must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(task_id=task_id)
+        return export_response(request, queryset.for_export(), 'activity')
+
+
+class AsyncActivityViewSet(AsyncViewSetMixin, ActivityViewSet):
+    """
+    ActivityViewSet with the reads on the async ORM (backend/asyncviews.py),
+    served under /api/async/ by the ASGI application. Export stays sync.
+    """
+
+    async def feed_response(self, queryset, archived=None):
+        newest = (await queryset.order_by().aaggregate(newest=Max('id')))['newest']
+        etag = make_etag(self.request, newest, await archive.ageneration(), await task_cache.aglobal_version())
+        unchanged = not_modified(self.request, etag)
+        if unchanged:
+            return unchanged
+
+        page = await self.paginator.apaginate_queryset(
+            self.feed_rows(queryset), self.request, view=self, archived=archived,
+        )
+        return set_validators(self.get_paginated_response(self.render_page(page)), etag)
+
+    async def list(self, request, *args, **kwargs):
+        return await self.feed_response(self.filter_queryset(self.get_queryset()))
+
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await aget_object_or_404(self.filter_queryset(self.get_queryset()), pk=kwargs['pk'])
+        self.check_object_permissions(request, instance)
+        return Response(self.get_serializer(instance).data)
+
+    @action(detail=False, methods=['get'], pagination_class=RecentActivityPagination)
+    async def recent(self, request):
+        """Get recent activity logs (50 per page)"""
+        return await self.feed_response(self.get_queryset())
+
+    @action(detail=False, methods=['get'])
+    async def by_task(self, request):
+        """Get activity logs filtered by task_id"""
+        task_id = request.query_params.get('task_id')
+        if not task_id or not task_id.isdigit():
+            return self.task_id_required()
+        return await self.feed_response(*self.task_feed(request, int(task_id)))
@@ -9,8 +9,17 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
+from backend.dbpool import warm_up
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+# Tells dbpool.configure not to default to persistent connections
+os.environ.setdefault("DJANGO_ASGI", "true")
 
 application = get_asgi_application()
+
+# Open database connections now rather than in the first request
+if settings.DATABASE_POOL['WARM_UP']:
+    warm_up()
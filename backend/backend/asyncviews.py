@@ -0,0 +1,98 @@
+"""
+Async DRF views.
+
+DRF's APIView.dispatch is synchronous, so under ASGI every API request
+holds a worker thread for its whole duration, including time spent
+waiting on the database. The classes here dispatch to coroutine handlers
+instead; handlers query with Django's async ORM (aget, aaggregate,
+`async for`, apaginate_queryset) and the request only occupies the event
+loop while it is doing work.
+
+    @async_api_view(['GET'])
+    async def task_detail(request, pk): ...
+
+    class AsyncActivityViewSet(AsyncViewSetMixin, ActivityViewSet):
+        async def list(self, request): ...
+
+Authentication, permissions and error handling are DRF's. Reads are
+authenticated inline (ClaimsJWTAuthentication trusts the token's claims,
+no query); writes load the user, so their checks run in a worker thread,
+as do reads whose authentication turns out to need the database.
+Handlers that are still synchronous (inherited actions) run in a worker
+thread as well. JSON responses are rendered before returning, so Django
+doesn't hand rendering to a thread either.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.exceptions import SynchronousOnlyOperation
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class AsyncDispatchMixin:
+    async def ainitial(self, request, *args, **kwargs):
+        """initial() (authentication, permissions, throttling), in a worker thread if it needs the database."""
+        if request.method in SAFE_METHODS:
+            try:
+                return self.initial(request, *args, **kwargs)
+            except SynchronousOnlyOperation:  # e.g. a token without role claims: the user is loaded
+                pass
+        await sync_to_async(self.initial)(request, *args, **kwargs)
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        if isinstance(self.response, Response) and request.accepted_renderer.format == 'json':
+            self.response.render()
+        return self.response
+
+
+class AsyncAPIView(AsyncDispatchMixin, APIView):
+    """APIView whose get/post/... handlers are coroutines."""
+
+
+class AsyncViewSetMixin(AsyncDispatchMixin):
+    """For viewsets: list/retrieve/actions may be coroutines."""
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        # ViewSetMixin's view function is plain def; it returns dispatch()'s coroutine
+        return markcoroutinefunction(view)
+
+
+def async_api_view(http_method_names, permission_classes=None):
+    """
+    @api_view for coroutines: turns `async def view(request, ...)` into an
+    AsyncAPIView serving the given methods.
+    """
+    def decorator(func):
+        async def handler(self, request, *args, **kwargs):
+            return await func(request, *args, **kwargs)
+
+        attrs = {method.lower(): handler for method in http_method_names}
+        attrs['__doc__'] = func.__doc__
+        attrs['__module__'] = func.__module__
+        if permission_classes is not None:
+            attrs['permission_classes'] = permission_classes
+        return type(func.__name__, (AsyncAPIView,), attrs).as_view()
+    return decorator
@@ -0,0 +1,245 @@
+"""
+Admin changelists for large tables.
+
+The stock changelist is built for small tables. Every page load on a
+table with millions of rows pays for:
+
+    - a full COUNT(*), and a second one for "N total" when filtered
+    - RelatedFieldListFilter, which lists every row of the related table
+    - date_hierarchy, which finds the dates to offer with DISTINCT over
+      every matching row
+    - search_fields, which OR together icontains across joins
+
+LargeTableAdminMixin swaps these for index-backed alternatives:
+
+    - EstimatedCountPaginator reads the planner's row estimate for the
+      unfiltered list, and stops counting a filtered list at count_limit
+    - InputFilter is a text box (e.g. a username) resolved with indexed
+      lookups, in place of a link for every related row
+    - the date drill-down offers every year/month/day between the first
+      and last dates, which are two index seeks. A link may lead to an
+      empty page; the filter itself is a range over the field's index
+    - facets are off, and so is the full result count
+
+Searches that should use an index override get_search_results on the
+ModelAdmin (see tasks/admin.py).
+"""
+import calendar
+import datetime
+
+from django.contrib import admin
+from django.contrib.admin.utils import get_fields_from_path
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections, models
+from django.db.models import Q
+from django.http import QueryDict
+from django.utils import formats, timezone
+from django.utils.functional import cached_property
+from django.utils.text import capfirst
+from django.utils.translation import gettext_lazy as _
+
+from users.models import User
+
+
+def estimate_rows(model, using):
+    """The planner's estimate of the table's row count, or None when there isn't one."""
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # -1 until the table has been vacuumed or analyzed
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            elif connection.vendor == 'sqlite':
+                # Written by ANALYZE: one row per index (idx is NULL only for a
+                # table without any), each starting with the table's row count
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+                if cursor.fetchone() is None:
+                    return None
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    rows = int(str(row[0]).split()[0])
+    return rows if rows >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A Paginator that never counts a whole large table. The unfiltered
+    list is counted by the planner's estimate. Other lists are counted up
+    to count_limit rows (SELECT COUNT(*) FROM (... LIMIT n)), which is
+    exact for narrow filters. Either way `estimated` is set, so the
+    changelist can say so.
+    """
+    count_limit = 10_000
+
+    estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            rows = estimate_rows(queryset.model, queryset.db)
+            if rows is not None and rows > self.count_limit:
+                self.estimated = True
+                return rows
+        count = queryset.order_by().values('pk')[:self.count_limit + 1].count()
+        if count > self.count_limit:
+            self.estimated = True
+            return self.count_limit
+        return count
+
+
+class InputFilter(admin.SimpleListFilter):
+    """
+    A list filter rendered as a text box, for columns with too many
+    values to offer a link for each. Subclasses set title and
+    parameter_name and implement queryset().
+    """
+    template = 'admin/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def choices(self, changelist):
+        # A single "All" choice: its link clears the filter, and the
+        # template submits the rest of the query string with the box
+        query = QueryDict(changelist.get_query_string(remove=[self.parameter_name, PAGE_VAR])[1:])
+        yield {
+            'selected': self.value() is None,
+            'query_string': changelist.get_query_string(remove=[self.parameter_name]),
+            'display': _('All'),
+            'hidden': [(key, value) for key, values in query.lists() for value in values],
+        }
+
+
+class UserFilter(InputFilter):
+    """Filter `field_name` (a foreign key to User) by email, username or id."""
+    title = _('user')
+    parameter_name = 'user'
+    field_name = 'user'
+
+    def queryset(self, request, queryset):
+        value = (self.value() or '').strip()
+        if not value:
+            return None
+        users = Q(email=value) | Q(username=value)
+        if value.isdigit():
+            users |= Q(id=int(value))
+        return queryset.filter(**{f'{self.field_name}__in': User.objects.filter(users).values('id')})
+
+
+class LargeTableChangeList(ChangeList):
+    def date_drilldown(self):
+        """
+        Context for admin/date_hierarchy.html, as the date_hierarchy
+        template tag builds it, with the choices derived from the first
+        and last dates instead of a DISTINCT over the matching rows.
+        """
+        field_name = self.date_hierarchy
+        field = get_fields_from_path(self.model, field_name)[-1]
+        year_field, month_field, day_field = (f'{field_name}__{part}' for part in ('year', 'month', 'day'))
+        year, month, day = (self.params.get(name) for name in (year_field, month_field, day_field))
+
+        def link(filters):
+            return self.get_query_string(filters, [f'{field_name}__'])
+
+        first, last = self.date_bounds(field)
+        if first is None:
+            return {'show': False}
+        if not year:
+            if first.year == last.year:
+                year = first.year
+                if first.month == last.month:
+                    month = first.month
+
+        try:
+            year = int(year) if year else None
+            month = int(month) if month else None
+            day = int(day) if day else None
+            if day:
+                selected = datetime.date(year, month, day)
+            elif month:
+                datetime.date(year, month, 1)
+        except (TypeError, ValueError):
+            # Django has already rejected the lookup; show the years
+            year = month = day = None
+
+        if day:
+            return {
+                'show': True,
+                'back': {
+                    'link': link({year_field: year, month_field: month}),
+                    'title': capfirst(formats.date_format(selected, 'YEAR_MONTH_FORMAT')),
+                },
+                'choices': [{'title': capfirst(formats.date_format(selected, 'MONTH_DAY_FORMAT'))}],
+            }
+        if month:
+            start = first.day if (year, month) == (first.year, first.month) else 1
+            end = last.day if (year, month) == (last.year, last.month) else calendar.monthrange(year, month)[1]
+            return {
+                'show': True,
+                'back': {'link': link({year_field: year}), 'title': str(year)},
+                'choices': [
+                    {
+                        'link': link({year_field: year, month_field: month, day_field: number}),
+                        'title': capfirst(formats.date_format(datetime.date(year, month, number), 'MONTH_DAY_FORMAT')),
+                    }
+                    for number in range(start, end + 1)
+                ],
+            }
+        if year:
+            start = first.month if year == first.year else 1
+            end = last.month if year == last.year else 12
+            return {
+                'show': True,
+                'back': {'link': link({}), 'title': _('All dates')},
+                'choices': [
+                    {
+                        'link': link({year_field: year, month_field: number}),
+                        'title': capfirst(formats.date_format(datetime.date(year, number, 1), 'YEAR_MONTH_FORMAT')),
+                    }
+                    for number in range(start, end + 1)
+                ],
+            }
+        return {
+            'show': True,
+            'back': None,
+            'choices': [
+                {'link': link({year_field: str(number)}), 'title': str(number)}
+                for number in range(first.year, last.year + 1)
+            ],
+        }
+
+    def date_bounds(self, field):
+        """The first and last values of the date_hierarchy field, each one index seek."""
+        values = self.root_queryset.filter(**{f'{self.date_hierarchy}__isnull': False}).values_list(
+            self.date_hierarchy, flat=True,
+        )
+        first = values.order_by(self.date_hierarchy).first()
+        last = values.order_by(f'-{self.date_hierarchy}').first()
+        if first is None or last is None:
+            return None, None
+        if isinstance(field, models.DateTimeField):
+            first, last = (timezone.localtime(value) if timezone.is_aware(value) else value for value in (first, last))
+        return first, last
+
+
+class LargeTableAdminMixin:
+    """ModelAdmin settings for tables too large to count or scan per page load."""
+    change_list_template = 'admin/large_change_list.html'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+    def get_changelist(self, request, **kwargs):
+        return LargeTableChangeList
@@ -0,0 +1,43 @@
+"""
+Conditional GET helpers for DRF views.
+
+Views compute a validator from cheap index lookups (e.g. the newest
+updated_at of the caller's visible rows) *before* loading or serializing
+anything. If the client's If-None-Match / If-Modified-Since still match,
+the view returns 304 with an empty body.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(request, *parts):
+    """
+    Strong ETag for `parts`, scoped to the caller and the full request
+    path (so every page / filter combination gets its own validator).
+    """
+    user = request.user
+    raw = '|'.join(str(part) for part in (user.id, getattr(user, 'role', ''), request.get_full_path(), *parts))
+    return quote_etag(hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest())
+
+
+def not_modified(request, etag, last_modified=None):
+    """Return a 304 response if the request's validators match, else None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        return set_validators(response, etag, last_modified)
+    return None
+
+
+def set_validators(response, etag, last_modified=None):
+    """Attach ETag / Last-Modified and make shared caches key on the user."""
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Responses differ per user, so clients must revalidate and proxies
+    # must not share them.
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization',))
+    return response
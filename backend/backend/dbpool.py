@@ -0,0 +1,142 @@
+"""
+Database connection reuse.
+
+Without it every request opens (and closes) its own database connection,
+which on PostgreSQL costs a TCP round trip, authentication and backend
+start-up. settings.DATABASE_POOL['MODE'] picks how connections are reused:
+
+    pool        Django's native psycopg 3 pool (OPTIONS['pool']): up to
+                MAX_SIZE connections per process, shared by all threads;
+                a request waits up to TIMEOUT seconds for a free one.
+    persistent  CONN_MAX_AGE: each thread keeps its connection for that
+                many seconds (psycopg2, SQLite, ...).
+    auto        pool on PostgreSQL when psycopg 3 and psycopg_pool are
+                installed, persistent otherwise (the default). Under ASGI
+                (config['ASGI']) off instead of persistent: each request
+                runs in its own async context, which never reuses a
+                persistent connection, so they would only pile up.
+    off         a connection per request.
+
+Reused connections are health-checked (CONN_HEALTH_CHECKS) before a
+request uses them, so a server restart or idle timeout costs a reconnect
+rather than a failed request. warm_up() opens them at start-up (wsgi.py,
+asgi.py) and exposition() adds connection and pool counters to
+/api/metrics/ (backend/metrics.py).
+
+warm_up() runs when the application module is imported. A server that
+imports it before forking workers (gunicorn --preload) would hand the same
+connections to every worker, so turn it off there (DB_WARM_UP=false).
+"""
+import logging
+import threading
+from collections import defaultdict
+from importlib.util import find_spec
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+MODES = ('auto', 'pool', 'persistent', 'off')
+POSTGRES_ENGINES = ('django.db.backends.postgresql',)
+
+# psycopg_pool.ConnectionPool.get_stats() keys published as metrics
+POOL_GAUGES = ('pool_min', 'pool_max', 'pool_size', 'pool_available', 'requests_waiting')
+POOL_COUNTERS = ('requests_num', 'requests_queued', 'requests_wait_ms', 'requests_errors',
+                 'connections_num', 'connections_ms', 'connections_errors', 'connections_lost')
+
+
+def pool_available():
+    """Whether Django can use its native pool: psycopg 3 with psycopg_pool."""
+    return find_spec('psycopg') is not None and find_spec('psycopg_pool') is not None
+
+
+def configure(database, config):
+    """
+    Apply the DATABASE_POOL `config` to one DATABASES entry (a dict as
+    returned by dj_database_url) and return it.
+    """
+    mode = config['MODE']
+    if mode not in MODES:
+        raise ValueError(f"DATABASE_POOL['MODE'] must be one of {', '.join(MODES)}, not {mode!r}")
+    if mode == 'off':
+        return database
+
+    database = dict(database)
+    if mode == 'auto':
+        if database.get('ENGINE') in POSTGRES_ENGINES and pool_available():
+            mode = 'pool'
+        elif config.get('ASGI'):
+            return database
+        else:
+            mode = 'persistent'
+    elif mode == 'persistent' and config.get('ASGI'):
+        logger.warning("DATABASE_POOL['MODE'] is 'persistent' under ASGI, where connections are not reused")
+    if mode == 'pool':
+        database['OPTIONS'] = dict(database.get('OPTIONS') or {}, pool={
+            'min_size': config['MIN_SIZE'],
+            'max_size': config['MAX_SIZE'],
+            'timeout': config['TIMEOUT'],
+            'max_idle': config['MAX_IDLE'],
+        })
+        database['CONN_MAX_AGE'] = 0  # the pool owns reuse; Django rejects both
+    else:
+        database['CONN_MAX_AGE'] = config['CONN_MAX_AGE']
+    database['CONN_HEALTH_CHECKS'] = True
+    return database
+
+
+def pool_for(alias):
+    """The alias's psycopg pool, or None when it isn't pooled."""
+    return getattr(connections[alias], 'pool', None)
+
+
+def warm_up(aliases=None, timeout=None):
+    """
+    Open connections before the first request: fill each pool to its
+    min_size, or connect this thread's persistent connection. Failures
+    are logged rather than raised so a database outage doesn't stop the
+    server from starting.
+    """
+    for alias in aliases or connections:
+        try:
+            pool = pool_for(alias)
+            if pool is not None:
+                pool.open(wait=True, timeout=timeout or pool.timeout)
+            elif connections[alias].settings_dict.get('CONN_MAX_AGE'):
+                connections[alias].ensure_connection()
+        except Exception:
+            logger.warning("Database warm-up failed for %r", alias, exc_info=True)
+
+
+# ---- metrics ----
+
+_opened = defaultdict(int)
+_opened_lock = threading.Lock()
+
+
+def _count_connection(sender, connection, **kwargs):
+    with _opened_lock:
+        _opened[connection.alias] += 1
+
+
+connection_created.connect(_count_connection, dispatch_uid='backend.dbpool.count_connection')
+
+
+def exposition():
+    """Connection counters and pool statistics in Prometheus text format."""
+    with _opened_lock:
+        opened = sorted(_opened.items())
+    lines = ['# HELP db_connections_opened_total Database connections opened by this process.',
+             '# TYPE db_connections_opened_total counter']
+    lines += [f'db_connections_opened_total{{alias="{alias}"}} {count}' for alias, count in opened]
+
+    stats = {alias: pool.get_stats() for alias in connections if (pool := pool_for(alias)) is not None}
+    for keys, kind in ((POOL_GAUGES, 'gauge'), (POOL_COUNTERS, 'counter')):
+        for key in keys:
+            name = f'db_pool_{key}' + ('_total' if kind == 'counter' else '')
+            values = [(alias, pool_stats[key]) for alias, pool_stats in stats.items() if key in pool_stats]
+            if values:
+                lines.append(f'# TYPE {name} {kind}')
+                lines += [f'{name}{{alias="{alias}"}} {value}' for alias, value in values]
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,141 @@
+"""
+Live event fan-out for the SSE stream (backend/stream.py).
+
+Writers call publish() with an event type, a JSON-serializable payload and
+the ids of the users allowed to see it; admins see every event, staff only
+events whose audience includes them (the same rule as the activity feed).
+Events are handed to the broker when the surrounding transaction commits.
+
+The broker is set by EVENT_STREAM['BROKER']. The default InProcessBroker
+only reaches clients connected to the same process; a shared backend
+(e.g. Redis pub/sub) can implement the same interface:
+
+    publish(type, data, audience)  assign an id, deliver the Event to
+                                   every subscriber and return it
+    subscribe() -> Subscription    an object with `async get(timeout)`
+                                   (Event or None), `overflowed` and
+                                   `close()`
+    replay(last_event_id)          buffered events after that id, or None
+                                   if it is unknown or too old
+"""
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    type: str
+    data: dict
+    audience: frozenset
+
+    def visible_to(self, user):
+        return getattr(user, 'role', None) == 'admin' or user.id in self.audience
+
+
+class Subscription:
+    """
+    One connected client's queue, fed from any thread. A client that falls
+    `max_pending` events behind is marked overflowed and should reconnect.
+    """
+    max_pending = 1000
+
+    def __init__(self, broker, loop):
+        self.broker = broker
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=self.max_pending)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._offer, event)
+        except RuntimeError:
+            pass  # the client's event loop is gone; close() will follow
+
+    def _offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Delivers events to subscribers in this process and keeps the last
+    `buffer_size` events so reconnecting clients can resume from their
+    Last-Event-ID. Ids are '<epoch>-<seq>'; the epoch changes on restart,
+    so ids from a previous process are reported as unknown.
+    """
+
+    def __init__(self, buffer_size=1000):
+        self.epoch = format(time.time_ns() // 1_000_000, 'x')
+        self._sequence = itertools.count(1)
+        self._buffer = deque(maxlen=buffer_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event_type, data, audience):
+        with self._lock:
+            # Ids are assigned under the lock so the buffer stays ordered
+            event = Event(f'{self.epoch}-{next(self._sequence)}', event_type, data, audience)
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(event)
+        return event
+
+    def subscribe(self):
+        subscription = Subscription(self, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def replay(self, last_event_id):
+        epoch, _, seq = (last_event_id or '').partition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        with self._lock:
+            events = list(self._buffer)
+        if events and self._seq(events[0]) > seq + 1:
+            return None  # the client missed events that were already evicted
+        return [event for event in events if self._seq(event) > seq]
+
+    @staticmethod
+    def _seq(event):
+        return int(event.id.rpartition('-')[2])
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    config = settings.EVENT_STREAM
+    return import_string(config['BROKER'])(buffer_size=config['BUFFER_SIZE'])
+
+
+def publish(event_type, data, audience):
+    """Queue an event for the users in `audience` (plus admins) on commit."""
+    audience = frozenset(user_id for user_id in audience if user_id)
+
+    transaction.on_commit(lambda: get_broker().publish(event_type, data, audience))
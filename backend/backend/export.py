@@ -0,0 +1,154 @@
+"""
+Streaming exports of values() querysets as CSV or NDJSON.
+
+Rows are read with QuerySet.iterator(chunk_size=...) (a server-side cursor
+on PostgreSQL) and encoded a batch at a time, so memory stays flat however
+many rows are exported. Output can be gzipped on the fly. Under ASGI the
+chunks are handed over one at a time (Django would otherwise list() a
+synchronous iterator before sending it).
+
+Used by the export endpoints (tasks/export/, activity/export/) and the
+export_tasks / export_activity management commands.
+"""
+import csv
+import json
+import zlib
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+from users.models import User
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+CHUNK_SIZE = 2000
+
+
+def _dumps(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, separators=(',', ':'))
+
+
+def _cell(value):
+    """A CSV cell: JSON for dicts and lists, ISO 8601 for dates."""
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return _dumps(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def encode(rows, fields, fmt, chunk_size=CHUNK_SIZE):
+    """Yield the export as UTF-8 bytes, one chunk per chunk_size rows."""
+    buffer = StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(fields)
+
+    for n, row in enumerate(rows, 1):
+        if writer:
+            writer.writerow([_cell(row[field]) for field in fields])
+        else:
+            buffer.write(_dumps(row))
+            buffer.write('\n')
+        if n % chunk_size == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzipped(chunks):
+    """Gzip a stream of byte chunks as they are produced."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(queryset, fmt, compress=False, chunk_size=None):
+    """The export of a values() queryset, in its field order."""
+    chunk_size = chunk_size or CHUNK_SIZE
+    fields = list(queryset.query.values_select) + list(queryset.query.annotation_select)
+    chunks = encode(queryset.iterator(chunk_size=chunk_size), fields, fmt, chunk_size)
+    return gzipped(chunks) if compress else chunks
+
+
+async def _async_chunks(chunks):
+    chunks = iter(chunks)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    done = object()
+    while (chunk := await next_chunk(chunks, done)) is not done:
+        yield chunk
+
+
+def streaming_response(queryset, fmt, name, compress=False, asynchronous=False):
+    """A file download of `queryset`, streamed as it is read."""
+    filename = f'{name}.{fmt}' + ('.gz' if compress else '')
+    chunks = export_chunks(queryset, fmt, compress)
+    response = StreamingHttpResponse(
+        _async_chunks(chunks) if asynchronous else chunks,
+        content_type='application/gzip' if compress else FORMATS[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'private, no-store'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def export_response(request, queryset, name):
+    """
+    Stream `queryset` per the request's options:
+    - ?output=csv (default) or ndjson
+    - ?gzip=true to compress on the fly
+    """
+    fmt = request.query_params.get('output', 'csv')
+    if fmt not in FORMATS:
+        return Response({'error': f"output must be one of: {', '.join(sorted(FORMATS))}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    compress = request.query_params.get('gzip', '').lower() in ('1', 'true', 'yes')
+    asynchronous = isinstance(request._request, ASGIRequest)
+    return streaming_response(queryset, fmt, name, compress, asynchronous)
+
+
+class ExportCommand(BaseCommand):
+    """
+    Base for the export_* commands: subclasses implement get_queryset(user),
+    where user is None for an unscoped (admin) export.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to write.")
+        parser.add_argument('--output', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--gzip', action='store_true', help="Gzip the file as it is written.")
+        parser.add_argument('--user', help="Export only what this user (email) can see.")
+        parser.add_argument('--chunk-size', type=int)
+
+    def get_queryset(self, user):
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            user = User.objects.filter(email=options['user']).first()
+            if user is None:
+                raise CommandError(f"No user with email {options['user']}.")
+
+        queryset = self.get_queryset(user)
+        chunks = export_chunks(queryset, options['output'], options['gzip'], options['chunk_size'])
+        with open(options['path'], 'wb') as out:
+            for chunk in chunks:
+                out.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Exported to {options['path']}."))
@@ -0,0 +1,104 @@
+"""
+Serializer-free rendering for read-heavy list endpoints.
+
+A RowMapper reproduces a serializer's output straight from values() rows:
+the same keys in the same order and the same value formats, without DRF's
+per-field dispatch, attribute traversal and model instantiation. Each
+field maps to the values() paths it reads and an optional converter:
+
+    TASK_ROWS = RowMapper(TaskSerializer, {
+        'assigned_user': column('assigned_user_id'),
+        'deadline': column('deadline', iso_date),
+    })
+    fields = requested_fields(request, TaskSerializer)
+    rows = tasks.values(*TASK_ROWS.columns(fields, also=ordering))
+    render = TASK_ROWS.renderer(fields)
+    data = [render(row) for row in rows]
+
+Fields not listed read the path of the same name unchanged. The
+serializer stays the schema; tests compare both paths' output.
+"""
+from functools import partial
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+
+from .timing import timed
+
+
+def column(path, convert=None, omit_null=False):
+    """
+    A field read from one values() path, optionally converted. omit_null
+    drops the key when the value is None, as DRF does for a read-only
+    field whose dotted source crosses a null relation.
+    """
+    return (path,), convert, omit_null
+
+
+def computed(convert, *paths):
+    """A field built from several values() paths: convert(*values)."""
+    return paths, convert, False
+
+
+def iso_date(value):
+    """DRF DateField output."""
+    return value.isoformat() if value else None
+
+
+def iso_datetime(value, zone=None):
+    """
+    DRF DateTimeField output: in `zone` (RowMapper passes the current time
+    zone, resolved once per renderer rather than per row), +00:00 as Z.
+    """
+    if not value:
+        return None
+    if zone is not None:
+        value = value.astimezone(zone)
+    text = value.isoformat()
+    return text[:-6] + 'Z' if text.endswith('+00:00') else text
+
+
+class RowMapper:
+    def __init__(self, serializer_class, fields=None):
+        self.field_names = list(serializer_class.Meta.fields)
+        self.specs = {name: column(name) for name in self.field_names}
+        self.specs.update(fields or {})
+
+    def columns(self, fields, also=()):
+        """The values() paths needed to render `fields`, plus `also` (e.g. the ordering)."""
+        paths = [path for name in fields for path in self.specs[name][0]]
+        paths += [name.lstrip('-') for name in also]
+        return list(dict.fromkeys(paths))
+
+    def renderer(self, fields=None):
+        """A function turning one values() row into the serializer's dict."""
+        datetime_convert = partial(iso_datetime, zone=timezone.get_current_timezone() if settings.USE_TZ else None)
+        getters, nullable = [], []
+        for name in (fields if fields is not None else self.field_names):
+            paths, convert, omit_null = self.specs[name]
+            if omit_null:
+                nullable.append(name)
+            if convert is iso_datetime:
+                convert = datetime_convert
+            if convert is None:
+                getter = itemgetter(paths[0])
+            elif len(paths) == 1:
+                getter = (lambda path, convert: lambda row: convert(row[path]))(paths[0], convert)
+            else:
+                getter = (lambda paths, convert: lambda row: convert(*[row[p] for p in paths]))(paths, convert)
+            getters.append((name, getter))
+
+        def render(row):
+            data = {name: get(row) for name, get in getters}
+            for name in nullable:
+                if data[name] is None:
+                    del data[name]
+            return data
+        return render
+
+    def render(self, rows, fields=None):
+        rows = list(rows)  # run the query first: it counts as db time, not serialize
+        with timed('serialize'):
+            render = self.renderer(fields)
+            return [render(row) for row in rows]
@@ -0,0 +1,87 @@
+"""
+Sparse fieldsets for serializers: ?view=, ?fields= and ?omit=.
+
+A serializer opts in with SparseFieldsetMixin and declares, in Meta:
+
+    list_fields    the compact representation used for collections
+                   (default: every field)
+    field_columns  the model columns each field reads, as only() paths;
+                   fields not listed read the column of the same name
+
+A view resolves the fields once and uses them for both the query and the
+serializer, so the database never reads (or joins) what is not rendered:
+
+    fields = requested_fields(request, TaskSerializer)
+    tasks = only_fields(tasks, TaskSerializer, fields, also=('deadline',))
+    TaskSerializer(page, many=True, fields=fields)
+
+Query parameters:
+    ?view=list|full    base set (collections default to list, single
+                       objects to full)
+    ?fields=a,b        exactly these fields instead of the base set
+    ?omit=a,b          drop these fields
+"""
+from rest_framework.exceptions import ValidationError
+
+VIEWS = ('list', 'full')
+
+
+def _names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def requested_fields(request, serializer_class, collection=True):
+    """The serializer's field names the request asks for, in declaration order."""
+    meta = serializer_class.Meta
+    available = list(meta.fields)
+    params = request.query_params
+
+    view = params.get('view', 'list' if collection else 'full')
+    if view not in VIEWS:
+        raise ValidationError({'view': f"Must be one of: {', '.join(VIEWS)}."})
+    selected = _names(params['fields']) if 'fields' in params else (
+        list(getattr(meta, 'list_fields', available)) if view == 'list' else available
+    )
+    omitted = _names(params.get('omit', ''))
+
+    unknown = [name for name in selected + omitted if name not in available]
+    if unknown:
+        raise ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}."})
+    keep = set(selected) - set(omitted)
+    return [name for name in available if name in keep]
+
+
+def only_fields(queryset, serializer_class, fields, also=()):
+    """
+    Restrict `queryset` to the columns `fields` read, joining (and only
+    joining) the relations they traverse. `also` adds columns the view
+    itself needs, such as the pagination ordering; annotations are skipped.
+    """
+    field_columns = getattr(serializer_class.Meta, 'field_columns', {})
+    columns = set()
+    for name in fields:
+        columns.update(field_columns.get(name, (name,)))
+    columns.update(
+        name.lstrip('-') for name in also if name.lstrip('-') not in queryset.query.annotations
+    )
+
+    related = set()
+    for column in columns:
+        parts = column.split('__')
+        related.update('__'.join(parts[:depth]) for depth in range(1, len(parts)))
+    # A relation that is joined can't also be deferred
+    columns.update(related)
+    queryset = queryset.select_related(None)
+    if related:  # select_related() with no arguments would follow every relation
+        queryset = queryset.select_related(*sorted(related))
+    return queryset.only(*sorted(columns))
+
+
+class SparseFieldsetMixin:
+    """Accepts fields=[...] and drops every other field from the output."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
@@ -0,0 +1,199 @@
+"""
+Per-request performance instrumentation.
+
+PerformanceMiddleware times every request and breaks it down into:
+
+    db         SQL time and query count (an execute wrapper on every
+               configured database, added to each thread's connections
+               on request_started, so queries of sync views run in a
+               worker thread under ASGI count too)
+    serialize  building response data (RowMapper, app serializers)
+    render     encoding it (FastJSONRenderer)
+    view       everything up to the response being ready, db and
+               serialize included
+    total      the whole request as seen by the middleware
+
+The breakdown goes out as a Server-Timing header (visible in browser dev
+tools; only to admins unless PERFORMANCE_METRICS['SERVER_TIMING'] says
+otherwise) and into in-process Prometheus metrics served at GET
+/api/metrics/ (admins only):
+
+    http_request_duration_seconds   histogram per route and method
+    http_requests_total             counter per route, method and status
+    http_request_phase_seconds_total, http_request_db_queries_total
+    db_connections_opened_total, db_pool_*   see backend/dbpool.py
+
+Metrics are per process; scrape every worker or run one. With
+PERFORMANCE_METRICS['ENABLED'] false the middleware removes itself
+(MiddlewareNotUsed) and timed() (backend/timing.py) is a single context
+variable lookup.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_started
+from django.db import connections
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+
+from users.permissions import IsAdmin
+from . import dbpool
+from .routers import resolved_user
+from .timing import RequestTimings, current_timings, record_query
+
+
+# ---- aggregation ----
+
+class MetricsRegistry:
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}                 # (route, method) -> [bucket counts..., +Inf, sum]
+            self.requests = defaultdict(int)     # (route, method, status)
+            self.phases = defaultdict(float)     # (route, phase)
+            self.queries = defaultdict(int)      # route
+
+    def observe(self, route, method, status, timings):
+        with self._lock:
+            histogram = self.histograms.get((route, method))
+            if histogram is None:
+                histogram = self.histograms[(route, method)] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if timings.total <= bound:
+                    histogram[index] += 1
+                    break
+            else:
+                histogram[len(self.buckets)] += 1
+            histogram[-1] += timings.total
+            self.requests[(route, method, status)] += 1
+            for phase, seconds in timings.seconds.items():
+                self.phases[(route, phase)] += seconds
+            self.queries[route] += timings.queries
+
+    def exposition(self):
+        """The metrics in Prometheus text format (version 0.0.4)."""
+        def labels(**values):
+            pairs = (f'{key}="{_escape(value)}"' for key, value in values.items())
+            return '{' + ','.join(pairs) + '}'
+
+        with self._lock:
+            lines = [
+                '# HELP http_request_duration_seconds Time to produce a response, per route.',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for (route, method), histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ('+Inf',), histogram[:-1]):
+                    cumulative += count
+                    lines.append(f'http_request_duration_seconds_bucket{labels(route=route, method=method, le=bound)} '
+                                 f'{cumulative}')
+                lines.append(f'http_request_duration_seconds_sum{labels(route=route, method=method)} {histogram[-1]}')
+                lines.append(f'http_request_duration_seconds_count{labels(route=route, method=method)} {cumulative}')
+
+            lines += ['# HELP http_requests_total Requests by route, method and status.',
+                      '# TYPE http_requests_total counter']
+            lines += [f'http_requests_total{labels(route=route, method=method, status=status)} {count}'
+                      for (route, method, status), count in sorted(self.requests.items())]
+
+            lines += ['# HELP http_request_phase_seconds_total Time spent per request phase.',
+                      '# TYPE http_request_phase_seconds_total counter']
+            lines += [f'http_request_phase_seconds_total{labels(route=route, phase=phase)} {seconds}'
+                      for (route, phase), seconds in sorted(self.phases.items())]
+
+            lines += ['# HELP http_request_db_queries_total SQL queries run by requests.',
+                      '# TYPE http_request_db_queries_total counter']
+            lines += [f'http_request_db_queries_total{labels(route=route)} {count}'
+                      for route, count in sorted(self.queries.items())]
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry(settings.PERFORMANCE_METRICS['BUCKETS'])
+
+
+# ---- middleware and endpoint ----
+
+class PerformanceMiddleware:
+    """Measures each request (see the module docstring). Keep it first in MIDDLEWARE."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        config = settings.PERFORMANCE_METRICS
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        request_started.connect(instrument_connections, dispatch_uid='backend.metrics')
+        self.get_response = get_response
+        # 'admin', or on/off for every response
+        mode = config['SERVER_TIMING']
+        self.server_timing = mode if mode == 'admin' else mode in (True, '1', 'true', 'yes')
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        with self.measuring(timings):
+            response = self.get_response(request)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        with self.measuring(timings):
+            response = await self.get_response(request)
+        return self.finish(request, response, timings)
+
+    @contextmanager
+    def measuring(self, timings):
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            current_timings.reset(token)
+            timings.total = time.perf_counter() - start
+
+    def finish(self, request, response, timings):
+        timings.seconds['view'] = max(timings.total - timings.seconds['render'], 0.0)
+        match = request.resolver_match
+        route = (match.route or match.view_name) if match else 'unmatched'
+        registry.observe(route, request.method, response.status_code, timings)
+        if self.server_timing is True or (
+            self.server_timing == 'admin' and getattr(resolved_user(request), 'role', None) == 'admin'
+        ):
+            response['Server-Timing'] = timings.server_timing()
+        return response
+
+
+def instrument_connections(**kwargs):
+    """
+    Give this thread's connections the query-recording wrapper. Under ASGI
+    request_started runs in the thread that sync views (and their queries)
+    run in, not the event loop's thread the middleware runs in. Outside a
+    measured request the wrapper is one context variable lookup.
+    """
+    for alias in connections:
+        wrappers = connections[alias].execute_wrappers
+        if record_query not in wrappers:
+            wrappers.append(record_query)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def metrics(request):
+    """Prometheus scrape endpoint: this process's request metrics."""
+    body = registry.exposition() + dbpool.exposition()
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,168 @@
+import json
+from base64 import b64decode, b64encode
+from datetime import date, datetime
+from functools import reduce
+from operator import or_
+from urllib import parse
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a compound ordering.
+
+    Unlike DRF's CursorPagination, which only keys on the first ordering
+    field and falls back to OFFSET for ties, the cursor here stores the
+    full position tuple, so every page seeks straight to its position:
+
+        WHERE a > :a OR (a = :a AND b > :b) ORDER BY a, b LIMIT :size + 1
+
+    No COUNT(*) is ever issued. The last ordering field must be unique
+    (normally 'id') and none of the fields may be nullable.
+    """
+    ordering = ('id',)
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._set_page(list(self._page_query(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views: the page is fetched with the async ORM."""
+        return self._set_page([row async for row in self._page_query(queryset, request)])
+
+    def _page_query(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self._position, self._reverse = self.decode_cursor(request)
+
+        ordering = self.ordering if not self._reverse else [self._flip(f) for f in self.ordering]
+        queryset = queryset.order_by(*ordering)
+        if self._position is not None:
+            queryset = queryset.filter(self._seek(ordering, self._position))
+        return queryset[:self.page_size + 1]
+
+    def _set_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if self._reverse:
+            rows.reverse()
+            self.has_next = self._position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self._position is not None
+
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    # ---- cursor encoding ----
+
+    def get_position(self, obj):
+        return [self._dump(self._value(obj, field.lstrip('-'))) for field in self.ordering]
+
+    def encode_cursor(self, position, reverse):
+        payload = {'p': position}
+        if reverse:
+            payload['r'] = 1
+        raw = json.dumps(payload, separators=(',', ':')).encode('ascii')
+        encoded = b64encode(raw).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(b64decode(parse.unquote(encoded).encode('ascii')))
+            position = payload['p']
+            reverse = bool(payload.get('r'))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+            position = [self._load(value) for value in position]
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    # ---- helpers ----
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    @staticmethod
+    def _value(obj, field):
+        if isinstance(obj, dict):
+            return obj[field]
+        return getattr(obj, field)
+
+    @staticmethod
+    def _dump(value):
+        # Keep full microsecond precision; DjangoJSONEncoder truncates it.
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def _load(value):
+        if isinstance(value, str):
+            return parse_datetime(value) or parse_date(value) or value
+        return value
+
+    def _seek(self, ordering, position):
+        """Build (a > x) OR (a = x AND b > y) ... for the given ordering."""
+        clauses = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {f.lstrip('-'): position[i] for i, f in enumerate(ordering[:index])}
+            clauses.append(Q(**equal, **{f'{name}__{lookup}': position[index]}))
+        return reduce(or_, clauses)
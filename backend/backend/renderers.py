@@ -0,0 +1,48 @@
+"""
+JSON renderer that encodes with orjson when it is installed.
+
+The output is byte-for-byte what DRF's JSONRenderer produces with this
+project's settings (compact separators, UTF-8 rather than \\u escapes,
+U+2028/U+2029 escaped): types orjson doesn't handle the same way
+(datetimes, decimals, lazy strings, ...) go through DRF's encoder, and
+anything orjson rejects, as well as indented output, falls back to the
+stdlib path.
+"""
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+from .timing import timed
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib json module is used instead
+    orjson = None
+
+# Line/paragraph separators are valid JSON but not valid JavaScript
+_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed('render'):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=JSONEncoder().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:  # e.g. integers beyond 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+        for raw, escaped in _SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
@@ -0,0 +1,144 @@
+"""
+Read replicas.
+
+With replicas configured (DATABASE_REPLICA_URLS, see settings.READ_REPLICAS)
+ReplicaRouter sends the reads of safe requests (GET, HEAD, OPTIONS) to a
+replica and everything else to the primary ('default'):
+
+    - writes always go to the primary
+    - a request with an unsafe method reads from the primary throughout,
+      as does a safe request once it has written, so it sees its own writes
+    - after a request writes, its user's reads stay on the primary for
+      STICKY_SECONDS, covering replication lag for read-after-write across
+      requests (a save followed by refetching the list)
+    - reads outside a request (commands, background threads) use the primary
+    - sessions and users are always read from the primary: a login or
+      logout must take effect at once, and authentication itself reads
+      them, so routing them never needs the (not yet known) user
+
+ReplicaMiddleware tracks the request. Pins are kept in the default cache,
+so with several worker processes use a shared cache backend.
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from rest_framework.permissions import SAFE_METHODS
+
+PRIMARY = 'default'
+# Read from the primary in every request (see above)
+PRIMARY_APPS = ('auth', 'sessions')
+
+_current = ContextVar('replica_routing', default=None)
+
+
+def _pin_key(user_id):
+    return f'replica:pin:{user_id}'
+
+
+def resolved_user(request):
+    """
+    The request's user if authentication has already run, else None.
+    Never triggers it: loading the session or user would itself be
+    routed, and re-enter the router.
+    """
+    user = request.__dict__.get('user')
+    if isinstance(user, SimpleLazyObject):
+        # AuthenticationMiddleware's lazy user caches what it loads here;
+        # DRF replaces request.user with the authenticated user outright
+        user = request.__dict__.get('_cached_user')
+    return user
+
+
+class RoutingState:
+    """Routing decisions for one request."""
+
+    def __init__(self, request):
+        self.request = request
+        self.primary = request.method not in SAFE_METHODS
+        self.wrote = False
+        self._pinned = None
+
+    def use_primary(self):
+        if self.primary or self.wrote:
+            return True
+        if self._pinned is None:
+            # Read lazily: DRF authenticates inside the view, after the middleware ran.
+            # Until then the answer isn't kept, so the pin is checked once the user is known.
+            user = resolved_user(self.request)
+            if user is None:
+                return False
+            self._pinned = bool(user.is_authenticated and cache.get(_pin_key(user.id)))
+        return self._pinned
+
+    def pin_user(self):
+        user = resolved_user(self.request)
+        if user is not None and user.is_authenticated:
+            cache.set(_pin_key(user.id), True, settings.READ_REPLICAS['STICKY_SECONDS'])
+
+    async def apin_user(self):
+        user = resolved_user(self.request)
+        if user is not None and user.is_authenticated:
+            await cache.aset(_pin_key(user.id), True, settings.READ_REPLICAS['STICKY_SECONDS'])
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.READ_REPLICAS['ALIASES']
+        state = _current.get()
+        if not replicas or state is None or self.primary_only(model) or state.use_primary():
+            return PRIMARY
+        return random.choice(replicas)
+
+    @staticmethod
+    def primary_only(model):
+        return model._meta.app_label in PRIMARY_APPS or model._meta.label == settings.AUTH_USER_MODEL
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the primary's data, so their rows relate freely
+        aliases = {PRIMARY, *settings.READ_REPLICAS['ALIASES']}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReplicaMiddleware:
+    """Tracks the current request for ReplicaRouter and pins users who wrote."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState(request)
+        token = _current.set(state)
+        try:
+            return self.get_response(request)
+        finally:
+            _current.reset(token)
+            if state.wrote:
+                state.pin_user()
+
+    async def __acall__(self, request):
+        state = RoutingState(request)
+        token = _current.set(state)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current.reset(token)
+            if state.wrote:
+                await state.apin_user()
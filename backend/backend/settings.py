@@ -4,6 +4,8 @@ from dotenv import load_dotenv
 from datetime import timedelta
 from pathlib import Path
 
+from backend import dbpool
+
 load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +50,8 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = "users.User"
 
 MIDDLEWARE = [
+    'backend.metrics.PerformanceMiddleware',
+    'backend.routers.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -61,20 +65,10 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "backend.urls"
 
-REST_FRAMEWORK = {
-    "NON_FIELD_ERRORS_KEYS": "errors", 'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 20,
-    'DEFAULT_FILTER_BACKENDS': [
-        'rest_framework.filters.SearchFilter',
-        'rest_framework.filters.OrderingFilter',
-    ],
-}
-
-
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
-        "DIRS": [],
+        "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
@@ -100,10 +94,39 @@ WSGI_APPLICATION = "backend.wsgi.application"
 # }
 
 
+# Connection reuse (see backend/dbpool.py). MODE: auto (psycopg 3 pool on
+# PostgreSQL when installed, else persistent connections), pool,
+# persistent or off. Sizes are per process.
+DATABASE_POOL = {
+    'MODE': os.getenv('DB_POOL', 'auto'),
+    'MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+    'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+    'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', '10')),  # seconds a request waits for a connection
+    'MAX_IDLE': float(os.getenv('DB_POOL_MAX_IDLE', '600')),  # seconds before idle pooled connections close
+    'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '600')),  # persistent mode
+    'WARM_UP': os.getenv('DB_WARM_UP', 'true').lower() in ('1', 'true', 'yes'),
+    # Set by backend/asgi.py before the settings load
+    'ASGI': os.getenv('DJANGO_ASGI', '').lower() in ('1', 'true', 'yes'),
+}
+
 DATABASES = {
-    'default': dj_database_url.config(default=os.getenv('DATABASE_URL'))
+    'default': dbpool.configure(dj_database_url.config(default=os.getenv('DATABASE_URL')), DATABASE_POOL)
 }
 
+# Read replicas (see backend/routers.py): DATABASE_REPLICA_URLS is a
+# comma-separated list of database URLs, added as replica0, replica1, ...
+# Safe requests read from them; a user who wrote reads from the primary
+# for STICKY_SECONDS. Locally, two SQLite files work.
+READ_REPLICAS = {
+    'ALIASES': [],
+    'STICKY_SECONDS': float(os.getenv('REPLICA_STICKY_SECONDS', '5')),
+}
+for index, url in enumerate(url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()):
+    DATABASES[f'replica{index}'] = dbpool.configure(dj_database_url.parse(url), DATABASE_POOL)
+    READ_REPLICAS['ALIASES'].append(f'replica{index}')
+
+DATABASE_ROUTERS = ['backend.routers.ReplicaRouter']
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -155,13 +178,83 @@ CORS_ALLOWED_ORIGINS = [
 
 
 # REST Framework Settings
+# Pagination is set per view (see backend/pagination.py) rather than
+# globally, so list endpoints use keyset cursors instead of COUNT(*) pages.
 REST_FRAMEWORK = {
+    "NON_FIELD_ERRORS_KEYS": "errors",
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson when installed, same bytes as JSONRenderer (backend/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'backend.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+
+# Activity log write buffering (see activity/buffer.py). When enabled,
+# log_activity queues entries after commit and a background thread writes
+# them in batches instead of one INSERT per request.
+ACTIVITY_LOG_BUFFER = {
+    'ENABLED': os.getenv('ACTIVITY_LOG_BUFFERED', '').lower() in ('1', 'true', 'yes'),
+    'MAX_BATCH': 100,
+    'FLUSH_INTERVAL': 1.0,  # seconds
+    # Failed writes are retried on later flushes, then the entry is dropped
+    'MAX_ATTEMPTS': 10,
+}
+
+
+# Activity retention (see activity/archive.py). `manage.py archive_activity`
+# moves entries older than HOT_DAYS out of the database into gzipped NDJSON
+# files under ARCHIVE_DIR, one directory per day.
+ACTIVITY_RETENTION = {
+    'HOT_DAYS': int(os.getenv('ACTIVITY_HOT_DAYS', '90')),
+    'ARCHIVE_DIR': os.getenv('ACTIVITY_ARCHIVE_DIR', str(BASE_DIR / 'archive' / 'activity')),
+    'CHUNK_SIZE': 1000,
+}
+
+# Cache backend. Local memory by default; set CACHE_BACKEND/CACHE_LOCATION
+# (e.g. django.core.cache.backends.redis.RedisCache, redis://...) to share
+# it. Local memory is per process, so with several worker processes use a
+# shared backend or invalidations only reach the worker that made them.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'task-tracker'),
+    }
+}
+
+# Rendered task list responses (see tasks/cache.py). Off by default: its
+# invalidations are version counters in CACHES['default'], so only turn it
+# on with a shared backend, or workers serve each other's stale lists.
+TASK_LIST_CACHE = {
+    'ENABLED': os.getenv('TASK_LIST_CACHE', 'false').lower() in ('1', 'true', 'yes'),
+    'ALIAS': 'default',
+    'TIMEOUT': 300,  # seconds
+}
+
+
+# Users loaded for writes by ClaimsJWTAuthentication (reads trust the token
+# claims instead). Per process; entries are dropped when a User is saved.
+AUTH_USER_CACHE = {
+    'ENABLED': os.getenv('AUTH_USER_CACHE', 'true').lower() in ('1', 'true', 'yes'),
+    'MAX_SIZE': 1024,
+    'TTL': 60,  # seconds
+}
+
+
+# Live event stream (backend/events.py, backend/stream.py). The default
+# broker is per process: run a single ASGI worker, or plug in a shared
+# broker, so every client sees every event.
+EVENT_STREAM = {
+    'BROKER': 'backend.events.InProcessBroker',
+    'BUFFER_SIZE': 1000,  # events kept for Last-Event-ID resume
+    'KEEPALIVE': 15,  # seconds between comment lines on idle streams
+    'RETRY_MS': 3000,  # client reconnect delay
 }
 
 
@@ -172,4 +265,18 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer',),
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
+    # Adds role/username/email claims to login tokens
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.TokenObtainPairWithClaimsSerializer',
+}
+
+
+# Per-request timing (see backend/metrics.py): a Server-Timing header and
+# per-route latency histograms at /api/metrics/ (admins only). Disabled,
+# the middleware is not loaded at all. The header tells clients how long
+# the database took, so by default only admins get it: SERVER_TIMING is
+# 'admin', 'true' (every response) or 'false'.
+PERFORMANCE_METRICS = {
+    'ENABLED': os.getenv('PERFORMANCE_METRICS', 'true').lower() in ('1', 'true', 'yes'),
+    'SERVER_TIMING': os.getenv('SERVER_TIMING', 'admin').lower(),
+    'BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),  # seconds
 }
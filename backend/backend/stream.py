@@ -0,0 +1,92 @@
+"""
+Server-Sent Events endpoint: GET /api/events/
+
+Streams task and activity events (backend/events.py) to the caller. Admins
+receive every event; staff receive events for tasks assigned to them and
+actions they performed. Serve it from the ASGI application
+(backend/asgi.py): each connection is a coroutine, not a worker thread.
+
+Browsers' EventSource cannot set headers, so the access token may also be
+passed as ?token=. Reconnecting clients send Last-Event-ID (or
+?last_event_id=) and get the events they missed; if those are no longer
+buffered the stream starts with a `reset` event and the client should
+refetch its lists.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from users.authentication import ClaimsJWTAuthentication, ClaimsUser, USER_CLAIMS
+from .events import get_broker
+
+
+async def authenticate(request):
+    """The user for the request's bearer token (header or ?token=), or None."""
+    auth = ClaimsJWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else request.GET.get('token', '').encode()
+    if not raw_token:
+        return None
+    try:
+        token = auth.get_validated_token(raw_token)
+        if all(claim in token for claim in USER_CLAIMS):
+            return ClaimsUser(token)
+        return await sync_to_async(auth.get_user)(token)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def format_event(event_id, event_type, data):
+    lines = [f'id: {event_id}'] if event_id else []
+    lines += [f'event: {event_type}', f'data: {json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"))}']
+    return '\n'.join(lines) + '\n\n'
+
+
+async def event_stream(user, last_event_id):
+    config = settings.EVENT_STREAM
+    broker = get_broker()
+    # Subscribe before replaying so nothing published in between is lost
+    subscription = broker.subscribe()
+    try:
+        yield f'retry: {config["RETRY_MS"]}\n\n'
+        sent = set()
+        if last_event_id:
+            missed = broker.replay(last_event_id)
+            if missed is None:
+                yield format_event(None, 'reset', {})
+            else:
+                for event in missed:
+                    sent.add(event.id)
+                    if event.visible_to(user):
+                        yield format_event(event.id, event.type, event.data)
+
+        while not subscription.overflowed:
+            event = await subscription.get(timeout=config['KEEPALIVE'])
+            if event is None:
+                yield ': keepalive\n\n'
+            elif event.id not in sent and event.visible_to(user):
+                yield format_event(event.id, event.type, event.data)
+        # Too far behind: ask the client to refetch and reconnect
+        yield format_event(None, 'reset', {})
+    finally:
+        subscription.close()
+
+
+@require_GET
+async def events(request):
+    """Live task and activity events for the caller, as text/event-stream."""
+    user = await authenticate(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    response = StreamingHttpResponse(event_stream(user, last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+    return response
@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+from itertools import count
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from activity.models import Activity, ActivityAudience
+from tasks import cache as task_cache
+from tasks.models import Task
+from users.models import User
+
+_sequence = count()
+
+
+class QueryBudgetTestCase(APITestCase):
+    """
+    Base class for query-count regression tests.
+
+    ``assertQueryBudget`` calls an endpoint once per seed size and fails if
+    the query count grows with the number of rows (an N+1 regression) or
+    exceeds the budget. ``seed_tasks`` / ``seed_users`` create rows in bulk
+    so tests can exercise realistic list sizes cheaply.
+    """
+    seed_sizes = (2, 25)
+
+    def setUp(self):
+        cache.clear()
+        self.admin = self.make_user(role='admin')
+        self.staff = self.make_user(role='staff')
+
+    # ---- seeding ----
+
+    def make_user(self, role='staff'):
+        n = next(_sequence)
+        return User.objects.create_user(
+            email=f'user{n}@example.com', username=f'user{n}', password='pw', role=role,
+        )
+
+    def seed_users(self, n):
+        start = next(_sequence)
+        User.objects.bulk_create([
+            User(email=f'seed{start}-{i}@example.com', username=f'seed{start}-{i}', role='staff')
+            for i in range(n)
+        ])
+
+    def seed_tasks(self, n, assigned_user=None):
+        """Create n tasks for assigned_user (default: self.staff), each with one activity."""
+        assigned_user = assigned_user or self.staff
+        today = date.today()
+        tasks = Task.objects.bulk_create([
+            Task(title=f'Task {i}', description='Seeded', assigned_user=assigned_user,
+                 created_by=self.admin, deadline=today + timedelta(days=i % 10))
+            for i in range(n)
+        ])
+        activities = Activity.objects.bulk_create([
+            Activity(user=self.admin, task=task, action='CREATED',
+                     description=f"Task '{task.title}' created by {self.admin.username}",
+                     details={'task_id': task.id, 'task_title': task.title,
+                              'assigned_user_id': assigned_user.id})
+            for task in tasks
+        ])
+        ActivityAudience.objects.bulk_create([row for activity in activities for row in ActivityAudience.rows_for(activity)])
+        # bulk_create sends no signals, so invalidate like the bulk views do
+        task_cache.invalidate_tasks([assigned_user.id])
+        return tasks
+
+    # ---- assertions ----
+
+    def count_queries(self, method, url, user, data=None):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertLess(response.status_code, 400, f'{method.upper()} {url} -> {response.status_code}')
+        return len(ctx.captured_queries), response
+
+    def assertQueryBudget(self, budget, url, user=None, method='get', data=None, seed=None):
+        """
+        Assert that `method url` runs at most `budget` queries and that the
+        count does not change as `seed(n)` adds rows for each n in seed_sizes.
+        Pass seed=None for endpoints whose cost does not depend on row count.
+        """
+        user = user or self.admin
+        counts = []
+        sizes = self.seed_sizes if seed else (0,)
+        for size in sizes:
+            if seed:
+                seed(size)
+            queries, _ = self.count_queries(method, url, user, data)
+            counts.append(queries)
+
+        self.assertEqual(
+            len(set(counts)), 1,
+            f'{method.upper()} {url} query count grows with rows {dict(zip(sizes, counts))}: per-row queries',
+        )
+        self.assertLessEqual(counts[-1], budget, f'{method.upper()} {url} ran {counts[-1]} queries, budget {budget}')
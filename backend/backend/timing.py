@@ -0,0 +1,71 @@
+"""
+Request timing primitives, shared by the code being measured (renderers,
+row mappers, serializers) and PerformanceMiddleware in backend/metrics.py.
+
+Outside a measured request, timed() costs one context variable lookup.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+PHASES = ('db', 'serialize', 'render', 'view')
+
+current_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self.total = 0.0
+        self._active = set()
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds['db'] += time.perf_counter() - start
+            self.queries += 1
+
+    def server_timing(self):
+        parts = [f'db;dur={self.seconds["db"] * 1000:.1f};desc="{self.queries} queries"']
+        parts += [f'{phase};dur={self.seconds[phase] * 1000:.1f}' for phase in PHASES[1:]]
+        parts.append(f'total;dur={self.total * 1000:.1f}')
+        return ', '.join(parts)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper for every connection (see backend/metrics.py): counts
+    the query against the request being measured in this context, if any.
+    The context follows sync_to_async into whichever thread runs the query.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings.record_query(execute, sql, params, many, context)
+
+
+@contextmanager
+def timed(phase):
+    """Add the enclosed time to `phase` of the current request, if it is being measured."""
+    timings = current_timings.get()
+    if timings is None or phase in timings._active:  # nested: the outer block counts it
+        yield
+        return
+    timings._active.add(phase)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.seconds[phase] += time.perf_counter() - start
+        timings._active.discard(phase)
+
+
+class TimedSerializerMixin:
+    """Counts a serializer's to_representation() as serialize time."""
+
+    def to_representation(self, instance):
+        with timed('serialize'):
+            return super().to_representation(instance)
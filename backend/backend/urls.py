@@ -1,13 +1,21 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from .metrics import metrics
+from .stream import events
+
 admin.site.site_header = "Internal Task Tracker Admin"
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("tasks/", include("tasks.urls")),
     path("auth/", include("users.urls")),
+    path('api/events/', events, name='events'),
+    path('api/metrics/', metrics, name='metrics'),
     path('api/', include('activity.urls')),
     path('api/tasks/', include('tasks.urls')),
     path('api/users/', include('users.urls')),
+    # Async-ORM variants of the read endpoints, for the ASGI deployment
+    path('api/async/tasks/', include('tasks.async_urls')),
+    path('api/async/', include('activity.async_urls')),
 ]
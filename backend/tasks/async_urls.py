@@ -0,0 +1,13 @@
+# Async variants of tasks/urls.py (tasks/async_views.py), for the ASGI deployment
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('', async_views.task_list, name='async_task_list'),
+    path('summary/', async_views.task_summary, name='async_task_summary'),
+    path('changes/', async_views.task_changes, name='async_task_changes'),
+    path('search/', async_views.search_tasks, name='async_search_tasks'),
+    path('export/', async_views.export_tasks, name='async_export_tasks'),
+    path('<int:pk>/', async_views.task_detail, name='async_task_detail'),
+    path('<int:pk>/status/', async_views.update_task_status, name='async_update_task_status'),
+]
@@ -0,0 +1,158 @@
+"""
+Async variants of the task endpoints (backend/asyncviews.py), served
+under /api/async/tasks/ by the ASGI application.
+
+Same behaviour, parameters and responses as tasks/views.py; queries use
+the async ORM so a request waiting on the database doesn't hold a
+thread. Writes that validate through serializers inside transactions
+(create, edit, delete, bulk) stay on the sync views: Django has no async
+transactions. The status update is here, since a single-row save is the
+common staff write.
+"""
+from django.shortcuts import aget_object_or_404
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from activity.serializers import ActivitySerializer
+from backend.asyncviews import async_api_view
+from backend.conditional import make_etag, not_modified, set_validators
+from backend.export import export_response
+from backend.fieldsets import only_fields, requested_fields
+from . import cache as task_cache
+from . import search
+from .models import Task
+from .pagination import TaskCursorPagination, TaskSearchPagination
+from .serializers import TASK_ROWS, TaskSerializer
+from .views import (
+    TASK_RELATED, ChangesWindow, alist_state, cached_list_response, fold_summary, recent_activity, render_now,
+    summary_rows,
+)
+
+
+@async_api_view(['GET'], permission_classes=[IsAuthenticated])
+async def task_list(request):
+    """List the caller's tasks (see tasks.views.task_list)"""
+    fields = requested_fields(request, TaskSerializer)
+    cache_key = await task_cache.aresponse_key(request)
+    cached = await task_cache.aget_response(cache_key)
+    if cached:
+        return cached_list_response(request, cached)
+
+    tasks = Task.objects.visible_to(request.user)
+    etag = make_etag(request, *await alist_state(tasks, request.user), await task_cache.aglobal_version())
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+
+    paginator = TaskCursorPagination()
+    rows = tasks.values(*TASK_ROWS.columns(fields, also=paginator.ordering))
+    page = await paginator.apaginate_queryset(rows, request)
+    response = paginator.get_paginated_response(TASK_ROWS.render(page, fields))
+    if render_now(request, response):
+        await task_cache.aset_response(cache_key, etag, response.content, response['Content-Type'])
+    return set_validators(response, etag)
+
+
+@async_api_view(['GET'], permission_classes=[IsAuthenticated])
+async def task_summary(request):
+    """Dashboard counts and latest activity (see tasks.views.task_summary)"""
+    summary = fold_summary([row async for row in summary_rows(request.user)])
+    activities = [activity async for activity in recent_activity(request)]
+    summary['recent_activity'] = ActivitySerializer(activities, many=True).data
+    return Response(summary, status=status.HTTP_200_OK)
+
+
+@async_api_view(['GET'], permission_classes=[IsAuthenticated])
+async def task_changes(request):
+    """Delta sync since a cursor (see tasks.views.task_changes)"""
+    sync = ChangesWindow(request)
+    has_more, page, cursor = sync.split([task async for task in sync.tasks])
+    tombstones = sync.tombstones(page, has_more)
+    deleted = sync.deleted(page, [task_id async for task_id in tombstones]) if tombstones is not None else []
+
+    return Response({
+        'tasks': TaskSerializer(page, many=True, context={'request': request}).data,
+        'deleted': deleted,
+        'cursor': cursor,
+        'has_more': has_more,
+        'reset': sync.reset,
+    }, status=status.HTTP_200_OK)
+
+
+@async_api_view(['GET'], permission_classes=[IsAuthenticated])
+async def search_tasks(request):
+    """Ranked full-text search (see tasks.views.search_tasks)"""
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'q parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    fields = requested_fields(request, TaskSerializer)
+    paginator = TaskSearchPagination()
+    tasks = search.search(Task.objects.visible_to(request.user), query)
+    tasks = only_fields(tasks, TaskSerializer, fields, also=paginator.ordering)
+    page = await paginator.apaginate_queryset(tasks, request)
+    serializer = TaskSerializer(page, many=True, fields=fields, context={'request': request})
+    return paginator.get_paginated_response(serializer.data)
+
+
+@async_api_view(['GET'], permission_classes=[IsAuthenticated])
+async def export_tasks(request):
+    """CSV / NDJSON download (see tasks.views.export_tasks)"""
+    return export_response(request, Task.objects.visible_to(request.user).for_export(), 'tasks')
+
+
+@async_api_view(['GET'], permission_classes=[IsAuthenticated])
+async def task_detail(request, pk):
+    """A single task (see tasks.views.task_detail)"""
+    fields = requested_fields(request, TaskSerializer, collection=False)
+    tasks = only_fields(Task.objects.all(), TaskSerializer, fields, also=('assigned_user', 'updated_at'))
+    task = await aget_object_or_404(tasks, pk=pk)
+
+    is_admin = request.user.role == 'admin'
+    is_assigned_staff = request.user.role == 'staff' and task.assigned_user_id == request.user.id
+    if not is_admin and not is_assigned_staff:
+        return Response(
+            {'detail': 'You do not have permission to view this task.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    etag = make_etag(request, task.updated_at, await task_cache.aglobal_version())
+    unchanged = not_modified(request, etag, task.updated_at)
+    if unchanged:
+        return unchanged
+
+    serializer = TaskSerializer(task, fields=fields, context={'request': request})
+    return set_validators(Response(serializer.data, status=status.HTTP_200_OK), etag, task.updated_at)
+
+
+@async_api_view(['PATCH'], permission_classes=[IsAuthenticated])
+async def update_task_status(request, pk):
+    """Update only the status of a task (see tasks.views.update_task_status)"""
+    task = await aget_object_or_404(Task.objects.select_related(*TASK_RELATED), pk=pk)
+
+    is_admin = request.user.role == 'admin'
+    is_assigned_staff = request.user.role == 'staff' and task.assigned_user_id == request.user.id
+    if not is_admin and not is_assigned_staff:
+        return Response(
+            {'detail': 'You do not have permission to update this task.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    if 'status' not in request.data:
+        return Response({'detail': 'Status field is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    allowed_statuses = [key for key, _ in Task.STATUS_CHOICES]
+    if request.data['status'] not in allowed_statuses:
+        return Response(
+            {'detail': f'Invalid status. Must be one of: {", ".join(allowed_statuses)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    task.status = request.data['status']
+    # The signals run in a worker thread; the request context (activity/middleware.py)
+    # goes with them, so the STATUS_CHANGED entry names the caller
+    await task.asave(update_fields=['status', 'updated_at'])
+
+    serializer = TaskSerializer(task, context={'request': request})
+    return Response(serializer.data, status=status.HTTP_200_OK)
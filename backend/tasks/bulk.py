@@ -0,0 +1,91 @@
+"""
+Bulk field updates for tasks, shared by the bulk API views and the admin
+actions.
+
+QuerySet.update sends no signals, so update_tasks does what the post_save
+path (activity/signals.py) would do per row, but in a fixed number of
+queries: one UPDATE, one INSERT of activities (and one of their audience
+rows), and on reassignment the previous assignees' tombstones and the new
+assignee's share of the history.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from activity.utils import build_activity, display_value, log_activities, share_task_history
+from . import cache as task_cache
+from .events import publish_task
+from .models import Task, TaskTombstone
+
+# Fields update_tasks can set
+BULK_FIELDS = ('status', 'priority', 'deadline', 'assigned_user')
+
+
+def _activity(user, task, changes):
+    """The entry the post_save signal would log for `changes` ({field: (old, new)})."""
+    username = user.username if user else 'Unknown'
+    if set(changes) == {'status'}:
+        old_status, new_status = changes['status']
+        return build_activity(
+            user, "STATUS_CHANGED", task=task,
+            description=f"Status changed from {old_status} to {new_status} by {username}",
+            changes={"from": old_status, "to": new_status},
+        )
+    return build_activity(
+        user, "UPDATED", task=task,
+        description=f"Task '{task.title}' updated by {username}",
+        changes={field: {'old': display_value(old), 'new': display_value(new)} for field, (old, new) in changes.items()},
+    )
+
+
+def update_tasks(user, tasks, **values):
+    """
+    Set `values` (status, priority, deadline and/or assigned_user, a User)
+    on `tasks` with one UPDATE, and log, notify and invalidate as a save
+    of each would. Tasks that already have the values are skipped. The
+    instances are updated in place; returns the ones that changed.
+
+    The tasks only need the fields being set, plus id and title.
+    """
+    unknown = set(values) - set(BULK_FIELDS)
+    if unknown:
+        raise ValueError(f"Can't bulk update {', '.join(sorted(unknown))}")
+    assignee = values.pop('assigned_user', None)
+    if assignee is not None:
+        values['assigned_user_id'] = assignee.id
+
+    changed, previous_assignees = [], {}
+    for task in tasks:
+        changes = {field: (getattr(task, field), value) for field, value in values.items()
+                   if getattr(task, field) != value}
+        if changes:
+            changed.append((task, changes))
+            previous_assignees[task.id] = task.assigned_user_id
+    if not changed:
+        return []
+
+    now = timezone.now()
+    event = {field: value for field, value in values.items() if field != 'assigned_user_id'}
+    if assignee is not None:
+        event.update(assigned_user=assignee.id, assigned_user_name=assignee.username)
+    reassigned = [task for task, changes in changed if 'assigned_user_id' in changes]
+
+    with transaction.atomic():
+        Task.objects.filter(id__in=[task.id for task, _ in changed]).update(**values, updated_at=now)
+        task_cache.invalidate_tasks((set(previous_assignees.values()) | {values.get('assigned_user_id')}) - {None})
+        activities = []
+        for task, changes in changed:
+            for field, value in values.items():
+                setattr(task, field, value)
+            task.updated_at = now
+            publish_task('updated', {'id': task.id, **event, 'updated_at': now},
+                         sorted({previous_assignees[task.id], task.assigned_user_id}))
+            # Built after the assignment so the snapshot names the new assignee
+            activities.append(_activity(user, task, changes))
+        if reassigned:
+            share_task_history(reassigned, assignee.id)
+            TaskTombstone.objects.bulk_create([
+                TaskTombstone(task_id=task.id, user_id=previous_assignees[task.id], reason=TaskTombstone.REASSIGNED)
+                for task in reassigned
+            ])
+        log_activities(activities)
+    return [task for task, _ in changed]
@@ -0,0 +1,130 @@
+"""
+Rendered-response cache for the task list.
+
+Entries are keyed by user, role, negotiated media type, request path and
+the version counters of the scopes the response depends on:
+
+    - 'admin'        every task (shared by all admins)
+    - 'user:<id>'    tasks assigned to that staff member
+    - 'all'          data shown on every list (e.g. usernames)
+
+Writers never delete entries; they bump the affected counters
+(tasks/signals.py for per-row saves/deletes, the bulk views for
+QuerySet.update/bulk_create), so old entries become unreachable and expire.
+The counters live in the cache too, so enable it (settings.TASK_LIST_CACHE)
+only on a backend that every worker process shares.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+ADMIN_SCOPE = 'admin'
+GLOBAL_SCOPE = 'all'
+
+
+def _cache():
+    return caches[settings.TASK_LIST_CACHE['ALIAS']]
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def scope_for(user):
+    return ADMIN_SCOPE if getattr(user, 'role', None) == 'admin' else user_scope(user.id)
+
+
+def _version_key(scope):
+    return f'tasks:list:version:{scope}'
+
+
+def _versions(*scopes):
+    """Current counter of each scope; missing counters read as 0."""
+    found = _cache().get_many([_version_key(scope) for scope in scopes])
+    return [found.get(_version_key(scope), 0) for scope in scopes]
+
+
+async def _aversions(*scopes):
+    found = await _cache().aget_many([_version_key(scope) for scope in scopes])
+    return [found.get(_version_key(scope), 0) for scope in scopes]
+
+
+def _bump(scopes):
+    cache = _cache()
+    for key in {_version_key(scope) for scope in scopes}:
+        # add() is a no-op if the counter exists; incr() is atomic on shared
+        # backends. Counters never expire so a bump can't be forgotten.
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def invalidate(*scopes):
+    """
+    Bump scopes now and again after commit, so a read that raced the open
+    transaction can't keep stale data cached under the new version.
+    """
+    _bump(scopes)
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def invalidate_tasks(assigned_user_ids):
+    """Invalidate the admin lists and the lists of the given assignees."""
+    invalidate(ADMIN_SCOPE, *(user_scope(user_id) for user_id in assigned_user_ids if user_id))
+
+
+def global_version():
+    """
+    The GLOBAL_SCOPE counter. Usernames are rendered on task and activity
+    rows without moving their timestamps, so ETags include it too.
+    """
+    return _versions(GLOBAL_SCOPE)[0]
+
+
+async def aglobal_version():
+    return (await _aversions(GLOBAL_SCOPE))[0]
+
+
+def response_key(request):
+    return _response_key(request, *_versions(scope_for(request.user), GLOBAL_SCOPE))
+
+
+async def aresponse_key(request):
+    return _response_key(request, *await _aversions(scope_for(request.user), GLOBAL_SCOPE))
+
+
+def _response_key(request, scope_version, global_version):
+    user = request.user
+    # The same URL renders differently per Accept, e.g. 'application/json; indent=4'
+    variant = f'{request.accepted_media_type}\n{request.get_full_path()}'
+    path = hashlib.md5(variant.encode(), usedforsecurity=False).hexdigest()
+    return f'tasks:list:{user.id}:{getattr(user, "role", "")}:{scope_version}.{global_version}:{path}'
+
+
+def get_response(key):
+    """Cached {'etag', 'content', 'content_type'} for key, or None."""
+    if not settings.TASK_LIST_CACHE['ENABLED']:
+        return None
+    return _cache().get(key)
+
+
+async def aget_response(key):
+    if not settings.TASK_LIST_CACHE['ENABLED']:
+        return None
+    return await _cache().aget(key)
+
+
+def set_response(key, etag, content, content_type):
+    if settings.TASK_LIST_CACHE['ENABLED']:
+        _cache().set(key, {'etag': etag, 'content': content, 'content_type': content_type},
+                     settings.TASK_LIST_CACHE['TIMEOUT'])
+
+
+async def aset_response(key, etag, content, content_type):
+    if settings.TASK_LIST_CACHE['ENABLED']:
+        await _cache().aset(key, {'etag': etag, 'content': content, 'content_type': content_type},
+                            settings.TASK_LIST_CACHE['TIMEOUT'])
@@ -0,0 +1,29 @@
+from backend import events
+from .models import Task
+
+# What a 'created' event carries
+CREATED_FIELDS = Task.TRACKED_FIELDS + ('created_by_id', 'created_at')
+
+
+def publish_task(action, task, assignees):
+    """
+    Push a task change to the live stream (backend/stream.py) for admins
+    and the given assignees. `task` is the serialized task, or only its id
+    and changed fields (task_fields).
+    """
+    events.publish('task', {'action': action, 'task': task}, assignees)
+
+
+def task_fields(task, fields):
+    """
+    The id, updated_at and `fields` (attribute names) of `task`, read from
+    the instance alone: a save shouldn't pay for serializing the task or
+    loading its users. Foreign keys are sent as ids under the field name,
+    with assigned_user_name when the assignee is already loaded.
+    """
+    data = {'id': task.id, 'updated_at': task.updated_at}
+    for attname in fields:
+        data[attname.removesuffix('_id')] = getattr(task, attname)
+    if 'assigned_user_id' in fields and Task.assigned_user.is_cached(task):
+        data['assigned_user_name'] = task.assigned_user.username
+    return data
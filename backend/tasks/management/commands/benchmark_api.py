@@ -0,0 +1,253 @@
+import json
+import statistics
+import time
+from collections import Counter
+from dataclasses import dataclass
+from importlib import import_module
+from itertools import count
+from typing import Callable, Optional
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+
+from activity.models import Activity
+from tasks.models import Task
+from users.models import User
+from users.serializers import TokenObtainPairWithClaimsSerializer
+
+URL_MODULES = ('tasks.urls', 'users.urls', 'activity.urls')
+BULK_SIZE = 50
+PASSWORD = 'benchmark-password'
+
+
+@dataclass
+class Scenario:
+    name: str                       # URL name
+    method: str
+    role: Optional[str]             # 'admin', 'staff' or None (anonymous)
+    path: Callable[[dict], str]
+    data: Callable[[dict], Optional[dict]] = lambda ctx: None
+    writes: bool = False            # rolled back after every request
+
+    @property
+    def label(self):
+        return f'{self.name} ({self.role or "anon"})'
+
+
+def _ids(ctx):
+    return ctx['admin_task_ids'][:BULK_SIZE]
+
+
+SCENARIOS = [
+    # ---- tasks/urls.py ----
+    Scenario('task_list', 'get', 'admin', lambda ctx: reverse('task_list') + '?page_size=100'),
+    Scenario('task_list', 'get', 'staff', lambda ctx: reverse('task_list') + '?page_size=100'),
+    Scenario('task_summary', 'get', 'staff', lambda ctx: reverse('task_summary')),
+    Scenario('task_changes', 'get', 'staff', lambda ctx: reverse('task_changes')),
+    Scenario('search_tasks', 'get', 'admin', lambda ctx: reverse('search_tasks') + '?q=login'),
+    Scenario('export_tasks', 'get', 'staff', lambda ctx: reverse('export_tasks')),
+    Scenario('task_detail', 'get', 'staff', lambda ctx: reverse('task_detail', args=[ctx['staff_task_id']])),
+    Scenario('create_task', 'post', 'admin', lambda ctx: reverse('create_task'), lambda ctx: {
+        'title': 'Benchmark task', 'description': 'Created by benchmark_api',
+        'assigned_user': ctx['staff'].id, 'deadline': timezone.localdate().isoformat(),
+    }, writes=True),
+    Scenario('edit_task', 'patch', 'admin', lambda ctx: reverse('edit_task', args=[ctx['staff_task_id']]),
+             lambda ctx: {'title': 'Benchmark edit', 'priority': 'high'}, writes=True),
+    Scenario('update_task_status', 'patch', 'staff',
+             lambda ctx: reverse('update_task_status', args=[ctx['staff_task_id']]),
+             lambda ctx: {'status': 'completed'}, writes=True),
+    Scenario('delete_task', 'delete', 'admin', lambda ctx: reverse('delete_task', args=[ctx['staff_task_id']]),
+             writes=True),
+    Scenario('bulk_create_tasks', 'post', 'admin', lambda ctx: reverse('bulk_create_tasks'), lambda ctx: {
+        'tasks': [{'title': f'Bulk {i}', 'description': 'Created by benchmark_api',
+                   'assigned_user': ctx['staff'].id, 'deadline': timezone.localdate().isoformat()}
+                  for i in range(BULK_SIZE)],
+    }, writes=True),
+    Scenario('bulk_update_task_status', 'patch', 'admin', lambda ctx: reverse('bulk_update_task_status'),
+             lambda ctx: {'ids': _ids(ctx), 'status': 'in_progress'}, writes=True),
+    Scenario('bulk_reassign_tasks', 'patch', 'admin', lambda ctx: reverse('bulk_reassign_tasks'),
+             lambda ctx: {'ids': _ids(ctx), 'assigned_user': ctx['staff'].id}, writes=True),
+    Scenario('bulk_delete_tasks', 'post', 'admin', lambda ctx: reverse('bulk_delete_tasks'),
+             lambda ctx: {'ids': _ids(ctx)}, writes=True),
+
+    # ---- users/urls.py ----
+    Scenario('signup', 'post', None, lambda ctx: reverse('signup'), lambda ctx: {
+        'email': f'bench{next(ctx["sequence"])}@example.com', 'username': f'bench{next(ctx["sequence"])}',
+        'password': 'pw123456', 'role': 'staff',
+    }, writes=True),
+    Scenario('login', 'post', None, lambda ctx: reverse('login'),
+             lambda ctx: {'email': ctx['login_user'].email, 'password': PASSWORD}),
+    Scenario('token_refresh', 'post', None, lambda ctx: reverse('token_refresh'),
+             lambda ctx: {'refresh': ctx['refresh']}),
+    Scenario('user-profile', 'get', 'staff', lambda ctx: reverse('user-profile')),
+    Scenario('user_list', 'get', 'admin', lambda ctx: reverse('user_list')),
+
+    # ---- activity/urls.py ----
+    Scenario('api-root', 'get', 'staff', lambda ctx: reverse('api-root')),
+    Scenario('activity-list', 'get', 'admin', lambda ctx: reverse('activity-list')),
+    Scenario('activity-list', 'get', 'staff', lambda ctx: reverse('activity-list')),
+    Scenario('activity-detail', 'get', 'admin', lambda ctx: reverse('activity-detail', args=[ctx['activity_id']])),
+    Scenario('activity-recent', 'get', 'staff', lambda ctx: reverse('activity-recent')),
+    Scenario('activity-by-task', 'get', 'staff',
+             lambda ctx: reverse('activity-by-task') + f'?task_id={ctx["staff_task_id"]}'),
+    Scenario('activity-export', 'get', 'staff', lambda ctx: reverse('activity-export')),
+]
+
+
+def url_names():
+    """Every named URL in URL_MODULES."""
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns)
+            elif pattern.name:
+                yield pattern.name
+    return {name for module in URL_MODULES for name in walk(import_module(module).urlpatterns)}
+
+
+def percentile(quantiles, samples, p):
+    return quantiles[p - 1] if quantiles else samples[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every endpoint in tasks/, users/ and activity/ urls through the "
+        "test client and report p50/p95/p99 latency, queries per request and "
+        "response bytes. Run seed_data first for realistic volumes. Writes are "
+        "rolled back after each request and the whole run is rolled back at "
+        "the end. --json writes the results for comparing runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help="Measured requests per endpoint.")
+        parser.add_argument('--warmup', type=int, default=3, help="Unmeasured requests per endpoint first.")
+        parser.add_argument('--only', nargs='+', help="Run only these URL names.")
+        parser.add_argument('--cold-cache', action='store_true', help="Clear the cache before every request.")
+        parser.add_argument('--json', dest='json_path', help="Write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        missing = url_names() - {scenario.name for scenario in SCENARIOS}
+        if missing:
+            self.stderr.write(f"No benchmark scenario for: {', '.join(sorted(missing))}")
+        scenarios = [s for s in SCENARIOS if not options['only'] or s.name in options['only']]
+        if not scenarios:
+            raise CommandError("No scenarios match --only.")
+
+        with transaction.atomic():
+            ctx = self.context()
+            results = [self.run(scenario, ctx, options) for scenario in scenarios]
+            transaction.set_rollback(True)
+
+        self.report(results)
+        if options['json_path']:
+            with open(options['json_path'], 'w') as out:
+                json.dump({'meta': self.meta(options), 'endpoints': results}, out, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['json_path']}"))
+
+    # ---- setup ----
+
+    def context(self):
+        admin = User.objects.filter(role='admin').first()
+        # The busiest staff member: the worst case for staff views
+        staff = User.objects.filter(role='staff').annotate(task_count=Count('tasks')).order_by('-task_count').first()
+        staff_task = Task.objects.filter(assigned_user=staff).order_by('id').first()
+        activity = Activity.objects.order_by('-id').first()
+        if admin is None or staff_task is None or activity is None:
+            raise CommandError("Not enough data to benchmark; run `manage.py seed_data` first.")
+
+        login_user = User.objects.create_user(email='benchmark-login@example.com', username='benchmark-login',
+                                              password=PASSWORD, role='staff')
+        return {
+            'admin': admin,
+            'staff': staff,
+            'staff_task_id': staff_task.id,
+            'admin_task_ids': list(Task.objects.order_by('id').values_list('id', flat=True)[:BULK_SIZE]),
+            'activity_id': activity.id,
+            'login_user': login_user,
+            'refresh': str(TokenObtainPairWithClaimsSerializer.get_token(login_user)),
+            'tokens': {
+                role: str(TokenObtainPairWithClaimsSerializer.get_token(user).access_token)
+                for role, user in (('admin', admin), ('staff', staff))
+            },
+            'sequence': count(),
+        }
+
+    # ---- measuring ----
+
+    def request(self, client, scenario, ctx):
+        headers = {'Authorization': f'Bearer {ctx["tokens"][scenario.role]}'} if scenario.role else {}
+        data = scenario.data(ctx)
+        call = getattr(client, scenario.method)
+        if data is not None:
+            return call(scenario.path(ctx), json.dumps(data), content_type='application/json', headers=headers)
+        return call(scenario.path(ctx), headers=headers)
+
+    def measure(self, client, scenario, ctx, cold_cache):
+        if cold_cache:
+            cache.clear()
+        sid = transaction.savepoint() if scenario.writes else None
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = self.request(client, scenario, ctx)
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+            elapsed = (time.perf_counter() - start) * 1000
+        if sid:
+            transaction.savepoint_rollback(sid)
+        return elapsed, len(queries), len(body), response.status_code
+
+    def run(self, scenario, ctx, options):
+        client = Client(SERVER_NAME='localhost')
+        for _ in range(options['warmup']):
+            self.measure(client, scenario, ctx, options['cold_cache'])
+        samples = [self.measure(client, scenario, ctx, options['cold_cache']) for _ in range(options['requests'])]
+
+        latencies = sorted(sample[0] for sample in samples)
+        quantiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else []
+        return {
+            'name': scenario.name,
+            'label': scenario.label,
+            'method': scenario.method.upper(),
+            'path': scenario.path(ctx),
+            'requests': len(samples),
+            'status': dict(Counter(sample[3] for sample in samples)),
+            'p50_ms': round(percentile(quantiles, latencies, 50), 3),
+            'p95_ms': round(percentile(quantiles, latencies, 95), 3),
+            'p99_ms': round(percentile(quantiles, latencies, 99), 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'queries_mean': round(statistics.fmean(sample[1] for sample in samples), 2),
+            'queries_max': max(sample[1] for sample in samples),
+            'bytes_mean': round(statistics.fmean(sample[2] for sample in samples)),
+        }
+
+    # ---- output ----
+
+    def meta(self, options):
+        return {
+            'finished': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'requests': options['requests'],
+            'warmup': options['warmup'],
+            'cold_cache': options['cold_cache'],
+            'rows': {
+                'users': User.objects.count(),
+                'tasks': Task.objects.count(),
+                'activities': Activity.objects.count(),
+            },
+        }
+
+    def report(self, results):
+        self.stdout.write(
+            f"{'endpoint':<36}{'status':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'bytes':>10}"
+        )
+        for row in results:
+            codes = ','.join(str(code) for code in sorted(row['status']))
+            self.stdout.write(
+                f"{row['label']:<36}{codes:>10}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+                f"{row['queries_mean']:>9.1f}{row['bytes_mean']:>10}"
+            )
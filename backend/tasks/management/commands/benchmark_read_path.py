@@ -0,0 +1,103 @@
+import time
+import uuid
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from activity.models import Activity
+from activity.serializers import ACTIVITY_ROWS, ActivitySerializer
+from backend.renderers import FastJSONRenderer
+from tasks.models import Task
+from tasks.serializers import TASK_ROWS, TaskSerializer
+from users.models import User
+
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the serializer read path (ModelSerializer + JSONRenderer) "
+        "with the values() fast path (backend/fastpath.py + FastJSONRenderer) "
+        "for task and activity lists. Seeds its own rows under a throwaway "
+        "user, reads only those, and rolls them back; existing rows are left "
+        "alone, but run it against a development database, not production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per path; the best is reported.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'list':<10}{'rows':>8}{'serializer ms':>16}{'fast ms':>10}{'speedup':>9}  same bytes")
+        for rows in options['rows']:
+            with transaction.atomic():
+                self.user = self.seed(rows)
+                self.compare('tasks', rows, options['repeat'], self.tasks_slow, self.tasks_fast)
+                self.compare('activity', rows, options['repeat'], self.activity_slow, self.activity_fast)
+                transaction.set_rollback(True)
+
+    # ---- the two paths, over the seeded rows only ----
+
+    def tasks_slow(self):
+        tasks = self.tasks().select_related('assigned_user', 'created_by')
+        return JSONRenderer().render(TaskSerializer(tasks, many=True).data)
+
+    def tasks_fast(self):
+        rows = self.tasks().values(*TASK_ROWS.columns(TASK_ROWS.field_names))
+        return FastJSONRenderer().render(TASK_ROWS.render(rows))
+
+    def activity_slow(self):
+        activities = self.activities().for_feed()
+        return JSONRenderer().render(ActivitySerializer(activities, many=True).data)
+
+    def activity_fast(self):
+        rows = self.activities().values(*ACTIVITY_ROWS.columns(ACTIVITY_ROWS.field_names))
+        return FastJSONRenderer().render(ACTIVITY_ROWS.render(rows))
+
+    def tasks(self):
+        return Task.objects.filter(created_by=self.user).order_by('id')
+
+    def activities(self):
+        return Activity.objects.filter(user=self.user).order_by('id')
+
+    # ---- helpers ----
+
+    def compare(self, name, rows, repeat, slow, fast):
+        slow_ms, slow_out = self.best_of(repeat, slow)
+        fast_ms, fast_out = self.best_of(repeat, fast)
+        self.stdout.write(
+            f"{name:<10}{rows:>8}{slow_ms:>16.1f}{fast_ms:>10.1f}{slow_ms / fast_ms:>8.1f}x  "
+            f"{'yes' if slow_out == fast_out else 'NO'}"
+        )
+
+    @staticmethod
+    def best_of(repeat, run):
+        best, output = None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = run()
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
+
+    def seed(self, rows):
+        """Bulk-create `rows` tasks and activities owned by a new user, and return the user."""
+        # A fresh name each run, so an existing account never gets in the way
+        name = f'benchmark-{uuid.uuid4().hex[:12]}'
+        user = User.objects.create_user(email=f'{name}@example.com', username=name, password=None, role='admin')
+        today = date.today()
+        for start in range(0, rows, BATCH_SIZE):
+            tasks = Task.objects.bulk_create([
+                Task(title=f'Benchmark task {i}', description='Lorem ipsum dolor sit amet. ' * 8,
+                     assigned_user=user, created_by=user, deadline=today + timedelta(days=i % 30))
+                for i in range(start, min(start + BATCH_SIZE, rows))
+            ])
+            Activity.objects.bulk_create([
+                Activity(user=user, task=task, action='CREATED', description=f"Task '{task.title}' created",
+                         changes={'status': {'old': 'pending', 'new': 'in_progress'}},
+                         details={'task_id': task.id, 'task_title': task.title})
+                for task in tasks
+            ])
+        return user
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from users.models import User
+from users.serializers import TokenObtainPairWithClaimsSerializer
+from .benchmark_api import percentile
+
+
+def parse_target(value):
+    name, sep, url = value.partition('=')
+    parts = urlsplit(url)
+    if not sep or parts.scheme != 'http' or not parts.hostname:
+        raise CommandError(f"--target must look like name=http://host:port/path, got {value!r}")
+    path = parts.path or '/'
+    if parts.query:
+        path += f'?{parts.query}'
+    return {'name': name, 'url': url, 'host': parts.hostname, 'port': parts.port or 80, 'path': path}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare running deployments under slow clients. Slow clients trickle "
+        "their request and read the response a few bytes at a time, tying up "
+        "whatever serves them, while fast clients measure p50/p95/p99 "
+        "latency and errors. Start the servers first, e.g. "
+        "`gunicorn backend.wsgi -w 4 -b :8000` (sync workers) and "
+        "`gunicorn backend.asgi:application -k uvicorn.workers.UvicornWorker -w 4 -b :8001`, then "
+        "--target wsgi=http://127.0.0.1:8000/api/tasks/ "
+        "--target asgi=http://127.0.0.1:8001/api/async/tasks/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True, type=parse_target,
+                            help="name=http://host:port/path; repeat to compare deployments.")
+        parser.add_argument('--user', help="Email of the user to authenticate as (default: the first admin).")
+        parser.add_argument('--slow-clients', type=int, default=50)
+        parser.add_argument('--trickle', type=float, default=0.5,
+                            help="Seconds between the slow clients' chunks, both ways.")
+        parser.add_argument('--chunk', type=int, default=16, help="Bytes per slow chunk.")
+        parser.add_argument('--fast-requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=10, help="Fast clients.")
+        parser.add_argument('--ramp', type=float, default=1.0, help="Seconds slow clients run before measuring.")
+        parser.add_argument('--timeout', type=float, default=10.0, help="Per fast request, in seconds.")
+        parser.add_argument('--json', dest='json_path', help="Write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(email=options['user']) if options['user'] else User.objects.filter(role='admin')
+        user = users.order_by('id').first()
+        if user is None:
+            raise CommandError("No such user; pass --user or run `manage.py seed_data` first.")
+        self.token = str(TokenObtainPairWithClaimsSerializer.get_token(user).access_token)
+
+        results = [asyncio.run(self.run(target, options)) for target in options['target']]
+        self.report(results)
+        if options['json_path']:
+            meta = {key: options[key] for key in ('slow_clients', 'trickle', 'chunk', 'fast_requests', 'concurrency')}
+            with open(options['json_path'], 'w') as out:
+                json.dump({'meta': dict(meta, finished=timezone.now().isoformat()), 'targets': results},
+                          out, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['json_path']}"))
+
+    # ---- clients ----
+
+    def raw_request(self, target):
+        return (
+            f"GET {target['path']} HTTP/1.1\r\n"
+            f"Host: {target['host']}:{target['port']}\r\n"
+            f"Authorization: Bearer {self.token}\r\n"
+            "Accept: application/json\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode()
+
+    async def slow_client(self, target, options, completed):
+        """Requests over and over, sending and reading `chunk` bytes every `trickle` seconds."""
+        raw, chunk, trickle = self.raw_request(target), options['chunk'], options['trickle']
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(target['host'], target['port'])
+            except OSError:
+                await asyncio.sleep(trickle)
+                continue
+            try:
+                for start in range(0, len(raw), chunk):
+                    writer.write(raw[start:start + chunk])
+                    await writer.drain()
+                    await asyncio.sleep(trickle)
+                while await reader.read(chunk):
+                    await asyncio.sleep(trickle)
+                completed.append(1)
+            except OSError:
+                pass
+            finally:
+                writer.close()
+
+    async def fast_request(self, target, timeout):
+        start = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(target['host'], target['port']), timeout)
+            try:
+                writer.write(self.raw_request(target))
+                await writer.drain()
+                response = await asyncio.wait_for(reader.read(), timeout - (time.perf_counter() - start))
+            finally:
+                writer.close()
+            status = int(response.split(b' ', 2)[1])
+        except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+            status = None
+        return (time.perf_counter() - start) * 1000, status
+
+    async def run(self, target, options):
+        completed = []
+        slow = [asyncio.create_task(self.slow_client(target, options, completed))
+                for _ in range(options['slow_clients'])]
+        await asyncio.sleep(options['ramp'])
+
+        remaining = iter(range(options['fast_requests']))
+        samples = []
+
+        async def fast_client():
+            for _ in remaining:
+                samples.append(await self.fast_request(target, options['timeout']))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(fast_client() for _ in range(options['concurrency'])))
+        elapsed = time.perf_counter() - started
+        for task in slow:
+            task.cancel()
+        await asyncio.gather(*slow, return_exceptions=True)
+
+        ok = sum(1 for _, status in samples if status == 200)
+        latencies = sorted(ms for ms, status in samples if status == 200) or [0.0]
+        quantiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else []
+        return {
+            'name': target['name'],
+            'url': target['url'],
+            'fast_ok': ok,
+            'fast_failed': len(samples) - ok,
+            'requests_per_s': round(ok / elapsed, 1) if elapsed else 0,
+            'p50_ms': round(percentile(quantiles, latencies, 50), 1),
+            'p95_ms': round(percentile(quantiles, latencies, 95), 1),
+            'p99_ms': round(percentile(quantiles, latencies, 99), 1),
+            'slow_completed': len(completed),
+        }
+
+    # ---- output ----
+
+    def report(self, results):
+        self.stdout.write(
+            f"{'target':<12}{'ok':>6}{'failed':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'slow done':>11}"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['name']:<12}{row['fast_ok']:>6}{row['fast_failed']:>8}{row['requests_per_s']:>9}"
+                f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['slow_completed']:>11}"
+            )
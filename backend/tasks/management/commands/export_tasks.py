@@ -0,0 +1,13 @@
+from backend.export import ExportCommand
+from tasks.models import Task
+
+
+class Command(ExportCommand):
+    help = (
+        "Export tasks as CSV or NDJSON, streamed in chunks so memory use "
+        "stays flat. --user limits the export to that user's tasks."
+    )
+
+    def get_queryset(self, user):
+        tasks = Task.objects.all() if user is None else Task.objects.visible_to(user)
+        return tasks.for_export()
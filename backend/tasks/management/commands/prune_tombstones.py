@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks.models import TaskTombstone
+from tasks.views import SYNC_MAX_AGE
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete task tombstones older than the task_changes sync window "
+        "(SYNC_MAX_AGE). Clients whose cursor is that old are told to reset "
+        "instead, so these rows are never read again. Deletes in bounded "
+        "chunks and is safe to interrupt and re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true', help="Count what would be deleted.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - SYNC_MAX_AGE
+        expired = TaskTombstone.objects.filter(timestamp__lt=cutoff)
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"{expired.count()} tombstones older than {cutoff:%Y-%m-%d} would be deleted."))
+            return
+
+        total = 0
+        while True:
+            # One range over the (timestamp, id) index per chunk
+            ids = list(expired.order_by('timestamp', 'id').values_list('id', flat=True)[:options['chunk_size']])
+            if not ids:
+                break
+            total += TaskTombstone.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Deleted {total} tombstones older than {cutoff:%Y-%m-%d}."))
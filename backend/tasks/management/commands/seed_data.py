@@ -0,0 +1,146 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from activity.models import Activity, ActivityAudience
+from tasks import cache as task_cache
+from tasks.models import Task
+from users.models import User
+
+VERBS = ['Fix', 'Review', 'Write', 'Update', 'Deploy', 'Investigate', 'Refactor', 'Document', 'Test', 'Plan']
+SUBJECTS = ['login flow', 'invoice export', 'search index', 'onboarding email', 'billing report',
+            'API docs', 'release notes', 'dashboard charts', 'mobile layout', 'backup job',
+            'password reset', 'audit log', 'payment webhook', 'user settings', 'CSV import']
+SENTENCES = [
+    'Customers reported this after the last release.',
+    'Check the logs from the weekend first.',
+    'Coordinate with the support team before changing anything.',
+    'The current behaviour is documented in the wiki.',
+    'Add tests that cover the edge cases we found.',
+    'Keep the old endpoint working until clients migrate.',
+    'This blocks the quarterly report.',
+    'Measure before and after so we can compare.',
+]
+
+# Weights, roughly what a live tracker looks like
+STATUSES = (('pending', 45), ('in_progress', 30), ('completed', 25))
+PRIORITIES = (('low', 30), ('medium', 50), ('high', 20))
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic users, tasks and activity in bulk for load testing. "
+        "Statuses and priorities follow realistic weights, deadlines spread "
+        "from overdue to three months out, and assignment is skewed (a few "
+        "staff hold most tasks, Zipf-like). Use --seed for repeatable data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help="Staff users to create.")
+        parser.add_argument('--admins', type=int, default=3)
+        parser.add_argument('--tasks', type=int, default=10000)
+        parser.add_argument('--activities-per-task', type=float, default=3.0,
+                            help="Average activity entries per task (the CREATED entry included).")
+        parser.add_argument('--skew', type=float, default=1.1, help="Zipf exponent for assignment; 0 is uniform.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, help="Random seed.")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['admins'] < 1:
+            raise CommandError("Need at least one staff user and one admin.")
+        if options['activities_per_task'] < 1:
+            raise CommandError("--activities-per-task must be at least 1 (every task has a CREATED entry).")
+        self.random = random.Random(options['seed'])
+        self.now = timezone.now()
+
+        with transaction.atomic():
+            admins, staff = self.seed_users(options['admins'], options['users'])
+            weights = [1 / (rank + 1) ** options['skew'] for rank in range(len(staff))]
+            tasks = activities = 0
+            batch_size = options['batch_size']
+            for start in range(0, options['tasks'], batch_size):
+                size = min(batch_size, options['tasks'] - start)
+                batch = self.seed_tasks(size, admins, self.random.choices(staff, weights, k=size))
+                activities += self.seed_activities(batch, options['activities_per_task'])
+                tasks += len(batch)
+                self.stdout.write(f"Seeded {tasks} tasks, {activities} activities")
+        # bulk_create sends no signals; drop every cached task list
+        task_cache.invalidate(task_cache.GLOBAL_SCOPE)
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(admins)} admins, {len(staff)} staff, {tasks} tasks and {activities} activities."
+        ))
+
+    def seed_users(self, admins, staff):
+        run = f'{self.random.getrandbits(32):08x}'
+        password = make_password(None)  # unusable; benchmarks mint tokens instead
+        users = User.objects.bulk_create([
+            User(email=f'seed-{run}-{i}@example.com', username=f'seed-{run}-{i}', password=password,
+                 role='admin' if i < admins else 'staff')
+            for i in range(admins + staff)
+        ])
+        return users[:admins], users[admins:]
+
+    def seed_tasks(self, size, admins, assignees):
+        status_names, status_weights = zip(*STATUSES)
+        priority_names, priority_weights = zip(*PRIORITIES)
+        today = self.now.date()
+        return Task.objects.bulk_create([
+            Task(
+                title=f'{self.random.choice(VERBS)} {self.random.choice(SUBJECTS)}',
+                description=' '.join(self.random.sample(SENTENCES, self.random.randint(1, 4))),
+                assigned_user=assignee,
+                created_by=self.random.choice(admins),
+                status=self.random.choices(status_names, status_weights)[0],
+                priority=self.random.choices(priority_names, priority_weights)[0],
+                # Mostly upcoming, with a tail of overdue tasks
+                deadline=today + timedelta(days=round(self.random.triangular(-30, 90, 7))),
+            )
+            for assignee in assignees
+        ])
+
+    def seed_activities(self, tasks, per_task):
+        activities = []
+        for task in tasks:
+            details = {'task_id': task.id, 'task_title': task.title, 'assigned_user_id': task.assigned_user_id}
+            # CREATED up to 180 days ago, then follow-ups after it
+            when = self.now - timedelta(seconds=self.random.randint(0, 180 * 86400))
+            activities.append(Activity(
+                user=task.created_by, task=task, action='CREATED', timestamp=when, details=details,
+                description=f"Task '{task.title}' created by {task.created_by.username}",
+            ))
+            for _ in range(self.follow_ups(per_task - 1)):
+                when += timedelta(seconds=self.random.randint(60, 7 * 86400))
+                if when > self.now:
+                    break
+                activities.append(self.follow_up(task, when, details))
+        activities = Activity.objects.bulk_create(activities)
+        ActivityAudience.objects.bulk_create(
+            [row for activity in activities for row in ActivityAudience.rows_for(activity)]
+        )
+        return len(activities)
+
+    def follow_ups(self, mean):
+        # Geometric count with the requested mean: most tasks get a few, some many
+        count = 0
+        while mean > 0 and self.random.random() < mean / (mean + 1):
+            count += 1
+        return count
+
+    def follow_up(self, task, when, details):
+        actor = task.assigned_user
+        if self.random.random() < 0.6:
+            old, new = self.random.sample(['pending', 'in_progress', 'completed'], 2)
+            return Activity(
+                user=actor, task=task, action='STATUS_CHANGED', timestamp=when, details=details,
+                description=f"Status changed from {old} to {new} by {actor.username}",
+                changes={'from': old, 'to': new},
+            )
+        return Activity(
+            user=actor, task=task, action='UPDATED', timestamp=when, details=details,
+            description=f"Task '{task.title}' updated by {actor.username}",
+            changes={'priority': {'old': 'medium', 'new': task.priority}},
+        )
@@ -0,0 +1,148 @@
+from django.db import migrations
+
+# Snapshot of the schema described in tasks/search.py.
+
+SQLITE_DOCUMENT = """
+    SELECT t.id, t.title, t.description,
+           coalesce(a.username, '') || ' ' || coalesce(c.username, '')
+    FROM tasks_task t
+    LEFT JOIN users_user a ON a.id = t.assigned_user_id
+    LEFT JOIN users_user c ON c.id = t.created_by_id
+"""
+
+SQLITE_SCHEMA = [
+    "CREATE VIRTUAL TABLE task_search USING fts5(title, description, people, tokenize='porter unicode61')",
+    f"""
+    CREATE TRIGGER task_search_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO task_search (rowid, title, description, people) {SQLITE_DOCUMENT} WHERE t.id = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER task_search_update AFTER UPDATE OF title, description, assigned_user_id, created_by_id
+    ON tasks_task
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description
+      OR old.assigned_user_id IS NOT new.assigned_user_id OR old.created_by_id IS NOT new.created_by_id
+    BEGIN
+        DELETE FROM task_search WHERE rowid = old.id;
+        INSERT INTO task_search (rowid, title, description, people) {SQLITE_DOCUMENT} WHERE t.id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER task_search_delete AFTER DELETE ON tasks_task BEGIN
+        DELETE FROM task_search WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER task_search_username AFTER UPDATE OF username ON users_user
+    WHEN old.username IS NOT new.username
+    BEGIN
+        DELETE FROM task_search WHERE rowid IN (
+            SELECT id FROM tasks_task WHERE assigned_user_id = new.id OR created_by_id = new.id
+        );
+        INSERT INTO task_search (rowid, title, description, people) {SQLITE_DOCUMENT}
+        WHERE t.assigned_user_id = new.id OR t.created_by_id = new.id;
+    END
+    """,
+]
+
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS task_search_username',
+    'DROP TRIGGER IF EXISTS task_search_delete',
+    'DROP TRIGGER IF EXISTS task_search_update',
+    'DROP TRIGGER IF EXISTS task_search_insert',
+    'DROP TABLE IF EXISTS task_search',
+]
+
+POSTGRES_SCHEMA = [
+    # No foreign key to tasks_task so Django's TRUNCATE-based flushes work;
+    # deletes are handled by the trigger below.
+    'CREATE TABLE task_search (task_id bigint PRIMARY KEY, document tsvector NOT NULL)',
+    'CREATE INDEX task_search_document_idx ON task_search USING GIN (document)',
+    """
+    CREATE FUNCTION task_search_refresh(task_ids bigint[]) RETURNS void AS $$
+        INSERT INTO task_search (task_id, document)
+        SELECT t.id,
+               setweight(to_tsvector('english', coalesce(t.title, '')), 'A') ||
+               setweight(to_tsvector('english', coalesce(t.description, '')), 'B') ||
+               setweight(to_tsvector('simple', coalesce(a.username, '') || ' ' || coalesce(c.username, '')), 'C')
+        FROM tasks_task t
+        LEFT JOIN users_user a ON a.id = t.assigned_user_id
+        LEFT JOIN users_user c ON c.id = t.created_by_id
+        WHERE t.id = ANY(task_ids)
+        ON CONFLICT (task_id) DO UPDATE SET document = EXCLUDED.document
+    $$ LANGUAGE sql
+    """,
+    """
+    CREATE FUNCTION task_search_task_changed() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM task_search WHERE task_id = OLD.id;
+        ELSE
+            PERFORM task_search_refresh(ARRAY[NEW.id]);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER task_search_task AFTER INSERT OR DELETE OR UPDATE OF title, description, assigned_user_id, created_by_id
+    ON tasks_task FOR EACH ROW EXECUTE FUNCTION task_search_task_changed()
+    """,
+    """
+    CREATE FUNCTION task_search_username_changed() RETURNS trigger AS $$
+    BEGIN
+        PERFORM task_search_refresh(ARRAY(
+            SELECT id FROM tasks_task WHERE assigned_user_id = NEW.id OR created_by_id = NEW.id
+        ));
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER task_search_username AFTER UPDATE OF username ON users_user
+    FOR EACH ROW WHEN (OLD.username IS DISTINCT FROM NEW.username)
+    EXECUTE FUNCTION task_search_username_changed()
+    """,
+]
+
+POSTGRES_DROP = [
+    'DROP TRIGGER IF EXISTS task_search_username ON users_user',
+    'DROP TRIGGER IF EXISTS task_search_task ON tasks_task',
+    'DROP FUNCTION IF EXISTS task_search_username_changed()',
+    'DROP FUNCTION IF EXISTS task_search_task_changed()',
+    'DROP FUNCTION IF EXISTS task_search_refresh(bigint[])',
+    'DROP TABLE IF EXISTS task_search',
+]
+
+SQLITE_POPULATE = f'INSERT INTO task_search (rowid, title, description, people) {SQLITE_DOCUMENT}'
+POSTGRES_POPULATE = 'SELECT task_search_refresh(ARRAY(SELECT id FROM tasks_task))'
+
+SCHEMA = {
+    'sqlite': (SQLITE_SCHEMA + [SQLITE_POPULATE], SQLITE_DROP),
+    'postgresql': (POSTGRES_SCHEMA + [POSTGRES_POPULATE], POSTGRES_DROP),
+}
+
+
+def create_index(apps, schema_editor):
+    create, _ = SCHEMA.get(schema_editor.connection.vendor, ([], []))
+    for statement in create:
+        schema_editor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    _, drop = SCHEMA.get(schema_editor.connection.vendor, ([], []))
+    for statement in drop:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    """Full-text index for task search (see tasks/search.py); a no-op on other backends."""
+
+    dependencies = [
+        ('tasks', '0004_task_tombstones_and_sync_indexes'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -1,8 +1,33 @@
 from django.db import models
+from django.utils import timezone
 from users.models import User
 
 # Create your models here.
 
+class TaskQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Admins see every task; staff only the tasks assigned to them."""
+        if user.role == 'admin':
+            return self
+        return self.filter(assigned_user_id=user.id)
+
+    def for_export(self):
+        """Plain rows for backend/export.py, in id order (walks the primary key)."""
+        return self.order_by('id').values(
+            'id', 'title', 'description', 'status', 'priority', 'deadline',
+            'assigned_user_id', 'assigned_user__username', 'created_by_id', 'created_by__username',
+            'created_at', 'updated_at',
+        )
+
+
+class TaskTombstoneQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Admins see every deletion; staff every task that left their list."""
+        if user.role == 'admin':
+            return self.filter(reason=TaskTombstone.DELETED)
+        return self.filter(user_id=user.id)
+
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),           # lowercase!
@@ -31,7 +56,87 @@ class Task(models.Model):
 )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TaskQuerySet.as_manager()
+
+    # Fields whose changes are recorded in the activity log
+    TRACKED_FIELDS = ('title', 'description', 'status', 'priority', 'deadline', 'assigned_user_id')
+
+    class Meta:
+        indexes = [
+            # Backs the (deadline, id) keyset cursor in task_list
+            models.Index(fields=['deadline', 'id'], name='task_deadline_id_idx'),
+            models.Index(fields=['assigned_user', 'deadline', 'id'], name='task_assignee_deadline_idx'),
+            # Back the (updated_at, id) scan in task_changes
+            models.Index(fields=['updated_at', 'id'], name='task_updated_id_idx'),
+            models.Index(fields=['assigned_user', 'updated_at', 'id'], name='task_assignee_updated_idx'),
+            # Backs the admin's created_at date drill-down
+            models.Index(fields=['created_at', 'id'], name='task_created_id_idx'),
+        ]
     
     def __str__(self):
         return self.title
-  
\ No newline at end of file
+
+    # ---- change tracking ----
+    # Snapshot the tracked values as loaded so saves can be diffed without
+    # re-fetching the row. Deferred fields are simply not tracked.
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save receivers have already read the diff
+        self._snapshot_tracked()
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._snapshot_tracked()
+
+    def _snapshot_tracked(self):
+        self._loaded_values = {
+            name: self.__dict__[name] for name in self.TRACKED_FIELDS if name in self.__dict__
+        }
+
+    def get_field_changes(self):
+        """{field: (old, new)} for tracked fields changed since load or last save."""
+        loaded = getattr(self, '_loaded_values', {})
+        return {
+            name: (old, getattr(self, name))
+            for name, old in loaded.items()
+            if getattr(self, name) != old
+        }
+
+
+class TaskTombstone(models.Model):
+    """
+    Records that a task left a user's list, so task_changes can tell
+    syncing clients to drop it: either the task was deleted, or it was
+    reassigned away from `user`. Admins only see 'deleted' tombstones.
+    """
+    DELETED = 'deleted'
+    REASSIGNED = 'reassigned'
+    REASON_CHOICES = [
+        (DELETED, 'Deleted'),
+        (REASSIGNED, 'Reassigned'),
+    ]
+
+    task_id = models.BigIntegerField()
+    # The assignee who lost the task
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, null=True, related_name='+')
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
+
+    objects = TaskTombstoneQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['timestamp', 'id'], name='tombstone_ts_idx'),
+            models.Index(fields=['user', 'timestamp'], name='tombstone_user_ts_idx'),
+        ]
+
+    def __str__(self):
+        return f"Task {self.task_id} {self.reason}"
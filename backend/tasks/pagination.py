@@ -0,0 +1,52 @@
+import json
+from base64 import b64decode, b64encode
+from datetime import datetime
+
+from rest_framework.exceptions import NotFound
+
+from backend.pagination import KeysetCursorPagination
+
+
+class TaskCursorPagination(KeysetCursorPagination):
+    """
+    Tasks ordered by nearest deadline first; id breaks ties so the
+    cursor position is always unique.
+    """
+    ordering = ('deadline', 'id')
+    page_size = 20
+    max_page_size = 100
+
+
+class TaskChangesCursor:
+    """
+    The opaque `since` cursor of task_changes: the (updated_at, id)
+    position a client has synced up to, encoded like the list cursors.
+    """
+    invalid_cursor_message = 'Invalid cursor'
+
+    @staticmethod
+    def encode(updated_at, pk=0):
+        raw = json.dumps({'p': [KeysetCursorPagination._dump(updated_at), pk]}, separators=(',', ':'))
+        return b64encode(raw.encode('ascii')).decode('ascii')
+
+    @classmethod
+    def decode(cls, value):
+        try:
+            updated_at, pk = json.loads(b64decode(value.encode('ascii')))['p']
+            updated_at = KeysetCursorPagination._load(updated_at)
+            if not isinstance(updated_at, datetime) or not isinstance(pk, int):
+                raise ValueError
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(cls.invalid_cursor_message)
+        return updated_at, pk
+
+
+class TaskSearchPagination(KeysetCursorPagination):
+    """
+    Search results, best match first (rank is lower-is-better, see
+    tasks/search.py); id breaks ties. Ranks shift slightly as the index
+    changes, so a result can move between pages of a long-running scan.
+    """
+    ordering = ('rank', 'id')
+    page_size = 20
+    max_page_size = 100
@@ -0,0 +1,139 @@
+"""
+Full-text search over tasks.
+
+The index is a side table kept up to date by database triggers, so every
+write path (save, QuerySet.update, bulk_create, deletes, username changes)
+maintains it without extra queries from Django:
+
+    - SQLite:      FTS5 virtual table `task_search` (rowid = task id),
+                   ranked with bm25()
+    - PostgreSQL:  `task_search` (task_id, document tsvector) with a GIN
+                   index, ranked with ts_rank()
+    - others:      no index; falls back to icontains
+
+Indexed text is the title, the description and the assignee's and
+creator's usernames, weighted in that order. The tables and triggers are
+created by migration 0005_task_search; `manage.py rebuild_task_search`
+repopulates the index.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+# Matches words (letters/digits in any script) in the user's query
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+# The document indexed for each task (SQLite); the triggers in migration
+# 0005 build the same one.
+SQLITE_DOCUMENT = """
+    SELECT t.id, t.title, t.description,
+           coalesce(a.username, '') || ' ' || coalesce(c.username, '')
+    FROM tasks_task t
+    LEFT JOIN users_user a ON a.id = t.assigned_user_id
+    LEFT JOIN users_user c ON c.id = t.created_by_id
+"""
+
+
+def is_indexed():
+    return connection.vendor in ('sqlite', 'postgresql')
+
+
+# ---- queries ----
+
+def search_terms(query):
+    """The words of a user's query; operators and punctuation are dropped."""
+    return WORD_RE.findall(query)
+
+
+def _sqlite_match(terms):
+    # Each word as a quoted prefix term, all required: "fix"* "log"*
+    return ' '.join('"{}"*'.format(term.replace('"', '')) for term in terms)
+
+
+def _postgres_tsquery(terms):
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def search(queryset, query):
+    """
+    Filter a Task queryset to matches of `query`, annotated with `rank`
+    (lower is better). Returns queryset.none() for a query with no words.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        # Column weights: title, description, usernames
+        return queryset.extra(
+            tables=['task_search'],
+            where=['task_search.rowid = tasks_task.id', 'task_search MATCH %s'],
+            params=[_sqlite_match(terms)],
+        ).annotate(rank=RawSQL('bm25(task_search, 10.0, 5.0, 1.0)', (), output_field=FloatField()))
+
+    if vendor == 'postgresql':
+        tsquery = _postgres_tsquery(terms)
+        return queryset.extra(
+            tables=['task_search'],
+            where=['task_search.task_id = tasks_task.id',
+                   "task_search.document @@ to_tsquery('english', %s)"],
+            params=[tsquery],
+        ).annotate(rank=RawSQL(
+            "-ts_rank(task_search.document, to_tsquery('english', %s))", (tsquery,), output_field=FloatField(),
+        ))
+
+    # No index on this backend: every term must appear in a text field
+    condition = Q()
+    for term in terms:
+        condition &= (Q(title__icontains=term) | Q(description__icontains=term)
+                      | Q(assigned_user__username__icontains=term) | Q(created_by__username__icontains=term))
+    return queryset.filter(condition).annotate(rank=Value(0.0, output_field=FloatField()))
+
+
+def matching_ids(query):
+    """Subquery of task ids matching `query`, for id__in filters (e.g. the admin)."""
+    terms = search_terms(query)
+    vendor = connection.vendor
+    if vendor == 'sqlite':
+        return RawSQL('SELECT rowid FROM task_search WHERE task_search MATCH %s', (_sqlite_match(terms),))
+    return RawSQL(
+        "SELECT task_id FROM task_search WHERE document @@ to_tsquery('english', %s)", (_postgres_tsquery(terms),),
+    )
+
+
+# ---- maintenance ----
+
+def rebuild(batch_size=1000, stdout=None):
+    """Repopulate the index from tasks_task in id-ordered batches."""
+    vendor = connection.vendor
+    with connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute('DELETE FROM task_search')
+        else:
+            cursor.execute('TRUNCATE task_search')
+
+        last_id, total = 0, 0
+        while True:
+            cursor.execute(
+                'SELECT id FROM tasks_task WHERE id > %s ORDER BY id LIMIT %s', [last_id, batch_size],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+            if vendor == 'sqlite':
+                cursor.execute(
+                    f'INSERT INTO task_search (rowid, title, description, people) {SQLITE_DOCUMENT} '
+                    'WHERE t.id >= %s AND t.id <= %s', [ids[0], ids[-1]],
+                )
+            else:
+                cursor.execute('SELECT task_search_refresh(%s)', [ids])
+            last_id, total = ids[-1], total + len(ids)
+            if stdout:
+                stdout.write(f'Indexed {total} tasks')
+
+        if vendor == 'sqlite':
+            cursor.execute("INSERT INTO task_search (task_search) VALUES ('optimize')")
+    return total
@@ -1,8 +1,11 @@
 from rest_framework import serializers
+from backend.fastpath import RowMapper, column, iso_date, iso_datetime
+from backend.fieldsets import SparseFieldsetMixin
+from backend.timing import TimedSerializerMixin
 from .models import Task
 from users.models import User
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     assigned_user_name = serializers.SerializerMethodField()
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
     
@@ -23,6 +26,81 @@ class TaskSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'assigned_user_name']
+        # Default for collections (backend/fieldsets.py); ?view=full for everything
+        list_fields = [
+            'id', 'title', 'assigned_user', 'assigned_user_name', 'created_by_username',
+            'status', 'priority', 'deadline',
+        ]
+        field_columns = {
+            'assigned_user_name': ('assigned_user__username',),
+            'created_by_username': ('created_by__username',),
+        }
     
     def get_assigned_user_name(self, obj):
-        return obj.assigned_user.username if obj.assigned_user else None
\ No newline at end of file
+        return obj.assigned_user.username if obj.assigned_user else None
+
+
+# TaskSerializer's output built from values() rows, for list reads (backend/fastpath.py)
+TASK_ROWS = RowMapper(TaskSerializer, {
+    'assigned_user_name': column('assigned_user__username'),
+    # TaskSerializer leaves the key out for tasks without a creator
+    'created_by_username': column('created_by__username', omit_null=True),
+    'deadline': column('deadline', iso_date),
+    'created_at': column('created_at', iso_datetime),
+    'updated_at': column('updated_at', iso_datetime),
+})
+
+
+BULK_MAX_ITEMS = 500
+
+
+class BulkTaskItemSerializer(TaskSerializer):
+    """
+    TaskSerializer for bulk payloads. assigned_user is a plain id here and
+    is resolved for the whole list in one query by BulkTaskCreateSerializer,
+    instead of one PrimaryKeyRelatedField lookup per item.
+    """
+    assigned_user = serializers.IntegerField()
+    created_by = serializers.PrimaryKeyRelatedField(read_only=True)
+
+
+class BulkTaskCreateSerializer(serializers.Serializer):
+    tasks = BulkTaskItemSerializer(many=True, allow_empty=False, max_length=BULK_MAX_ITEMS)
+
+    def validate_tasks(self, items):
+        users = User.objects.in_bulk({item['assigned_user'] for item in items})
+        errors = []
+        for item in items:
+            user = users.get(item['assigned_user'])
+            if user is None:
+                errors.append({'assigned_user': [f'Invalid pk "{item["assigned_user"]}" - object does not exist.']})
+            else:
+                item['assigned_user'] = user
+                errors.append({})
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+
+class BulkTaskIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=BULK_MAX_ITEMS
+    )
+
+    def validate(self, attrs):
+        """Fetch every referenced task in one query; all ids must exist."""
+        ids = list(dict.fromkeys(attrs['ids']))
+        tasks = Task.objects.only('id', 'title', 'status', 'assigned_user').in_bulk(ids)
+        missing = [pk for pk in ids if pk not in tasks]
+        if missing:
+            raise serializers.ValidationError({'ids': f'Tasks not found: {", ".join(map(str, missing))}'})
+        attrs['tasks'] = [tasks[pk] for pk in ids]
+        return attrs
+
+
+class BulkTaskStatusSerializer(BulkTaskIdsSerializer):
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES)
+
+
+class BulkTaskReassignSerializer(BulkTaskIdsSerializer):
+    assigned_user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
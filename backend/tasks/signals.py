@@ -0,0 +1,56 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from activity import signals as activity_signals
+from users.models import deleting_users
+from . import cache
+from .events import CREATED_FIELDS, publish_task, task_fields
+from .models import Task, TaskTombstone
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, **kwargs):
+    """
+    Invalidate the cached lists of admins and of the new and old assignee,
+    and tell their live streams. A previous assignee also gets a tombstone
+    so their next task_changes sync drops the task.
+    """
+    assignees = {instance.assigned_user_id}
+    if created:
+        fields = CREATED_FIELDS
+    else:
+        changes = instance.get_field_changes()
+        fields = tuple(changes)
+        old, _ = changes.get('assigned_user_id', (None, None))
+        assignees.add(old)
+        if old:
+            TaskTombstone.objects.create(task_id=instance.id, user_id=old, reason=TaskTombstone.REASSIGNED)
+    cache.invalidate_tasks(assignees)
+    publish_task('created' if created else 'updated', task_fields(instance, fields), assignees)
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    # Bulk deletes write their tombstones in one INSERT (tasks/views.py).
+    # An assignee being deleted has no list left to sync, but admins still
+    # need to see the deletion.
+    if not activity_signals.is_muted():
+        user_id = instance.assigned_user_id
+        if user_id in deleting_users():
+            user_id = None
+        TaskTombstone.objects.create(task_id=instance.id, user_id=user_id, reason=TaskTombstone.DELETED)
+    cache.invalidate_tasks([instance.assigned_user_id])
+    publish_task('deleted', {'id': instance.id}, [instance.assigned_user_id])
+
+
+@receiver(post_save, sender='users.User')
+def invalidate_on_user_save(sender, instance, update_fields=None, **kwargs):
+    """Lists embed usernames; logins (last_login only) don't affect them."""
+    if update_fields and 'username' not in update_fields:
+        return
+    cache.invalidate(cache.GLOBAL_SCOPE)
+
+
+@receiver(post_delete, sender='users.User')
+def invalidate_on_user_delete(sender, instance, **kwargs):
+    cache.invalidate(cache.GLOBAL_SCOPE)
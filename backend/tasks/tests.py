@@ -1,3 +1,1000 @@
-from django.test import TestCase
+import asyncio
+import csv
+import gzip
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.db.models import Count
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.models import Session
+from django.test import LiveServerTestCase, RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from backend import dbpool
+from backend.metrics import registry
+from backend.routers import ReplicaMiddleware, ReplicaRouter
+from backend.renderers import FastJSONRenderer
+from backend.testing import QueryBudgetTestCase
+from activity.models import Activity
+from users.models import User
+from users.serializers import TokenObtainPairWithClaimsSerializer
+from .models import Task, TaskTombstone
+from .serializers import TaskSerializer
+from .pagination import TaskChangesCursor
+from .views import SYNC_MAX_AGE
+
+
+class TaskListPaginationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(email='admin@example.com', username='admin', password='pw', role='admin')
+        self.staff = User.objects.create_user(email='staff@example.com', username='staff', password='pw')
+        today = date.today()
+        # Several tasks share a deadline so the id tie-breaker is exercised
+        Task.objects.bulk_create([
+            Task(title=f'Task {i}', description='', assigned_user=self.staff,
+                 created_by=self.admin, deadline=today + timedelta(days=i // 3))
+            for i in range(25)
+        ])
+        self.client.force_authenticate(self.admin)
+
+    def test_walks_every_task_once_in_deadline_order(self):
+        url = reverse('task_list') + '?page_size=7'
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(response.data['results'])
+            url = response.data['next']
+
+        expected = list(Task.objects.order_by('deadline', 'id').values_list('id', flat=True))
+        self.assertEqual([task['id'] for task in seen], expected)
+
+    def test_previous_link_returns_prior_page(self):
+        first = self.client.get(reverse('task_list') + '?page_size=5')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [t['id'] for t in back.data['results']],
+            [t['id'] for t in first.data['results']],
+        )
+
+    def test_page_size_is_capped_and_never_counts(self):
+        Task.objects.bulk_create([
+            Task(title='Extra', description='', assigned_user=self.staff, deadline=date.today())
+            for _ in range(120)
+        ])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('task_list') + '?page_size=1000')
+        self.assertEqual(len(response.data['results']), 100)
+        self.assertFalse(any('COUNT(' in q['sql'].upper() for q in ctx.captured_queries))
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(reverse('task_list') + '?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_staff_only_sees_assigned_tasks(self):
+        other = User.objects.create_user(email='other@example.com', username='other', password='pw')
+        Task.objects.create(title='Not mine', description='', assigned_user=other, deadline=date.today())
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse('task_list') + '?page_size=100')
+        self.assertEqual(len(response.data['results']), 25)
+
+
+class TaskSummaryTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(email='admin@example.com', username='admin', password='pw', role='admin')
+        self.staff = User.objects.create_user(email='staff@example.com', username='staff', password='pw')
+        today = date.today()
+        Task.objects.bulk_create([
+            Task(title='Late', description='', assigned_user=self.staff, deadline=today - timedelta(days=1)),
+            Task(title='Late but done', description='', assigned_user=self.staff, status='completed',
+                 deadline=today - timedelta(days=1)),
+            Task(title='Soon', description='', assigned_user=self.staff, priority='high', deadline=today + timedelta(days=1)),
+            Task(title='Later', description='', assigned_user=self.admin, status='in_progress',
+                 deadline=today + timedelta(days=30)),
+        ])
+
+    def test_admin_summary_counts_everything(self):
+        self.client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('task_summary'))
+        data = response.data
+        self.assertEqual(data['total'], 4)
+        self.assertEqual(data['by_status'], {'pending': 2, 'in_progress': 1, 'completed': 1})
+        self.assertEqual(data['by_priority'], {'low': 0, 'medium': 3, 'high': 1})
+        self.assertEqual(data['overdue'], 1)
+        self.assertEqual(data['due_soon'], 1)
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+    def test_staff_summary_is_scoped(self):
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse('task_summary'))
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(response.data['by_status']['in_progress'], 0)
+
+
+class TaskQueryBudgetTests(QueryBudgetTestCase):
+    def test_task_list(self):
+        # The two ETag lookups (newest update, newest tombstone) and the page
+        self.assertQueryBudget(3, reverse('task_list'), seed=self.seed_tasks)
+        self.assertQueryBudget(3, reverse('task_list'), user=self.staff, seed=self.seed_tasks)
+
+    def test_task_summary(self):
+        self.assertQueryBudget(2, reverse('task_summary'), seed=self.seed_tasks)
+        self.assertQueryBudget(2, reverse('task_summary'), user=self.staff, seed=self.seed_tasks)
+
+    def test_task_detail(self):
+        task = self.seed_tasks(1)[0]
+        self.assertQueryBudget(1, reverse('task_detail', args=[task.pk]), user=self.staff)
+
+    def test_create_task(self):
+        data = {'title': 'New', 'description': 'D', 'assigned_user': self.staff.pk, 'deadline': '2030-01-01'}
+        self.assertQueryBudget(4, reverse('create_task'), method='post', data=data)
+
+    def test_edit_task(self):
+        task = self.seed_tasks(1)[0]
+        self.assertQueryBudget(4, reverse('edit_task', args=[task.pk]), method='patch', data={'title': 'Renamed'})
+
+    def test_update_task_status(self):
+        task = self.seed_tasks(1)[0]
+        self.assertQueryBudget(4, reverse('update_task_status', args=[task.pk]), user=self.staff,
+                               method='patch', data={'status': 'completed'})
+
+    def test_delete_task(self):
+        task = self.seed_tasks(1)[0]
+        self.assertQueryBudget(6, reverse('delete_task', args=[task.pk]), method='delete')
+
+
+class BulkTaskOperationTests(QueryBudgetTestCase):
+    def payload(self, n):
+        return {'tasks': [
+            {'title': f'Bulk {i}', 'description': 'D', 'assigned_user': self.staff.pk, 'deadline': '2030-01-01'}
+            for i in range(n)
+        ]}
+
+    def test_bulk_create_is_constant_in_queries(self):
+        url = reverse('bulk_create_tasks')
+        small, _ = self.count_queries('post', url, self.admin, self.payload(2))
+        large, response = self.count_queries('post', url, self.admin, self.payload(40))
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.data), 40)
+        self.assertEqual(Activity.objects.filter(action='CREATED').count(), 42)
+
+    def test_bulk_create_rejects_unknown_user_for_whole_batch(self):
+        payload = self.payload(2)
+        payload['tasks'][1]['assigned_user'] = 999999
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(reverse('bulk_create_tasks'), payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['tasks'][0], {})
+        self.assertIn('assigned_user', response.data['tasks'][1])
+        self.assertFalse(Task.objects.exists())
+
+    def test_bulk_status_logs_only_real_changes(self):
+        tasks = self.seed_tasks(5)
+        Task.objects.filter(pk=tasks[0].pk).update(status='completed')
+        ids = [task.pk for task in tasks]
+        self.assertQueryBudget(6, reverse('bulk_update_task_status'), method='patch',
+                               data={'ids': ids, 'status': 'completed'})
+        self.assertEqual(Task.objects.filter(status='completed').count(), 5)
+        logged = Activity.objects.filter(action='STATUS_CHANGED')
+        self.assertEqual(logged.count(), 4)
+        self.assertEqual(logged.first().changes, {'from': 'pending', 'to': 'completed'})
+
+    def test_bulk_reassign_moves_history_to_new_assignee(self):
+        other = self.make_user()
+        tasks = self.seed_tasks(3)
+        self.client.force_authenticate(self.admin)
+        response = self.client.patch(reverse('bulk_reassign_tasks'),
+                                     {'ids': [t.pk for t in tasks], 'assigned_user': other.pk}, format='json')
+        self.assertEqual(response.data, {'updated': 3})
+        self.assertEqual(Task.objects.filter(assigned_user=other).count(), 3)
+        # 3 seeded CREATED entries shared plus 3 UPDATED entries
+        self.assertEqual(Activity.objects.filter(audience__user=other).count(), 6)
+
+    def test_bulk_delete_logs_snapshots(self):
+        tasks = self.seed_tasks(4)
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(reverse('bulk_delete_tasks'), {'ids': [t.pk for t in tasks]}, format='json')
+        self.assertEqual(response.data, {'deleted': 4})
+        self.assertFalse(Task.objects.exists())
+        deleted = Activity.objects.filter(action='DELETED')
+        self.assertEqual(deleted.count(), 4)
+        self.assertTrue(all(a.task_id is None and a.details['task_title'] for a in deleted))
+
+    def test_missing_ids_fail_whole_request(self):
+        task = self.seed_tasks(1)[0]
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(reverse('bulk_delete_tasks'), {'ids': [task.pk, 999999]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Task.objects.filter(pk=task.pk).exists())
+
+    def test_staff_cannot_use_bulk_endpoints(self):
+        self.client.force_authenticate(self.staff)
+        response = self.client.post(reverse('bulk_delete_tasks'), {'ids': [1]}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class TaskAdminBulkActionTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin.is_staff = self.admin.is_superuser = True
+        self.admin.save()
+        self.client.force_login(self.admin)
+
+    def act(self, tasks, **fields):
+        data = {'action': 'update_selected', '_selected_action': [task.pk for task in tasks], **fields}
+        if fields:
+            data['apply'] = 'Update tasks'
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('admin:tasks_task_changelist'), data)
+        return response, len(ctx.captured_queries)
+
+    def test_asks_for_the_values_first(self):
+        tasks = self.seed_tasks(3)
+        response, _ = self.act(tasks)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'selected tasks')
+        self.assertContains(response, tasks[0].title)
+        self.assertFalse(Activity.objects.exclude(action='CREATED').exists())
+
+        response, _ = self.act(tasks, priority='')
+        self.assertContains(response, 'Choose at least one field to change.')
+
+    def test_updates_selected_tasks_in_constant_queries(self):
+        other = self.make_user()
+        counts = []
+        for size in (2, 25):
+            tasks = self.seed_tasks(size)
+            response, queries = self.act(tasks, status='completed', priority='high', assigned_user=other.pk)
+            self.assertEqual(response.status_code, 302)
+            counts.append(queries)
+        self.assertEqual(counts[0], counts[1])
+
+        self.assertEqual(Task.objects.filter(status='completed', priority='high', assigned_user=other).count(), 27)
+        updated = Activity.objects.filter(action='UPDATED')
+        self.assertEqual(updated.count(), 27)
+        self.assertEqual(updated.first().changes['assigned_user_id'], {'old': self.staff.pk, 'new': other.pk})
+        self.assertEqual(TaskTombstone.objects.filter(user=self.staff, reason=TaskTombstone.REASSIGNED).count(), 27)
+        # The new assignee's feed has the tasks' earlier history too
+        self.assertEqual(Activity.objects.filter(audience__user=other).count(), 54)
+
+    def test_single_field_updates_are_constant_in_queries(self):
+        for fields in ({'status': 'completed'}, {'priority': 'low'}):
+            counts = [self.act(self.seed_tasks(size), **fields)[1] for size in (2, 25)]
+            self.assertEqual(counts[0], counts[1], fields)
+
+    def test_status_only_logs_status_changes_for_changed_tasks(self):
+        tasks = self.seed_tasks(3)
+        Task.objects.filter(pk=tasks[0].pk).update(status='completed')
+        self.act(tasks, status='completed')
+        logged = Activity.objects.filter(action='STATUS_CHANGED')
+        self.assertEqual(logged.count(), 2)
+        self.assertEqual(logged.first().changes, {'from': 'pending', 'to': 'completed'})
+
+
+class TaskConditionalGetTests(QueryBudgetTestCase):
+    def test_unchanged_list_is_304_without_loading_tasks(self):
+        self.seed_tasks(3)
+        self.client.force_authenticate(self.staff)
+        etag = self.client.get(reverse('task_list'))['ETag']
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.client.get(reverse('task_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b'')
+        # Only the validator lookups run when the response isn't cached
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+    def test_edit_and_delete_change_the_list_etag(self):
+        tasks = self.seed_tasks(3)
+        self.client.force_authenticate(self.admin)
+        etag = self.client.get(reverse('task_list'))['ETag']
+        self.client.patch(reverse('edit_task', args=[tasks[0].pk]), {'title': 'Renamed'}, format='json')
+        edited = self.client.get(reverse('task_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(edited.status_code, 200)
+        self.client.delete(reverse('delete_task', args=[tasks[1].pk]))
+        deleted = self.client.get(reverse('task_list'), HTTP_IF_NONE_MATCH=edited['ETag'])
+        self.assertEqual(deleted.status_code, 200)
+
+    def test_reassigning_away_changes_the_list_etag(self):
+        tasks = self.seed_tasks(3)
+        other = self.make_user()
+        self.client.force_authenticate(self.staff)
+        etag = self.client.get(reverse('task_list'))['ETag']
+        self.client.force_authenticate(self.admin)
+        self.client.patch(reverse('edit_task', args=[tasks[0].pk]), {'assigned_user': other.pk}, format='json')
+        self.client.force_authenticate(self.staff)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('task_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertFalse(any('COUNT(' in q['sql'].upper() for q in ctx.captured_queries))
+
+    def test_renaming_a_user_changes_the_list_and_detail_etags(self):
+        task = self.seed_tasks(1)[0]
+        self.client.force_authenticate(self.staff)
+        urls = [reverse('task_list'), reverse('task_detail', args=[task.pk])]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        self.staff.username = 'renamed'
+        self.staff.save(update_fields=['username'])
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200, url)
+
+    def test_etag_is_per_user(self):
+        self.seed_tasks(1, assigned_user=self.admin)
+        self.client.force_authenticate(self.admin)
+        etag = self.client.get(reverse('task_list'))['ETag']
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(reverse('task_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [])
+
+    def test_detail_honours_if_modified_since(self):
+        task = self.seed_tasks(1)[0]
+        self.client.force_authenticate(self.staff)
+        first = self.client.get(reverse('task_detail', args=[task.pk]))
+        again = self.client.get(reverse('task_detail', args=[task.pk]),
+                                HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(again.status_code, 304)
+
+
+@override_settings(TASK_LIST_CACHE=dict(settings.TASK_LIST_CACHE, ENABLED=True))
+class TaskListCacheTests(QueryBudgetTestCase):
+    def get(self, user, **extra):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('task_list'), **extra)
+        return response, len(ctx.captured_queries)
+
+    def test_repeat_read_is_served_from_cache(self):
+        self.seed_tasks(3)
+        first, _ = self.get(self.staff)
+        again, queries = self.get(self.staff)
+        self.assertEqual(queries, 0)
+        self.assertEqual(again.content, first.content)
+        self.assertEqual(again['ETag'], first['ETag'])
+        not_modified, queries = self.get(self.staff, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual((not_modified.status_code, queries), (304, 0))
+
+    def test_each_media_type_is_cached_apart(self):
+        self.seed_tasks(2)
+        plain, _ = self.get(self.staff)
+        indented, _ = self.get(self.staff, HTTP_ACCEPT='application/json; indent=4')
+        self.assertNotEqual(indented.content, plain.content)
+        self.assertIn(b'\n    ', indented.content)
+        again, queries = self.get(self.staff, HTTP_ACCEPT='application/json; indent=4')
+        self.assertEqual((again.content, queries), (indented.content, 0))
+
+    def test_edit_invalidates_assignee_and_admin_lists(self):
+        task = self.seed_tasks(1)[0]
+        self.get(self.staff)
+        self.get(self.admin)
+        self.client.force_authenticate(self.admin)
+        self.client.patch(reverse('edit_task', args=[task.pk]), {'title': 'Renamed'}, format='json')
+        for user in (self.staff, self.admin):
+            response, _ = self.get(user)
+            self.assertEqual(response.json()['results'][0]['title'], 'Renamed')
+
+    def test_reassignment_invalidates_previous_assignee(self):
+        other = self.make_user()
+        task = self.seed_tasks(1)[0]
+        self.get(self.staff)
+        self.client.force_authenticate(self.admin)
+        self.client.patch(reverse('edit_task', args=[task.pk]), {'assigned_user': other.pk}, format='json')
+        response, _ = self.get(self.staff)
+        self.assertEqual(response.json()['results'], [])
+        response, _ = self.get(other)
+        self.assertEqual(len(response.json()['results']), 1)
+
+    def test_bulk_status_invalidates(self):
+        tasks = self.seed_tasks(2)
+        self.get(self.staff)
+        self.client.force_authenticate(self.admin)
+        self.client.patch(reverse('bulk_update_task_status'),
+                          {'ids': [t.pk for t in tasks], 'status': 'completed'}, format='json')
+        response, _ = self.get(self.staff)
+        self.assertEqual({t['status'] for t in response.json()['results']}, {'completed'})
+
+    def test_other_staff_lists_stay_cached(self):
+        other = self.make_user()
+        self.seed_tasks(1, assigned_user=other)
+        task = self.seed_tasks(1)[0]
+        self.get(other)
+        task.title = 'Renamed'
+        task.save()
+        _, queries = self.get(other)
+        self.assertEqual(queries, 0)
+
+
+@mock.patch('tasks.views.SYNC_LAG', timedelta(0))
+class TaskChangesTests(QueryBudgetTestCase):
+    def sync(self, user, since=None, **params):
+        self.client.force_authenticate(user)
+        if since:
+            params['since'] = since
+        response = self.client.get(reverse('task_changes'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_returns_only_changes_since_cursor(self):
+        tasks = self.seed_tasks(3)
+        first = self.sync(self.staff)
+        self.assertEqual(len(first['tasks']), 3)
+        self.assertEqual(self.sync(self.staff, first['cursor'])['tasks'], [])
+
+        self.client.force_authenticate(self.admin)
+        self.client.patch(reverse('edit_task', args=[tasks[1].pk]), {'title': 'Renamed'}, format='json')
+        self.client.delete(reverse('delete_task', args=[tasks[2].pk]))
+        delta = self.sync(self.staff, first['cursor'])
+        self.assertEqual([t['title'] for t in delta['tasks']], ['Renamed'])
+        self.assertEqual(delta['deleted'], [tasks[2].pk])
+
+    def test_reassignment_is_a_tombstone_for_previous_assignee_only(self):
+        other = self.make_user()
+        task = self.seed_tasks(1)[0]
+        staff_cursor = self.sync(self.staff)['cursor']
+        admin_cursor = self.sync(self.admin)['cursor']
+        self.client.force_authenticate(self.admin)
+        self.client.patch(reverse('bulk_reassign_tasks'), {'ids': [task.pk], 'assigned_user': other.pk}, format='json')
+
+        self.assertEqual(self.sync(self.staff, staff_cursor)['deleted'], [task.pk])
+        admin_delta = self.sync(self.admin, admin_cursor)
+        self.assertEqual((admin_delta['deleted'], len(admin_delta['tasks'])), ([], 1))
+
+    def test_pages_through_large_change_sets(self):
+        self.seed_tasks(5)
+        seen, cursor, more = [], None, True
+        while more:
+            page = self.sync(self.staff, cursor, page_size=2)
+            seen += [t['id'] for t in page['tasks']]
+            cursor, more = page['cursor'], page['has_more']
+        self.assertEqual(sorted(seen), sorted(Task.objects.values_list('id', flat=True)))
+
+    def test_stale_cursor_resets(self):
+        self.seed_tasks(2)
+        stale = TaskChangesCursor.encode(timezone.now() - timedelta(days=365))
+        data = self.sync(self.staff, stale)
+        self.assertTrue(data['reset'])
+        self.assertEqual(len(data['tasks']), 2)
+
+    def test_invalid_cursor_is_404(self):
+        self.client.force_authenticate(self.staff)
+        self.assertEqual(self.client.get(reverse('task_changes'), {'since': 'nope'}).status_code, 404)
+
+    def test_tombstones_past_the_sync_window_are_pruned(self):
+        _, recent = TaskTombstone.objects.bulk_create([
+            TaskTombstone(task_id=1, user=self.staff, reason=TaskTombstone.DELETED,
+                          timestamp=timezone.now() - SYNC_MAX_AGE - timedelta(hours=1)),
+            TaskTombstone(task_id=2, user=self.staff, reason=TaskTombstone.DELETED,
+                          timestamp=timezone.now() - SYNC_MAX_AGE + timedelta(hours=1)),
+        ])
+        out = StringIO()
+        call_command('prune_tombstones', '--dry-run', stdout=out)
+        self.assertIn('1 tombstones', out.getvalue())
+        self.assertEqual(TaskTombstone.objects.count(), 2)
+        call_command('prune_tombstones', '--chunk-size', '1', stdout=StringIO())
+        self.assertEqual(list(TaskTombstone.objects.values_list('id', flat=True)), [recent.id])
+
+    def test_query_budget(self):
+        cursor = TaskChangesCursor.encode(timezone.now() - timedelta(days=1))
+        self.assertQueryBudget(2, reverse('task_changes') + f'?since={cursor}', user=self.staff, seed=self.seed_tasks)
+
+
+class TaskSearchTests(QueryBudgetTestCase):
+    def search(self, user, q, **params):
+        self.client.force_authenticate(user)
+        return self.client.get(reverse('search_tasks'), {'q': q, **params})
+
+    def make_task(self, title, description='D', assigned_user=None):
+        return Task.objects.create(title=title, description=description,
+                                   assigned_user=assigned_user or self.staff, deadline=date.today())
+
+    def test_ranks_title_matches_first(self):
+        in_description = self.make_task('Write docs', 'Explain the login flow')
+        in_title = self.make_task('Fix login bug')
+        self.make_task('Unrelated')
+        results = self.search(self.admin, 'login').data['results']
+        self.assertEqual([t['id'] for t in results], [in_title.id, in_description.id])
+
+    def test_index_follows_edits_deletes_and_bulk_writes(self):
+        task = self.make_task('Draft report')
+        task.title = 'Final summary'
+        task.save()
+        self.assertEqual(self.search(self.admin, 'draft').data['results'], [])
+        self.assertEqual(len(self.search(self.admin, 'summ').data['results']), 1)
+
+        self.seed_tasks(3)  # bulk_create
+        self.assertEqual(len(self.search(self.admin, 'seeded').data['results']), 3)
+        task.delete()
+        self.assertEqual(self.search(self.admin, 'summary').data['results'], [])
+
+    def test_matches_usernames_and_respects_visibility(self):
+        other = self.make_user()
+        self.make_task('Mine')
+        self.make_task('Theirs', assigned_user=other)
+        self.assertEqual(len(self.search(self.admin, other.username).data['results']), 1)
+        self.assertEqual(self.search(self.staff, 'theirs').data['results'], [])
+
+    def test_paginates_ranked_results(self):
+        for i in range(5):
+            self.make_task(f'Report {i}', 'report ' * (i + 1))
+        seen, url = [], reverse('search_tasks') + '?q=report&page_size=2'
+        self.client.force_authenticate(self.admin)
+        while url:
+            data = self.client.get(url).data
+            seen += [t['id'] for t in data['results']]
+            url = data['next']
+        self.assertEqual(sorted(seen), sorted(Task.objects.values_list('id', flat=True)))
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.make_task('Quote "test" AND (parens)')
+        self.assertEqual(self.search(self.admin, '"test" AND (').status_code, 200)
+        self.assertEqual(self.search(self.admin, '').status_code, 400)
+
+    def test_rebuild_command(self):
+        self.make_task('Indexed')
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM task_search')
+        call_command('rebuild_task_search', stdout=StringIO())
+        self.assertEqual(len(self.search(self.admin, 'indexed').data['results']), 1)
+
+    def test_query_budget(self):
+        self.assertQueryBudget(1, reverse('search_tasks') + '?q=seeded', seed=self.seed_tasks)
+
+
+class TaskExportTests(QueryBudgetTestCase):
+    def export(self, user, **params):
+        self.client.force_authenticate(user)
+        response = self.client.get(reverse('export_tasks'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_csv_is_scoped_like_the_task_list(self):
+        mine = self.seed_tasks(3)
+        self.seed_tasks(2, assigned_user=self.make_user())
+
+        rows = list(csv.DictReader(StringIO(self.export(self.staff).decode())))
+        self.assertEqual([int(row['id']) for row in rows], [task.id for task in mine])
+        self.assertEqual(rows[0]['assigned_user__username'], self.staff.username)
+        self.assertEqual(rows[0]['deadline'], mine[0].deadline.isoformat())
+        self.assertEqual(len(list(csv.DictReader(StringIO(self.export(self.admin).decode())))), 5)
+
+    def test_gzipped_ndjson_in_one_query(self):
+        self.seed_tasks(5)
+        self.client.force_authenticate(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('export_tasks'), {'output': 'ndjson', 'gzip': 'true'})
+            content = b''.join(response.streaming_content)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('tasks.ndjson.gz', response['Content-Disposition'])
+        rows = [json.loads(line) for line in gzip.decompress(content).splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['status'], 'pending')
+
+    def test_unknown_output_format_is_rejected(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse('export_tasks'), {'output': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_streams_chunk_by_chunk_under_asgi(self):
+        await sync_to_async(self.seed_tasks)(3)
+        token = str(RefreshToken.for_user(self.admin).access_token)
+        with mock.patch('backend.export.CHUNK_SIZE', 1):
+            response = await self.async_client.get(reverse('export_tasks'), headers={'Authorization': f'Bearer {token}'})
+            self.assertTrue(response.is_async)  # Django won't list() it first
+            chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 3)  # one per task, the header with the first
+
+    def test_command_writes_a_users_tasks(self):
+        self.seed_tasks(2)
+        self.seed_tasks(1, assigned_user=self.admin)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tasks.ndjson.gz')
+            call_command('export_tasks', path, '--output', 'ndjson', '--gzip', '--user', self.staff.email,
+                         stdout=StringIO())
+            with gzip.open(path) as export:
+                self.assertEqual(len(export.read().splitlines()), 2)
+
+
+class TaskSparseFieldsetTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.task = self.seed_tasks(3)[0]
+        self.client.force_authenticate(self.admin)
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, ctx.captured_queries[-1]['sql']
+
+    def test_lists_default_to_the_compact_representation(self):
+        response, sql = self.get(reverse('task_list'))
+        self.assertEqual(list(response.data['results'][0]), TaskSerializer.Meta.list_fields)
+        self.assertNotIn('"description"', sql)
+
+        response, sql = self.get(reverse('task_list'), view='full')
+        self.assertEqual(list(response.data['results'][0]), TaskSerializer.Meta.fields)
+        self.assertIn('"description"', sql)
+
+    def test_requested_fields_drive_columns_and_joins(self):
+        response, sql = self.get(reverse('task_list'), fields='id,title')
+        self.assertEqual(response.data['results'][0], {'id': self.task.id, 'title': self.task.title})
+        self.assertNotIn('JOIN', sql)
+
+        response, sql = self.get(reverse('search_tasks'), q='task', omit='assigned_user_name,created_by_username')
+        self.assertNotIn('assigned_user_name', response.data['results'][0])
+        self.assertNotIn('users_user', sql)
+
+    def test_detail_is_full_unless_trimmed(self):
+        url = reverse('task_detail', args=[self.task.id])
+        self.assertEqual(list(self.get(url)[0].data), TaskSerializer.Meta.fields)
+        response, sql = self.get(url, omit='description')
+        self.assertNotIn('description', response.data)
+        self.assertNotIn('"description"', sql)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('task_list'), {'fields': 'title,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', str(response.data))
+        self.assertEqual(self.client.get(reverse('task_list'), {'view': 'tiny'}).status_code, 400)
+
+
+class TaskFastPathTests(QueryBudgetTestCase):
+    """task_list skips TaskSerializer and JSONRenderer; the bytes must not change."""
+
+    def setUp(self):
+        super().setUp()
+        self.seed_tasks(3)
+        Task.objects.create(title='Ünïcode \u2028 "quoted"\n', description='ßeta <b>', assigned_user=self.admin,
+                            created_by=None, deadline=date.today())
+        self.client.force_authenticate(self.admin)
+
+    def test_list_bytes_match_the_serializer(self):
+        tasks = Task.objects.select_related('assigned_user', 'created_by').order_by('deadline', 'id')
+        full = TaskSerializer.Meta.fields
+        compact = TaskSerializer.Meta.list_fields
+        for params, fields in (({}, compact), ({'view': 'full'}, full), ({'omit': 'title'}, compact[:1] + compact[2:])):
+            response = self.client.get(reverse('task_list'), params)
+            expected = dict(response.data, results=TaskSerializer(tasks, many=True, fields=fields).data)
+            self.assertEqual(response.content, JSONRenderer().render(expected), params)
+
+    def test_renderer_falls_back_without_orjson(self):
+        data = {'text': 'line\u2028sep', 'when': timezone.now(), 'big': 2 ** 70, 'ids': [1, None]}
+        expected = JSONRenderer().render(data)
+        self.assertEqual(FastJSONRenderer().render(data), expected)
+        with mock.patch('backend.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(data), expected)
+
+
+class PerformanceMetricsTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seed_tasks(3)
+        registry.reset()
+
+    def test_server_timing_breaks_the_request_down(self):
+        self.client.force_authenticate(self.admin)
+        url = reverse('task_detail', args=[Task.objects.first().id])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        timing = {part.split(';')[0]: part for part in response['Server-Timing'].split(', ')}
+        self.assertEqual(list(timing), ['db', 'serialize', 'render', 'view', 'total'])
+        self.assertIn(f'desc="{len(queries)} queries"', timing['db'])
+
+    def test_server_timing_is_only_sent_to_admins_by_default(self):
+        def headers(user, mode=settings.PERFORMANCE_METRICS['SERVER_TIMING']):
+            # A new client, since each loads the middleware once
+            with self.settings(PERFORMANCE_METRICS=dict(settings.PERFORMANCE_METRICS, SERVER_TIMING=mode)):
+                client = self.client_class()
+                client.force_authenticate(user)
+                return client.get(reverse('task_list')).headers
+
+        self.assertNotIn('Server-Timing', headers(self.staff))
+        self.assertIn('Server-Timing', headers(self.staff, mode='true'))
+        self.assertNotIn('Server-Timing', headers(self.admin, mode='false'))
+
+    async def test_server_timing_counts_queries_under_asgi(self):
+        # Sync views run in another thread than the middleware
+        token = TokenObtainPairWithClaimsSerializer.get_token(self.admin).access_token
+        for name in ('task_list', 'async_task_list'):
+            await sync_to_async(cache.clear)()
+            response = await self.async_client.get(reverse(name), headers={'Authorization': f'Bearer {token}'})
+            db = response['Server-Timing'].split(', ')[0]
+            self.assertRegex(db, r'desc="[1-9]\d* queries"', name)
+
+    def test_metrics_endpoint_is_admin_only_and_counts_per_route(self):
+        self.client.force_authenticate(self.admin)
+        for _ in range(3):
+            self.client.get(reverse('task_list'))
+        self.client.force_authenticate(self.staff)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{route="api/tasks/",method="GET"} 3', body)
+        self.assertIn('http_request_duration_seconds_bucket{route="api/tasks/",method="GET",le="+Inf"} 3', body)
+        self.assertIn('http_requests_total{route="api/metrics/",method="GET",status="403"} 1', body)
+        self.assertIn('http_request_phase_seconds_total{route="api/tasks/",phase="serialize"}', body)
+
+    @override_settings(PERFORMANCE_METRICS=dict(settings.PERFORMANCE_METRICS, ENABLED=False))
+    def test_disabled_adds_no_header_and_records_nothing(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse('task_list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(registry.histograms, {})
+
+
+class AsyncTaskViewTests(QueryBudgetTestCase):
+    """tasks/async_views.py must answer exactly like tasks/views.py."""
+
+    def setUp(self):
+        super().setUp()
+        self.tasks = self.seed_tasks(5)
+
+    def test_async_reads_match_the_sync_views(self):
+        task = self.tasks[0]
+        requests = [
+            ('task_list', [], {'page_size': 2}),
+            ('task_list', [], {'view': 'full'}),
+            ('task_summary', [], {}),
+            ('task_changes', [], {'page_size': 3}),
+            ('search_tasks', [], {'q': 'task'}),
+            ('search_tasks', [], {}),
+            ('task_detail', [task.id], {'omit': 'description'}),
+        ]
+        for user in (self.admin, self.staff):
+            self.client.force_authenticate(user)
+            for name, args, params in requests:
+                sync = self.client.get(reverse(name, args=args), params)
+                cache.clear()
+                async_ = self.client.get(reverse(f'async_{name}', args=args), params)
+                self.assertEqual(async_.status_code, sync.status_code, name)
+                self.assertEqual(async_.content.replace(b'/api/async/tasks/', b'/api/tasks/'), sync.content, name)
+
+        self.client.force_authenticate(self.make_user())
+        self.assertEqual(self.client.get(reverse('async_task_detail', args=[task.id])).status_code, 403)
+
+    @override_settings(TASK_LIST_CACHE=dict(settings.TASK_LIST_CACHE, ENABLED=True))
+    def test_conditional_get_and_cache_hits_run_no_task_queries(self):
+        self.client.force_authenticate(self.staff)
+        first = self.client.get(reverse('async_task_list'))
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(reverse('async_task_list'))
+            unchanged = self.client.get(reverse('async_task_list'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(cached.content, first.content)
+        self.assertEqual(unchanged.status_code, 304)
+
+    async def test_concurrent_status_updates_log_their_own_caller(self):
+        """The acting user comes from the request context, not a thread local shared by requests."""
+        other = await sync_to_async(self.make_user)()
+        other_task = (await sync_to_async(self.seed_tasks)(1, assigned_user=other))[0]
+        requests = [(self.staff, self.tasks[0]), (other, other_task), (self.admin, self.tasks[1])]
+
+        async def patch(user, task):
+            token = TokenObtainPairWithClaimsSerializer.get_token(user).access_token
+            return await self.async_client.patch(
+                reverse('async_update_task_status', args=[task.id]), {'status': 'completed'},
+                content_type='application/json', headers={'Authorization': f'Bearer {token}'},
+            )
+
+        responses = await asyncio.gather(*(patch(user, task) for user, task in requests))
+        self.assertEqual([response.status_code for response in responses], [200, 200, 200])
+        for user, task in requests:
+            entry = await Activity.objects.filter(task=task, action='STATUS_CHANGED').aget()
+            self.assertEqual(entry.user_id, user.id)
+
+    async def test_tokens_without_claims_are_authenticated_in_a_thread(self):
+        token = str(RefreshToken.for_user(self.staff).access_token)  # no role claims: the user is loaded
+        response = await self.async_client.get(reverse('async_task_summary'), headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total'], 5)
+
+
+class DatabasePoolTests(SimpleTestCase):
+    config = dict(settings.DATABASE_POOL, MODE='auto', MIN_SIZE=1, MAX_SIZE=4, TIMEOUT=2.5, CONN_MAX_AGE=60)
+    postgres = {'ENGINE': 'django.db.backends.postgresql', 'NAME': 'tracker', 'OPTIONS': {'sslmode': 'require'}}
+
+    def test_auto_uses_the_native_pool_on_postgres_when_installed(self):
+        with mock.patch('backend.dbpool.pool_available', return_value=True):
+            database = dbpool.configure(self.postgres, self.config)
+        self.assertEqual(database['OPTIONS']['sslmode'], 'require')
+        self.assertEqual(database['OPTIONS']['pool'], {'min_size': 1, 'max_size': 4, 'timeout': 2.5,
+                                                       'max_idle': self.config['MAX_IDLE']})
+        self.assertEqual((database['CONN_MAX_AGE'], database['CONN_HEALTH_CHECKS']), (0, True))
+
+    def test_persistent_connections_otherwise(self):
+        sqlite = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'db.sqlite3'}
+        with mock.patch('backend.dbpool.pool_available', return_value=False):
+            for database in (dbpool.configure(self.postgres, self.config), dbpool.configure(sqlite, self.config)):
+                self.assertNotIn('pool', database.get('OPTIONS', {}))
+                self.assertEqual((database['CONN_MAX_AGE'], database['CONN_HEALTH_CHECKS']), (60, True))
+        self.assertEqual(dbpool.configure(self.postgres, dict(self.config, MODE='off')), self.postgres)
+        # Under ASGI connections aren't reused across requests, so auto doesn't keep them
+        with mock.patch('backend.dbpool.pool_available', return_value=False):
+            self.assertEqual(dbpool.configure(self.postgres, dict(self.config, ASGI=True)), self.postgres)
+        with mock.patch('backend.dbpool.pool_available', return_value=True):
+            self.assertIn('pool', dbpool.configure(self.postgres, dict(self.config, ASGI=True))['OPTIONS'])
+        with self.assertRaises(ValueError):
+            dbpool.configure(self.postgres, dict(self.config, MODE='bounded'))
+
+    def test_warm_up_fills_pools_and_pool_stats_are_exported(self):
+        pool = mock.Mock(timeout=3.0)
+        pool.get_stats.return_value = {'pool_size': 2, 'requests_waiting': 1, 'requests_wait_ms': 40}
+        with mock.patch('backend.dbpool.pool_for', return_value=pool):
+            dbpool.warm_up(['default'])
+            connection_created.send(sender=type(connection), connection=connection)
+            body = dbpool.exposition()
+        pool.open.assert_called_once_with(wait=True, timeout=3.0)
+        self.assertIn('db_pool_requests_waiting{alias="default"} 1', body)
+        self.assertIn('# TYPE db_pool_requests_wait_ms_total counter\ndb_pool_requests_wait_ms_total{alias="default"} 40', body)
+        self.assertIn('db_connections_opened_total{alias="default"}', body)
+
+
+@override_settings(READ_REPLICAS={'ALIASES': ['replica0', 'replica1'], 'STICKY_SECONDS': 5})
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def route(self, method, user=None, write=False):
+        """Aliases chosen for a read, and a read after an optional write, inside one request."""
+        def view(request):
+            first = self.router.db_for_read(Task)
+            if write:
+                self.router.db_for_write(Task)
+            return [first, self.router.db_for_read(Task)]
+
+        request = getattr(self.factory, method)('/api/tasks/')
+        request.user = user or AnonymousUser()
+        return ReplicaMiddleware(view)(request)
+
+    def test_safe_reads_go_to_a_replica_and_writes_pin_the_request(self):
+        self.assertIn(self.route('get')[0], ('replica0', 'replica1'))
+        self.assertEqual(self.route('post'), ['default', 'default'])
+        self.assertEqual(self.route('get', write=True)[1], 'default')
+        self.assertEqual(self.router.db_for_write(Task), 'default')
+        self.assertEqual(self.router.db_for_read(Task), 'default')  # outside a request
+
+    def test_a_user_who_wrote_reads_from_the_primary_for_a_while(self):
+        writer, reader = User(id=1, role='staff'), User(id=2, role='staff')
+        self.route('patch', writer, write=True)
+        self.assertEqual(self.route('get', writer), ['default', 'default'])
+        self.assertIn(self.route('get', reader)[0], ('replica0', 'replica1'))
+        cache.clear()  # the window expired
+        self.assertIn(self.route('get', writer)[0], ('replica0', 'replica1'))
+
+    def test_routing_never_loads_the_user(self):
+        # Reading a session-backed user must not recurse into the router
+        writer = User(id=1, role='staff')
+        self.route('patch', writer, write=True)
+        request = self.factory.get('/admin/tasks/task/')
+        loads = []
+        request.user = SimpleLazyObject(lambda: loads.append(1) or writer)
+
+        def view(request):
+            before = self.router.db_for_read(Task)
+            self.assertEqual(self.router.db_for_read(Session), 'default')
+            self.assertEqual(self.router.db_for_read(User), 'default')
+            request._cached_user = writer  # as AuthenticationMiddleware caches it once loaded
+            return [before, self.router.db_for_read(Task)]
+
+        before, after = ReplicaMiddleware(view)(request)
+        self.assertEqual(loads, [])
+        self.assertIn(before, ('replica0', 'replica1'))
+        # The pin is checked once the user is known, not cached from before
+        self.assertEqual(after, 'default')
+
+    @override_settings(READ_REPLICAS={'ALIASES': [], 'STICKY_SECONDS': 5})
+    def test_without_replicas_everything_uses_the_primary(self):
+        self.assertEqual(self.route('get'), ['default', 'default'])
+
+
+@skipUnless(settings.READ_REPLICAS['ALIASES'], "set DATABASE_REPLICA_URLS (e.g. a second SQLite file) to run")
+class ReplicaDatabaseTests(APITestCase):
+    """End to end against two real databases; the replica is filled by hand, so it can lag."""
+    replica = (settings.READ_REPLICAS['ALIASES'] or [None])[0]
+    databases = {'default', replica} if replica else {'default'}
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(email='admin@example.com', username='admin', password='pw', role='admin')
+        self.admin.save(using=self.replica, force_insert=True)
+        self.task = Task.objects.create(title='On both', description='d', assigned_user=self.admin,
+                                        created_by=self.admin, deadline=date.today())
+        Task.objects.get(id=self.task.id).save(using=self.replica, force_insert=True)
+        self.client.force_authenticate(self.admin)
+
+    def titles(self):
+        return [task['title'] for task in self.client.get(reverse('task_list'), {'view': 'full'}).data['results']]
+
+    def test_reads_hit_the_replica_until_the_user_writes(self):
+        Task.objects.filter(id=self.task.id).update(title='Only on the primary')
+        self.assertEqual(self.titles(), ['On both'])  # replica, lagging
+
+        response = self.client.patch(reverse('update_task_status', args=[self.task.id]), {'status': 'completed'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.titles(), ['Only on the primary'])  # pinned to the primary
+
+    def test_session_authenticated_pages_work(self):
+        User.objects.filter(id=self.admin.id).update(is_staff=True, is_superuser=True)
+        self.client.force_login(User.objects.get(id=self.admin.id))
+        self.assertEqual(self.client.get(reverse('admin:tasks_task_changelist')).status_code, 200)
+
+
+class LoadToolingTests(APITestCase):
+    def test_seed_data_skews_assignment_and_fans_out_activity(self):
+        call_command('seed_data', '--users', '5', '--admins', '1', '--tasks', '200', '--batch-size', '70',
+                     '--seed', '7', stdout=StringIO())
+        self.assertEqual(Task.objects.count(), 200)
+        per_user = list(Task.objects.values('assigned_user').annotate(n=Count('id')).order_by('-n')
+                        .values_list('n', flat=True))
+        self.assertGreater(per_user[0], 2 * per_user[-1])
+        self.assertGreaterEqual(Activity.objects.count(), 200)
+        self.assertEqual(set(Task.objects.values_list('status', flat=True)), {'pending', 'in_progress', 'completed'})
+        self.assertFalse(Activity.objects.filter(audience__isnull=True).exists())
+
+    def test_benchmark_api_reports_percentiles_as_json(self):
+        call_command('seed_data', '--users', '2', '--admins', '1', '--tasks', '20', '--seed', '1', stdout=StringIO())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'run.json')
+            call_command('benchmark_api', '--requests', '3', '--warmup', '0', '--only', 'task_list', 'delete_task',
+                         '--json', path, stdout=StringIO(), stderr=StringIO())
+            with open(path) as results:
+                run = json.load(results)
+        self.assertEqual(run['meta']['rows']['tasks'], 20)  # the deletes were rolled back
+        by_label = {row['label']: row for row in run['endpoints']}
+        self.assertEqual(set(by_label), {'task_list (admin)', 'task_list (staff)', 'delete_task (admin)'})
+        self.assertEqual(by_label['delete_task (admin)']['status'], {'204': 3})
+        self.assertLessEqual(by_label['task_list (admin)']['p50_ms'], by_label['task_list (admin)']['p99_ms'])
+
+    def test_benchmark_read_path_reads_only_its_own_rows(self):
+        call_command('seed_data', '--users', '2', '--admins', '1', '--tasks', '20', '--seed', '1', stdout=StringIO())
+        User.objects.create_user(email='benchmark@example.com', username='benchmark', password='pw')
+        activities = Activity.objects.count()
+        out = StringIO()
+        call_command('benchmark_read_path', '--rows', '30', '--repeat', '1', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(all(line.endswith('yes') for line in lines if ' 30 ' in line))
+        self.assertEqual(Task.objects.count(), 20)
+        self.assertEqual(Activity.objects.count(), activities)
+
+
+class ServerBenchmarkTests(LiveServerTestCase):
+    def test_benchmark_servers_measures_fast_clients_beside_slow_ones(self):
+        User.objects.create_user(email='bench@example.com', username='bench', password='pw', role='admin')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'servers.json')
+            call_command('benchmark_servers', '--target', f'live={self.live_server_url}/api/tasks/summary/',
+                         '--slow-clients', '2', '--trickle', '0.01', '--chunk', '256', '--fast-requests', '6',
+                         '--concurrency', '2', '--ramp', '0.05', '--json', path, stdout=StringIO())
+            with open(path) as results:
+                run = json.load(results)
+        [target] = run['targets']
+        self.assertEqual((target['name'], target['fast_ok'], target['fast_failed']), ('live', 6, 0))
+        self.assertLessEqual(target['p50_ms'], target['p99_ms'])
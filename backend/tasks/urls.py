@@ -4,6 +4,18 @@ from . import views
 urlpatterns = [
     # List all tasks
     path('', views.task_list, name='task_list'),
+
+    # Dashboard counts and latest activity
+    path('summary/', views.task_summary, name='task_summary'),
+
+    # Incremental sync: changed tasks and tombstones since a cursor
+    path('changes/', views.task_changes, name='task_changes'),
+
+    # Ranked full-text search
+    path('search/', views.search_tasks, name='search_tasks'),
+
+    # Streaming CSV / NDJSON download
+    path('export/', views.export_tasks, name='export_tasks'),
     
     # Create task
     path('create/', views.create_task, name='create_task'),
@@ -13,4 +25,10 @@ urlpatterns = [
     path('<int:pk>/edit/', views.edit_task, name='edit_task'),
     path('<int:pk>/delete/', views.delete_task, name='delete_task'),
     path('<int:pk>/status/', views.update_task_status, name='update_task_status'),
+
+    # Bulk operations (admin only)
+    path('bulk/create/', views.bulk_create_tasks, name='bulk_create_tasks'),
+    path('bulk/status/', views.bulk_update_task_status, name='bulk_update_task_status'),
+    path('bulk/reassign/', views.bulk_reassign_tasks, name='bulk_reassign_tasks'),
+    path('bulk/delete/', views.bulk_delete_tasks, name='bulk_delete_tasks'),
 ]
\ No newline at end of file
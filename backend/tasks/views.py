@@ -1,11 +1,50 @@
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
-from .serializers import TaskSerializer
-from .models import Task
+from .serializers import (
+    TASK_ROWS,
+    TaskSerializer,
+    BulkTaskCreateSerializer,
+    BulkTaskIdsSerializer,
+    BulkTaskReassignSerializer,
+    BulkTaskStatusSerializer,
+)
+from .models import Task, TaskTombstone
+from .pagination import TaskChangesCursor, TaskCursorPagination, TaskSearchPagination
+from . import bulk, search
+from . import cache as task_cache
+from .events import publish_task
 from rest_framework.permissions import IsAuthenticated
-from activity.utils import log_activity
+from backend.conditional import make_etag, not_modified, set_validators
+from backend.export import export_response
+from backend.fieldsets import only_fields, requested_fields
+from users.permissions import IsAdmin
+from activity import signals as activity_signals
+from activity.models import Activity
+from activity.serializers import ActivitySerializer
+from activity.utils import build_activity, log_activities
+
+# Relations read by TaskSerializer (assigned_user_name, created_by_username);
+# joining them keeps list and detail views at a fixed number of queries.
+TASK_RELATED = ('assigned_user', 'created_by')
+
+DUE_SOON_DAYS = 3
+SUMMARY_ACTIVITY_LIMIT = 5
+SUMMARY_ACTIVITY_MAX = 20
+
+SYNC_PAGE_SIZE = 200
+SYNC_MAX_PAGE_SIZE = 500
+# A row can commit after a later-stamped row was already synced, so the
+# final cursor trails "now" and such rows are re-sent rather than missed.
+SYNC_LAG = timedelta(seconds=5)
+# Older cursors can't be served incrementally (tombstones may be gone)
+SYNC_MAX_AGE = timedelta(days=30)
 
 
 # ==================== LIST ALL TASKS ====================
@@ -13,17 +52,255 @@ from activity.utils import log_activity
 @permission_classes([IsAuthenticated])
 def task_list(request):
     """
-    List all tasks
+    List all tasks, cursor-paginated by (deadline, id)
     - Admin: sees all tasks
     - Staff: sees only tasks assigned to them
+    - ?page_size=N (max 100), follow `next`/`previous` for more
+    - Conditional GET: ETag from the visible set's newest updated_at and
+      newest tombstone (list_state), plus the user-rename counter
+      (tasks/cache.py); a matching If-None-Match gets 304 without loading
+      any task
+    - With TASK_LIST_CACHE enabled, rendered pages are cached per user
+      (tasks/cache.py); a hit, or a 304 against a cached ETag, runs no
+      queries
+    - Compact rows by default; ?view=full, ?fields=, ?omit= choose the
+      fields, and only their columns are read (backend/fieldsets.py)
+    - Rendered from values() rows without TaskSerializer (backend/fastpath.py)
     """
-    if request.user.role == 'admin':
-        tasks = Task.objects.all()
-    else:  # staff
-        tasks = Task.objects.filter(assigned_user=request.user)
-    
-    serializer = TaskSerializer(tasks, many=True, context={'request': request})
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    fields = requested_fields(request, TaskSerializer)
+    cache_key = task_cache.response_key(request)
+    cached = task_cache.get_response(cache_key)
+    if cached:
+        return cached_list_response(request, cached)
+
+    tasks = Task.objects.visible_to(request.user)
+    etag = make_etag(request, *list_state(tasks, request.user), task_cache.global_version())
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+
+    # Rows come straight from values(), rendered like TaskSerializer (TASK_ROWS)
+    paginator = TaskCursorPagination()
+    page = paginator.paginate_queryset(tasks.values(*TASK_ROWS.columns(fields, also=paginator.ordering)), request)
+    response = paginator.get_paginated_response(TASK_ROWS.render(page, fields))
+    if render_now(request, response):
+        task_cache.set_response(cache_key, etag, response.content, response['Content-Type'])
+    return set_validators(response, etag)
+
+
+def list_state(tasks, user):
+    """
+    What the task_list ETag is built from, without counting the visible
+    tasks. Saves and bulk updates move the newest updated_at. Deletions,
+    and reassignments away from a staff member, leave a TaskTombstone
+    the caller can see. Both come from one index seek.
+    """
+    latest = tasks.aggregate(latest=Max('updated_at'))['latest']
+    return latest, newest_tombstone(user).first()
+
+
+async def alist_state(tasks, user):
+    latest = (await tasks.aaggregate(latest=Max('updated_at')))['latest']
+    return latest, await newest_tombstone(user).afirst()
+
+
+def newest_tombstone(user):
+    # Ordered by the indexed timestamp: (user, timestamp) for staff, (timestamp, id) for admins
+    return TaskTombstone.objects.visible_to(user).order_by('-timestamp', '-id').values_list('id', flat=True)
+
+
+def cached_list_response(request, cached):
+    """A cached task list page (or 304 against its ETag)."""
+    unchanged = not_modified(request, cached['etag'])
+    if unchanged:
+        return unchanged
+    return set_validators(HttpResponse(cached['content'], content_type=cached['content_type']), cached['etag'])
+
+
+def render_now(request, response):
+    """Render a JSON response now (DRF won't render again) so the exact bytes can be cached."""
+    if request.accepted_renderer.format != 'json':
+        return False
+    response.accepted_renderer = request.accepted_renderer
+    response.accepted_media_type = request.accepted_media_type
+    response.renderer_context = {'request': request}
+    response.render()
+    return True
+
+
+def summary_rows(user):
+    """One GROUP BY (status, priority) row per combination, with overdue / due soon counts."""
+    today = timezone.localdate()
+    is_open = ~Q(status='completed')
+    return (
+        Task.objects.visible_to(user)
+        .order_by()
+        .values('status', 'priority')
+        .annotate(
+            total=Count('id'),
+            overdue=Count('id', filter=is_open & Q(deadline__lt=today)),
+            due_soon=Count('id', filter=is_open & Q(
+                deadline__gte=today, deadline__lte=today + timedelta(days=DUE_SOON_DAYS))),
+        )
+    )
+
+
+def fold_summary(rows):
+    summary = {
+        'total': 0,
+        'by_status': {key: 0 for key, _ in Task.STATUS_CHOICES},
+        'by_priority': {key: 0 for key, _ in Task.PRIORITY_CHOICES},
+        'overdue': 0,
+        'due_soon': 0,
+    }
+    for row in rows:
+        summary['total'] += row['total']
+        summary['by_status'][row['status']] = summary['by_status'].get(row['status'], 0) + row['total']
+        summary['by_priority'][row['priority']] = summary['by_priority'].get(row['priority'], 0) + row['total']
+        summary['overdue'] += row['overdue']
+        summary['due_soon'] += row['due_soon']
+    return summary
+
+
+def recent_activity(request):
+    """The caller's latest activities for the summary (?activity_limit=)."""
+    try:
+        limit = int(request.query_params.get('activity_limit', SUMMARY_ACTIVITY_LIMIT))
+    except ValueError:
+        limit = SUMMARY_ACTIVITY_LIMIT
+    limit = max(0, min(limit, SUMMARY_ACTIVITY_MAX))
+    return Activity.objects.visible_to(request.user).for_feed().order_by('-feed_id')[:limit]
+
+
+# ==================== DASHBOARD SUMMARY ====================
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def task_summary(request):
+    """
+    Aggregated dashboard numbers for the caller's visible tasks
+    - Counts by status and priority, overdue and due soon (next 3 days)
+    - Latest activities (?activity_limit=N, default 5, max 20)
+    One GROUP BY over tasks plus one bounded activity query.
+    """
+    summary = fold_summary(summary_rows(request.user))
+    activities = recent_activity(request)
+    summary['recent_activity'] = ActivitySerializer(activities, many=True).data
+    return Response(summary, status=status.HTTP_200_OK)
+
+
+class ChangesWindow:
+    """
+    The queries and cursor arithmetic of task_changes, shared by the sync
+    and async views: `tasks` is one page plus one row (to detect more).
+    """
+
+    def __init__(self, request):
+        self.user = request.user
+        self.now = timezone.now()
+        since = request.query_params.get('since')
+        self.position = TaskChangesCursor.decode(since) if since else None
+        self.reset = self.position is not None and self.position[0] < self.now - SYNC_MAX_AGE
+        if self.reset:
+            self.position = None
+
+        try:
+            self.page_size = min(max(int(request.query_params['page_size']), 1), SYNC_MAX_PAGE_SIZE)
+        except (KeyError, ValueError):
+            self.page_size = SYNC_PAGE_SIZE
+
+        tasks = Task.objects.visible_to(self.user).select_related(*TASK_RELATED).order_by('updated_at', 'id')
+        if self.position:
+            updated_at, pk = self.position
+            tasks = tasks.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk))
+        self.tasks = tasks[:self.page_size + 1]
+
+    def split(self, page):
+        """(has_more, page, cursor) for the fetched rows."""
+        has_more = len(page) > self.page_size
+        page = page[:self.page_size]
+        if has_more:
+            cursor = TaskChangesCursor.encode(page[-1].updated_at, page[-1].id)
+        else:
+            until = self.now - SYNC_LAG
+            cursor = TaskChangesCursor.encode(max(until, self.position[0]) if self.position else until)
+        return has_more, page, cursor
+
+    def tombstones(self, page, has_more):
+        """Ids of tasks that left the list in the same window as `page`, or None on a full sync."""
+        if not self.position:
+            return None
+        tombstones = TaskTombstone.objects.visible_to(self.user).filter(timestamp__gt=self.position[0])
+        if has_more:
+            tombstones = tombstones.filter(timestamp__lte=page[-1].updated_at)
+        return tombstones.values_list('task_id', flat=True)
+
+    @staticmethod
+    def deleted(page, tombstoned_ids):
+        returned = {task.id for task in page}
+        return sorted(set(tombstoned_ids) - returned)
+
+
+# ==================== DELTA SYNC ====================
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def task_changes(request):
+    """
+    Tasks created or updated since ?since=<cursor>, ordered by (updated_at, id),
+    plus the ids of tasks that left the caller's list (deleted, or
+    reassigned away from a staff member). Cost scales with the changes.
+    - No `since`: everything visible, for the initial sync
+    - ?page_size=N (max 500); `has_more` means call again with `cursor`
+    - `reset`: the cursor is too old; drop the local copy and apply this
+      response as a fresh sync
+    Tasks may be repeated across calls, so clients should upsert them.
+    """
+    sync = ChangesWindow(request)
+    has_more, page, cursor = sync.split(list(sync.tasks))
+    tombstones = sync.tombstones(page, has_more)
+    deleted = sync.deleted(page, tombstones) if tombstones is not None else []
+
+    return Response({
+        'tasks': TaskSerializer(page, many=True, context={'request': request}).data,
+        'deleted': deleted,
+        'cursor': cursor,
+        'has_more': has_more,
+        'reset': sync.reset,
+    }, status=status.HTTP_200_OK)
+
+
+# ==================== SEARCH ====================
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_tasks(request):
+    """
+    Full-text search over title, description and usernames (tasks/search.py)
+    - ?q=words (every word must match, as a prefix)
+    - Ranked best match first, cursor-paginated like the task list
+    - Same visibility and fields (?view=, ?fields=, ?omit=) as the task list
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'q parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    fields = requested_fields(request, TaskSerializer)
+    paginator = TaskSearchPagination()
+    tasks = search.search(Task.objects.visible_to(request.user), query)
+    tasks = only_fields(tasks, TaskSerializer, fields, also=paginator.ordering)
+    page = paginator.paginate_queryset(tasks, request)
+    serializer = TaskSerializer(page, many=True, fields=fields, context={'request': request})
+    return paginator.get_paginated_response(serializer.data)
+
+
+# ==================== EXPORT ====================
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_tasks(request):
+    """
+    Download the caller's visible tasks as CSV or NDJSON (backend/export.py)
+    - ?output=csv|ndjson, ?gzip=true
+    - Streamed in id order, so memory use doesn't grow with the row count
+    """
+    return export_response(request, Task.objects.visible_to(request.user).for_export(), 'tasks')
 
 
 # ==================== CREATE TASK ====================
@@ -41,13 +318,8 @@ def create_task(request):
     
     serializer = TaskSerializer(data=request.data, context={'request': request})
     if serializer.is_valid():
-        task = serializer.save(created_by=request.user)
-        log_activity(
-            action="CREATED",
-            user=request.user,
-            task=task,  # Changed from related_task=task
-            description=f"Task '{task.title}' created by {request.user.username}"
-        )
+        # activity.signals logs the CREATED entry
+        serializer.save(created_by=request.user)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -60,20 +332,29 @@ def task_detail(request, pk):
     Get details of a single task
     - Admin: can view any task
     - Staff: can only view tasks assigned to them
+    - ?fields= / ?omit= trim the response and the columns read
     """
-    task = get_object_or_404(Task, pk=pk)
+    fields = requested_fields(request, TaskSerializer, collection=False)
+    tasks = only_fields(Task.objects.all(), TaskSerializer, fields, also=('assigned_user', 'updated_at'))
+    task = get_object_or_404(tasks, pk=pk)
     
     is_admin = request.user.role == 'admin'
-    is_assigned_staff = request.user.role == 'staff' and task.assigned_user == request.user
+    is_assigned_staff = request.user.role == 'staff' and task.assigned_user_id == request.user.id
     
     if not is_admin and not is_assigned_staff:
         return Response(
             {'detail': 'You do not have permission to view this task.'}, 
             status=status.HTTP_403_FORBIDDEN
         )
-    
-    serializer = TaskSerializer(task, context={'request': request})
-    return Response(serializer.data, status=status.HTTP_200_OK)
+
+    # Skip serialization when the client's copy is current
+    etag = make_etag(request, task.updated_at, task_cache.global_version())
+    unchanged = not_modified(request, etag, task.updated_at)
+    if unchanged:
+        return unchanged
+
+    serializer = TaskSerializer(task, fields=fields, context={'request': request})
+    return set_validators(Response(serializer.data, status=status.HTTP_200_OK), etag, task.updated_at)
 
 
 # ==================== UPDATE TASK STATUS ====================
@@ -85,10 +366,10 @@ def update_task_status(request, pk):
     - Admin: can update any task status
     - Staff: can update status of tasks assigned to them
     """
-    task = get_object_or_404(Task, pk=pk)
+    task = get_object_or_404(Task.objects.select_related(*TASK_RELATED), pk=pk)
     
     is_admin = request.user.role == 'admin'
-    is_assigned_staff = request.user.role == 'staff' and task.assigned_user == request.user
+    is_assigned_staff = request.user.role == 'staff' and task.assigned_user_id == request.user.id
     
     if not is_admin and not is_assigned_staff:
         return Response(
@@ -110,16 +391,9 @@ def update_task_status(request, pk):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    old_status = task.status
     task.status = request.data['status']
-    task.save()
-    log_activity(
-        action="status_changed",
-        user=request.user,
-        task=task,  # <-- use 'task', not 'related_task'
-        description=f"Status changed from {old_status} to {task.status} by {request.user.username}",
-        changes={"from": old_status, "to": task.status}
-    )
+    # activity.signals logs the STATUS_CHANGED entry from the tracked diff
+    task.save(update_fields=['status', 'updated_at'])
     
     serializer = TaskSerializer(task, context={'request': request})
     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -134,7 +408,7 @@ def edit_task(request, pk):
     - PUT: Full update (all fields required)
     - PATCH: Partial update (only provided fields)
     """
-    task = get_object_or_404(Task, pk=pk)
+    task = get_object_or_404(Task.objects.select_related(*TASK_RELATED), pk=pk)
     
     if request.user.role != 'admin':
         return Response(
@@ -146,13 +420,8 @@ def edit_task(request, pk):
     serializer = TaskSerializer(task, data=request.data, partial=partial, context={'request': request})
     
     if serializer.is_valid():
+        # activity.signals logs the UPDATED / STATUS_CHANGED entry
         serializer.save()
-        log_activity(
-            action="UPDATED",
-            user=request.user,
-            task=task,
-            description=f"Task '{task.title}' updated by {request.user.username}"
-        )
         return Response(serializer.data, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -164,25 +433,106 @@ def delete_task(request, pk):
     """
     Delete a task (Admin only)
     """
-    task = get_object_or_404(Task, pk=pk)
+    task = get_object_or_404(Task.objects.select_related(*TASK_RELATED), pk=pk)
 
     if request.user.role != 'admin':
         return Response({'detail': 'You do not have permission to delete this task.'}, status=status.HTTP_403_FORBIDDEN)
 
-    task_title = task.title  # Store title for the log and response message
-
-    # Log the activity BEFORE deleting the task.
-    # The log_activity utility will save a snapshot of the task details.
-    log_activity(
-        user=request.user,
-        action="deleted",
-        task=task,
-        # THIS IS THE CORRECTED DESCRIPTION FORMAT
-        description=f"{request.user.username} deleted task '{task_title}'"
-    )
-
-    # Now, delete the task object from the database
+    # Delete the task; activity.signals logs the DELETED entry with a
+    # snapshot of the task details.
     task.delete()
 
     # It's standard practice to return a 204 NO CONTENT on successful deletion.
-    return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# ==================== BULK OPERATIONS ====================
+# Admin only. Each request validates the whole payload up front (one query
+# for all referenced tasks/users), applies it with a single bulk write and
+# logs every activity in one bulk_create, all inside one transaction.
+# Per-row signal logging is muted since the activities are logged here, and
+# QuerySet.update/bulk_create send no signals, so the cached task lists of
+# the affected assignees are invalidated (tasks/cache.py) and live streams
+# notified (tasks/events.py) here as well. Field updates go through
+# tasks/bulk.py, which the admin actions share.
+
+@api_view(['POST'])
+@permission_classes([IsAdmin])
+def bulk_create_tasks(request):
+    """
+    Create many tasks: {"tasks": [{title, description, assigned_user, ...}, ...]}
+    """
+    serializer = BulkTaskCreateSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    tasks = [Task(**item, created_by=request.user) for item in serializer.validated_data['tasks']]
+    with transaction.atomic(), activity_signals.muted():
+        Task.objects.bulk_create(tasks)
+        task_cache.invalidate_tasks({task.assigned_user_id for task in tasks})
+        log_activities([
+            build_activity(request.user, "CREATED", task=task,
+                           description=f"Task '{task.title}' created by {request.user.username}")
+            for task in tasks
+        ])
+
+    data = TaskSerializer(tasks, many=True, context={'request': request}).data
+    for task, item in zip(tasks, data):
+        publish_task('created', item, [task.assigned_user_id])
+    return Response(data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['PATCH'])
+@permission_classes([IsAdmin])
+def bulk_update_task_status(request):
+    """
+    Set the status of many tasks: {"ids": [1, 2, ...], "status": "completed"}
+    """
+    serializer = BulkTaskStatusSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    changed = bulk.update_tasks(request.user, serializer.validated_data['tasks'],
+                                status=serializer.validated_data['status'])
+    return Response({'updated': len(changed)}, status=status.HTTP_200_OK)
+
+
+@api_view(['PATCH'])
+@permission_classes([IsAdmin])
+def bulk_reassign_tasks(request):
+    """
+    Assign many tasks to one user: {"ids": [1, 2, ...], "assigned_user": 7}
+    """
+    serializer = BulkTaskReassignSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    changed = bulk.update_tasks(request.user, serializer.validated_data['tasks'],
+                                assigned_user=serializer.validated_data['assigned_user'])
+    return Response({'updated': len(changed)}, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdmin])
+def bulk_delete_tasks(request):
+    """
+    Delete many tasks: {"ids": [1, 2, ...]}
+    """
+    serializer = BulkTaskIdsSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    tasks = serializer.validated_data['tasks']
+    with transaction.atomic(), activity_signals.muted():
+        activities = [
+            build_activity(request.user, "DELETED", task=task, task_deleted=True,
+                           description=f"{request.user.username} deleted task '{task.title}'")
+            for task in tasks
+        ]
+        Task.objects.filter(id__in=[task.id for task in tasks]).delete()
+        TaskTombstone.objects.bulk_create([
+            TaskTombstone(task_id=task.id, user_id=task.assigned_user_id, reason=TaskTombstone.DELETED)
+            for task in tasks
+        ])
+        log_activities(activities)
+    return Response({'deleted': len(tasks)}, status=status.HTTP_200_OK)
@@ -0,0 +1,129 @@
+"""
+JWT authentication that avoids a User lookup per request.
+
+Access tokens carry role/username/email claims (see
+TokenObtainPairWithClaimsSerializer). For safe (read-only) requests those
+claims are trusted and request.user is a ClaimsUser built from the token,
+so authentication costs no queries. Writes still get a real User instance
+(views assign it to foreign keys), loaded through a small per-process
+TTL/LRU cache that is cleared when the User is saved or deleted.
+
+Trade-off: for reads, a role change or deactivation takes effect when the
+user's access token expires (SIMPLE_JWT['ACCESS_TOKEN_LIFETIME']).
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+# Claims a token must carry to be trusted without a lookup
+USER_CLAIMS = ('role', 'username', 'email')
+
+
+def _user_id(validated_token):
+    """The token's user id as a primary key value (tokens store it as a string)."""
+    return get_user_model()._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+
+
+class ClaimsUser(TokenUser):
+    """Stateless user backed by the token's claims."""
+
+    @cached_property
+    def id(self):
+        # Views compare it with foreign key values such as assigned_user_id
+        return _user_id(self.token)
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+    @property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def email(self):
+        return self.token['email']
+
+
+class UserCache:
+    """Thread-safe LRU of users by id whose entries expire after `ttl` seconds."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        # Callers get their own copy so request code can't mutate the cache
+        return copy.copy(user)
+
+    def set(self, user):
+        with self._lock:
+            self._entries[user.pk] = (copy.copy(user), time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.pk)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(
+    max_size=settings.AUTH_USER_CACHE['MAX_SIZE'],
+    ttl=settings.AUTH_USER_CACHE['TTL'],
+)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts role claims on reads and caches users
+    for writes.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if request.method in SAFE_METHODS and all(claim in validated_token for claim in USER_CLAIMS):
+            return ClaimsUser(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def get_user(self, validated_token):
+        if not settings.AUTH_USER_CACHE['ENABLED']:
+            return super().get_user(validated_token)
+
+        user = user_cache.get(_user_id(validated_token)) if api_settings.USER_ID_CLAIM in validated_token else None
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user)
+        return user
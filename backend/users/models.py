@@ -1,7 +1,33 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.db import models
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
 
+# Ids of users whose delete is in progress, per request context (see deleting_users)
+_deleting_users = ContextVar('deleting_users', default=frozenset())
+
+
+def deleting_users():
+    """
+    Ids of users being deleted right now. Deleting a user cascades to
+    their tasks, whose post_delete handlers run before the user row goes
+    and must not write rows (actor, audience, tombstones) pointing at it.
+    Marked by users/signals.py.
+    """
+    return _deleting_users.get()
+
+
+@contextmanager
+def _deleting():
+    """Undo the marks made during a delete however it ends, e.g. when it fails and rolls back."""
+    token = _deleting_users.set(_deleting_users.get())
+    try:
+        yield
+    finally:
+        _deleting_users.reset(token)
+
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
@@ -26,6 +52,12 @@ class CustomUserManager(BaseUserManager):
         return self.create_user(email, password, **extra_fields)
 
 
+class UserQuerySet(models.QuerySet):
+    def delete(self):
+        with _deleting():
+            return super().delete()
+
+
 class User(AbstractUser):
     ROLE_CHOICES = [
         ('admin', 'Admin'),
@@ -36,10 +68,14 @@ class User(AbstractUser):
     username = models.CharField(max_length=45)
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='staff')
 
-    objects = CustomUserManager()
+    objects = CustomUserManager.from_queryset(UserQuerySet)()
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]
 
     def __str__(self):
         return self.username
+
+    def delete(self, *args, **kwargs):
+        with _deleting():
+            return super().delete(*args, **kwargs)
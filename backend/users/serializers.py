@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from .models import User
 from rest_framework.validators import ValidationError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from backend.fastpath import RowMapper
+from backend.timing import TimedSerializerMixin
 
 
 class SignUpSerializer(serializers.ModelSerializer):
@@ -22,14 +25,32 @@ class SignUpSerializer(serializers.ModelSerializer):
 
     def create(self,validated_data):
         password=validated_data.pop("password") 
-        user=super().create(validated_data)
-        user.set_password(password)
-        user.save()
-        return user
+        # create_user hashes the password before the single INSERT
+        return User.objects.create_user(password=password, **validated_data)
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'email', 'username', 'role']
-        read_only_fields = ['id']   
\ No newline at end of file
+        read_only_fields = ['id']   
+
+
+# UserSerializer's output built from values() rows (backend/fastpath.py)
+USER_ROWS = RowMapper(UserSerializer)
+
+
+class TokenObtainPairWithClaimsSerializer(TokenObtainPairSerializer):
+    """
+    Login tokens that carry the user's role, username and email, so reads
+    can authenticate without loading the user (users/authentication.py).
+    Refreshed access tokens copy these claims from the refresh token.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['role'] = user.role
+        token['username'] = user.username
+        token['email'] = user.email
+        return token
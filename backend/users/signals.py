@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .models import User, _deleting_users
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    """Drop the cached copy so the next write sees the saved role/state."""
+    user_cache.discard(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def user_deleting(sender, instance, **kwargs):
+    # Cleared in post_delete, or by User.delete()/UserQuerySet.delete() if the delete fails
+    _deleting_users.set(_deleting_users.get() | {instance.pk})
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    _deleting_users.set(_deleting_users.get() - {instance.pk})
@@ -1,3 +1,83 @@
-from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.testing import QueryBudgetTestCase
+from tasks.models import Task
+from .authentication import user_cache
+from .models import User
+from .serializers import UserSerializer
+
+
+class UserQueryBudgetTests(QueryBudgetTestCase):
+    def test_user_list(self):
+        self.assertQueryBudget(1, reverse('user_list'), seed=self.seed_users)
+
+    def test_profile(self):
+        self.assertQueryBudget(0, reverse('user-profile'), user=self.staff)
+
+    def test_signup(self):
+        data = {'email': 'new@example.com', 'username': 'new', 'password': 'pw12345'}
+        self.assertQueryBudget(2, reverse('signup'), user=None, method='post', data=data)
+
+
+class ClaimsAuthenticationTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        user_cache.clear()
+
+    def login(self, user):
+        response = self.client.post(reverse('login'), {'email': user.email, 'password': 'pw'}, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return response.data
+
+    def test_login_tokens_carry_role_claims(self):
+        tokens = self.login(self.admin)
+        access = AccessToken(tokens['access'])
+        self.assertEqual((access['role'], access['username'], access['email']),
+                         (self.admin.role, self.admin.username, self.admin.email))
+        refreshed = self.client.post(reverse('token_refresh'), {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(AccessToken(refreshed.data['access'])['role'], 'admin')
+
+    def test_reads_authenticate_without_queries(self):
+        self.login(self.staff)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('user-profile'))
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(response.data, {'id': self.staff.id, 'email': self.staff.email,
+                                         'username': self.staff.username, 'role': 'staff'})
+
+    def test_claims_user_id_matches_foreign_keys(self):
+        task = Task.objects.create(title='T', description='D', assigned_user=self.staff, deadline='2030-01-01')
+        self.login(self.staff)
+        self.assertEqual(self.client.get(reverse('task_detail', args=[task.pk])).status_code, 200)
+
+    def test_role_claim_drives_permissions(self):
+        self.login(self.staff)
+        self.assertEqual(self.client.get(reverse('user_list')).status_code, 403)
+
+    def test_writes_use_cached_user_until_it_is_saved(self):
+        task = Task.objects.create(title='T', description='D', assigned_user=self.staff, deadline='2030-01-01')
+        self.login(self.admin)
+        url = reverse('edit_task', args=[task.pk])
+        self.client.patch(url, {'title': 'One'}, format='json')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.patch(url, {'title': 'Two'}, format='json')
+        self.assertFalse(any('FROM "users_user" WHERE' in q['sql'] for q in ctx.captured_queries))
+
+        self.admin.role = 'staff'
+        self.admin.save()
+        response = self.client.patch(url, {'title': 'Three'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class UserListFastPathTests(QueryBudgetTestCase):
+    def test_list_matches_the_serializer(self):
+        self.seed_users(3)
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(reverse('user_list'))
+        expected = UserSerializer(User.objects.all(), many=True).data
+        self.assertEqual(response.content, JSONRenderer().render(expected))
 
-# Create your tests here.
@@ -1,5 +1,5 @@
 from django.shortcuts import render
-from .serializers import SignUpSerializer, UserSerializer
+from .serializers import SignUpSerializer, UserSerializer, USER_ROWS
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.request import Request
@@ -58,3 +58,8 @@ class UserListView(generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAdmin]
+
+    def list(self, request, *args, **kwargs):
+        """Rendered from values() rows, same output as UserSerializer (backend/fastpath.py)"""
+        users = self.filter_queryset(self.get_queryset()).values(*USER_ROWS.columns(USER_ROWS.field_names))
+        return Response(USER_ROWS.render(users))
@@ -1,6 +1,7 @@
 import { Activity as ActivityIcon } from "lucide-react";
 
-const ActivityHeader = ({ userRole, activitiesCount }) => {
+// hasMore: only the first pages are loaded, so the count is a lower bound
+const ActivityHeader = ({ userRole, activitiesCount, hasMore = false }) => {
   return (
     <div className="flex items-center justify-between mb-6">
       <h2 className="text-2xl font-bold text-gray-900">
@@ -9,7 +10,8 @@ const ActivityHeader = ({ userRole, activitiesCount }) => {
       <div className="flex items-center space-x-2 text-gray-500">
         <ActivityIcon className="h-5 w-5" />
         <span>
-          {activitiesCount} {activitiesCount === 1 ? "activity" : "activities"}
+          {activitiesCount}
+          {hasMore ? "+" : ""} {activitiesCount === 1 && !hasMore ? "activity" : "activities"}
         </span>
       </div>
     </div>
@@ -21,6 +21,8 @@ const ActivityLogPage = () => {
   const [activities, setActivities] = useState([]);
   const [filteredActivities, setFilteredActivities] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
 
   const [searchQuery, setSearchQuery] = useState("");
@@ -36,12 +38,13 @@ const ActivityLogPage = () => {
 
       try {
         setLoading(true);
-        const data = await getAllActivities({
+        const page = await getAllActivities({
           search: searchQuery,
           action: actionFilter !== "all" ? actionFilter : null,
         });
 
-        setActivities(data);
+        setActivities(page.results);
+        setNextPage(page.next);
         setError(null);
       } catch (err) {
         console.error("Error fetching activities:", err);
@@ -54,6 +57,21 @@ const ActivityLogPage = () => {
     fetchActivities();
   }, [user, searchQuery, actionFilter]);
 
+  // The feed is paginated; older entries are fetched a page at a time
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await getAllActivities({}, nextPage);
+      setActivities((prev) => [...prev, ...page.results]);
+      setNextPage(page.next);
+    } catch (err) {
+      console.error("Error fetching activities:", err);
+      setError("Failed to load more activities");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Apply sorting
   useEffect(() => {
     let sorted = [...activities];
@@ -318,6 +336,19 @@ const ActivityLogPage = () => {
                 ))}
               </div>
             )}
+
+            {nextPage && (
+              <div className="flex justify-center mt-6">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="px-4 py-2 bg-white border border-gray-300 text-gray-700 rounded-lg hover:bg-gray-50 transition flex items-center gap-2 disabled:opacity-50"
+                >
+                  {loadingMore && <Loader className="h-4 w-4 animate-spin" />}
+                  Load more
+                </button>
+              </div>
+            )}
           </>
         )}
       </div>
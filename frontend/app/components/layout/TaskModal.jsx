@@ -1,7 +1,7 @@
 "use client";
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
-import { updateTaskStatus, deleteTask } from "@/utils/taskService";
+import { updateTaskStatus, deleteTask, getTaskById } from "@/utils/taskService";
 import {
   X,
   Calendar,
@@ -13,13 +13,26 @@ import {
   Trash2,
 } from "lucide-react";
 
-const TaskModal = ({ task, currentUser, onClose, onUpdate }) => {
+const TaskModal = ({ task: listTask, currentUser, onClose, onUpdate }) => {
+  // List rows are compact; load the description and dates on open
+  const [details, setDetails] = useState(null);
+  const task = { ...listTask, ...details };
   const [updating, setUpdating] = useState(false);
   const [deleting, setDeleting] = useState(false);
   const [error, setError] = useState(null);
   const [showDeleteConfirm, setShowDeleteConfirm] = useState(false);
   const router = useRouter();
 
+  useEffect(() => {
+    let cancelled = false;
+    getTaskById(listTask.id)
+      .then((data) => !cancelled && setDetails(data))
+      .catch(() => {});
+    return () => {
+      cancelled = true;
+    };
+  }, [listTask.id]);
+
   const statusColors = {
     pending: "bg-yellow-100 text-yellow-800",
     in_progress: "bg-blue-100 text-blue-800",
@@ -126,7 +139,9 @@ const TaskModal = ({ task, currentUser, onClose, onUpdate }) => {
               <div>
                 <p className="text-xs text-gray-500">Assigned On</p>
                 <p className="text-sm font-medium text-gray-900">
-                  {new Date(task.created_at).toLocaleDateString()}
+                  {task.created_at
+                    ? new Date(task.created_at).toLocaleDateString()
+                    : "…"}
                 </p>
               </div>
             </div>
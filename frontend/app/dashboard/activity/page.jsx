@@ -14,14 +14,16 @@ const ActivityPage = () => {
   const { user, loading } = useUser();
   const [activities, setActivities] = useState([]);
   const [isLoading, setIsLoading] = useState(true);
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const fetchActivities = async () => {
       try {
-        const data = await getAllActivities(); // <-- USE THIS FUNCTION
-        // Sort by newest first
-        const sortedData = data.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
-        setActivities(sortedData);
+        // Newest first, one page at a time
+        const page = await getAllActivities(); // <-- USE THIS FUNCTION
+        setActivities(page.results);
+        setNextPage(page.next);
       } catch (error) {
       
       } finally {
@@ -34,6 +36,19 @@ const ActivityPage = () => {
     }
   }, [user]);
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const page = await getAllActivities({}, nextPage);
+      setActivities((prev) => [...prev, ...page.results]);
+      setNextPage(page.next);
+    } catch (error) {
+    
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading || isLoading) {
     return <Loading />;
   }
@@ -46,6 +61,7 @@ const ActivityPage = () => {
           <ActivityHeader
             userRole={user?.role}
             activitiesCount={activities.length}
+            hasMore={Boolean(nextPage)}
           />
           {activities.length === 0 ? (
             <EmptyActivities userRole={user?.role} />
@@ -60,6 +76,17 @@ const ActivityPage = () => {
               ))}
             </div>
           )}
+          {nextPage && (
+            <div className="flex justify-center mt-6">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-4 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition-colors duration-200 disabled:opacity-50"
+              >
+                {loadingMore ? "Loading..." : "Load more"}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
@@ -3,7 +3,7 @@
 import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import { logout } from "../../utils/authService";
-import { getAllTasks } from "@/utils/taskService";
+import { getTasksPage, getTaskSummary } from "@/utils/taskService";
 import TaskCard from "../components/layout/TaskCard";
 import DashboardCard from "../components/layout/DashboardCard";
 import { useUser } from "@/context/UserContext";
@@ -26,12 +26,13 @@ import {
 } from "lucide-react";
 import Link from "next/link";
 import Loading from "../components/layout/Loading";
-import { getAllActivities } from "@/utils/activityService";
 
 const Page = () => {
   const { user, loading } = useUser();
   const [tasks, setTasks] = useState([]);
   const [filteredTasks, setFilteredTasks] = useState([]);
+  const [nextTasksPage, setNextTasksPage] = useState(null);
+  const [loadingMoreTasks, setLoadingMoreTasks] = useState(false);
   const [taskCounts, setTaskCounts] = useState({
     pending: 0,
     in_progress: 0,
@@ -44,16 +45,11 @@ const Page = () => {
   const [loadingActivities, setLoadingActivities] = useState(true);
   const router = useRouter();
 
-  // Calculate task counts
-  const calculateTaskCounts = (tasksList) => {
-    return {
-      pending: tasksList.filter((task) => task.status === "pending").length,
-      in_progress: tasksList.filter((task) => task.status === "in_progress")
-        .length,
-      completed: tasksList.filter((task) => task.status === "completed").length,
-      total: tasksList.length,
-    };
-  };
+  // Counts come pre-aggregated from /tasks/summary/
+  const toTaskCounts = (summary) => ({
+    ...summary.by_status,
+    total: summary.total,
+  });
 
   // Check authentication first
   useEffect(() => {
@@ -69,30 +65,16 @@ const Page = () => {
       if (!user) return;
 
       try {
-        // Fetch tasks
-        const tasksData = await getAllTasks();
-
-        // Filter tasks based on user role
-        let userTasks = tasksData;
-        if (user?.role === "staff") {
-          userTasks = tasksData.filter(
-            (task) => task.assigned_user === user.id
-          );
-        }
-
-        setTasks(userTasks);
-        setFilteredTasks(userTasks);
-        setTaskCounts(calculateTaskCounts(userTasks));
-
-        // Fetch activities
-        const activitiesData = await getAllActivities();
-
-        // Sort activities by date (most recent first) and get top 3
-        const sortedActivities = activitiesData
-          .sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp))
-          .slice(0, 3);
+        // Fetch the first page of tasks (the API only returns staff their own)
+        const page = await getTasksPage();
+        setTasks(page.results);
+        setFilteredTasks(page.results);
+        setNextTasksPage(page.next);
 
-        setActivities(sortedActivities);
+        // Fetch counts and the 3 latest activities
+        const summary = await getTaskSummary(3);
+        setTaskCounts(toTaskCounts(summary));
+        setActivities(summary.recent_activity);
       } catch (error) {
         console.error("Error fetching data:", error);
         // Only redirect on auth errors
@@ -130,6 +112,21 @@ const Page = () => {
     setFilteredTasks(result);
   }, [searchQuery, statusFilter, tasks]);
 
+  // Tasks are paginated (nearest deadline first); search and the status
+  // filter apply to the pages loaded so far
+  const loadMoreTasks = async () => {
+    try {
+      setLoadingMoreTasks(true);
+      const page = await getTasksPage(nextTasksPage);
+      setTasks((prev) => [...prev, ...page.results]);
+      setNextTasksPage(page.next);
+    } catch (error) {
+      console.error("Error fetching tasks:", error);
+    } finally {
+      setLoadingMoreTasks(false);
+    }
+  };
+
   const handleLogout = () => {
     logout();
   };
@@ -199,8 +196,9 @@ const Page = () => {
                 : `${statusFilter.replace("_", " ")} Tasks`}
             </h3>
             <span className="text-gray-500">
-              {filteredTasks.length}{" "}
-              {filteredTasks.length === 1 ? "task" : "tasks"}
+              {filteredTasks.length}
+              {nextTasksPage ? "+" : ""}{" "}
+              {filteredTasks.length === 1 && !nextTasksPage ? "task" : "tasks"}
             </span>
           </div>
 
@@ -226,23 +224,31 @@ const Page = () => {
                   task={task}
                   currentUser={user}
                   onUpdate={async () => {
-                    // Refresh tasks after update
-                    const tasksData = await getAllTasks();
-                    let userTasks = tasksData;
-                    if (user.role === "staff") {
-                      userTasks = tasksData.filter(
-                        (task) => task.assigned_user === user.id
-                      );
-                    }
-
-                    setTasks(userTasks);
-                    setFilteredTasks(userTasks);
-                    setTaskCounts(calculateTaskCounts(userTasks));
+                    // Refresh tasks after update (back to the first page)
+                    const page = await getTasksPage();
+                    setTasks(page.results);
+                    setFilteredTasks(page.results);
+                    setNextTasksPage(page.next);
+                    const summary = await getTaskSummary(3);
+                    setTaskCounts(toTaskCounts(summary));
+                    setActivities(summary.recent_activity);
                   }}
                 />
               ))}
             </div>
           )}
+
+          {nextTasksPage && (
+            <div className="flex justify-center mt-6">
+              <button
+                onClick={loadMoreTasks}
+                disabled={loadingMoreTasks}
+                className="px-4 py-2 bg-white border border-gray-300 text-gray-700 rounded-lg hover:bg-gray-50 transition disabled:opacity-50"
+              >
+                {loadingMoreTasks ? "Loading..." : "Load more tasks"}
+              </button>
+            </div>
+          )}
         </div>
 
         {/* Recent Activity Section */}
@@ -1,19 +1,21 @@
 "use client";
 import { createContext, useContext, useEffect, useState } from "react";
-import { getAllTasks } from "@/utils/taskService";
+import { getTasksPage } from "@/utils/taskService";
 
 const TaskContext = createContext();
 
 export const TaskProvider = ({ children }) => {
   const [tasks, setTasks] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextPage, setNextPage] = useState(null);
 
-  // Fetch all tasks once
+  // Fetch the first page once; loadMore appends the next one
   useEffect(() => {
     const fetchTasks = async () => {
       try {
-        const data = await getAllTasks();
-        setTasks(data);
+        const page = await getTasksPage();
+        setTasks(page.results);
+        setNextPage(page.next);
       } catch (error) {
     
       } finally {
@@ -23,6 +25,13 @@ export const TaskProvider = ({ children }) => {
     fetchTasks();
   }, []);
 
+  const loadMore = async () => {
+    if (!nextPage) return;
+    const page = await getTasksPage(nextPage);
+    setTasks((prev) => [...prev, ...page.results]);
+    setNextPage(page.next);
+  };
+
   // Add a new task
   const addTask = (task) => setTasks((prev) => [task, ...prev]);
 
@@ -38,7 +47,16 @@ export const TaskProvider = ({ children }) => {
 
   return (
     <TaskContext.Provider
-      value={{ tasks, setTasks, addTask, updateTask, deleteTask, loading }}
+      value={{
+        tasks,
+        setTasks,
+        addTask,
+        updateTask,
+        deleteTask,
+        loading,
+        loadMore,
+        hasMore: Boolean(nextPage),
+      }}
     >
       {children}
     </TaskContext.Provider>
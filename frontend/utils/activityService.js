@@ -1,6 +1,14 @@
 import axiosInstance from "@/axios/axiosInstance";
 
-export const getAllActivities = async (filters = {}) => {
+// The activity feeds are cursor-paginated: each call returns one page as
+// { results, next }. Pass `next` back in to get the page after it; it is
+// null on the last page.
+const toPage = (data) => ({
+  results: data.results || data,
+  next: data.next || null,
+});
+
+export const getAllActivities = async (filters = {}, next = null) => {
   try {
     const params = new URLSearchParams();
     
@@ -10,23 +18,23 @@ export const getAllActivities = async (filters = {}) => {
     if (filters.limit) params.append('limit', filters.limit);
     
     const response = await axiosInstance.get(
-      `/api/activity/?${params.toString()}`
+      next || `/api/activity/?${params.toString()}`
     );
     
-    return response.data.results || response.data;
+    return toPage(response.data);
   } catch (error) {
  
     throw error;
   }
 };
 
-export const getTaskActivities = async (taskId) => {
+export const getTaskActivities = async (taskId, next = null) => {
   try {
     const response = await axiosInstance.get(
-      `/api/activity/by_task/?task_id=${taskId}`
+      next || `/api/activity/by_task/?task_id=${taskId}`
     );
     
-    return response.data;
+    return toPage(response.data);
   } catch (error) {
   
     throw error;
@@ -39,17 +47,17 @@ export const getRecentActivities = async () => {
       `/api/activity/recent/`
     );
     
-    return response.data;
+    return response.data.results || response.data;
   } catch (error) {
    
     throw error;
   }
 };
 
-export const getActivityLogs = async () => {
+export const getActivityLogs = async (next = null) => {
   try {
-    const response = await axiosInstance.get("/api/activity/");
-    return response.data;
+    const response = await axiosInstance.get(next || "/api/activity/");
+    return toPage(response.data);
   } catch (error) {
  
     throw error;
@@ -59,17 +67,17 @@ export const getActivityLogs = async () => {
 export const getRecentActivityLogs = async () => {
   try {
     const response = await axiosInstance.get("/api/activity/recent/");
-    return response.data;
+    return response.data.results || response.data;
   } catch (error) {
    
     throw error;
   }
 };
 
-export const getActivityLogsByTask = async (taskId) => {
+export const getActivityLogsByTask = async (taskId, next = null) => {
   try {
-    const response = await axiosInstance.get(`/api/activity/by_task/?task_id=${taskId}`);
-    return response.data;
+    const response = await axiosInstance.get(next || `/api/activity/by_task/?task_id=${taskId}`);
+    return toPage(response.data);
   } catch (error) {
     
     throw error;
@@ -0,0 +1,24 @@
+import axiosInstance from "@/axios/axiosInstance";
+
+// Subscribe to live task and activity events (GET /api/events/).
+// handlers: { onTask(payload), onActivity(activity), onReset() }
+// The browser reconnects on its own and resumes with Last-Event-ID;
+// onReset means events were missed and lists should be refetched.
+// Returns a function that closes the stream.
+export const subscribeToEvents = (handlers = {}) => {
+  const token = localStorage.getItem("access_token");
+  const url = `${axiosInstance.defaults.baseURL}/api/events/?token=${encodeURIComponent(token || "")}`;
+  const source = new EventSource(url);
+
+  source.addEventListener("task", (event) => {
+    handlers.onTask?.(JSON.parse(event.data));
+  });
+  source.addEventListener("activity", (event) => {
+    handlers.onActivity?.(JSON.parse(event.data));
+  });
+  source.addEventListener("reset", () => {
+    handlers.onReset?.();
+  });
+
+  return () => source.close();
+};
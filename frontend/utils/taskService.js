@@ -1,15 +1,32 @@
 import axiosInstance from "@/axios/axiosInstance";
 
-// Get all tasks
-export const getAllTasks = async () => {
+// Get all tasks (follows the cursor-paginated `next` links)
+// Get one page of tasks (cursor-paginated, nearest deadline first).
+// Returns { results, next }; pass `next` back in for the following page.
+export const getTasksPage = async (next = null) => {
   try {
-    const response = await axiosInstance.get("/tasks/");
-    return response.data;
+    const response = await axiosInstance.get(next || "/tasks/?page_size=50");
+    return {
+      results: response.data.results || response.data,
+      next: response.data.next || null,
+    };
   } catch (error) {
     throw error.response?.data || "Failed to fetch tasks";
   }
 };
 
+// Get dashboard counts and latest activity in one small payload
+export const getTaskSummary = async (activityLimit = 3) => {
+  try {
+    const response = await axiosInstance.get(
+      `/tasks/summary/?activity_limit=${activityLimit}`
+    );
+    return response.data;
+  } catch (error) {
+    throw error.response?.data || "Failed to fetch task summary";
+  }
+};
+
 // Get single task by ID
 export const getTaskById = async (taskId) => {
   try {